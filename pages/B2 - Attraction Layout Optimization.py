@@ -1,50 +1,71 @@
+import sys
+import uuid
 import streamlit as st
-import requests
-from PIL import Image
-from io import BytesIO
 import random
+from pathlib import Path
+
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # Adds the repository root to path
+# The B2 simulation scripts import each other by module name
+sys.path.append(str(Path(__file__).resolve().parent.parent / 'scripts' / 'B2'))
+
+from live_simulation import SimulationCache, load_front, front_frame
+from pareto import OBJECTIVES, DEFAULT_OBJECTIVE_WEIGHTS
+from render import render_frame
+from scripts.image_assets import ImageStore
 
 # Set up the page
 st.title("Ride Layout Optimisation")
 
-# GitHub repository information
-GITHUB_USERNAME = "NotInvalidUsername"
-REPO_NAME = "DSA3101_Group8_Project1"
-BRANCH_NAME = "alan_bean"  # Change if using a different branch
+# Image folders relative to images/
+SIMULATIONS_PATH = "B2/simulations"
+HEATMAPS_PATH = "B2/heatmaps"
 
-# Base URL for GitHub content
-BASE_URL = f"https://raw.githubusercontent.com/{GITHUB_USERNAME}/{REPO_NAME}/{BRANCH_NAME}"
-SIMULATIONS_PATH = "images/B2/simulations"
-HEATMAPS_PATH = "images/B2/heatmaps"
+@st.cache_resource
+def image_store():
+    """Bundled images served from local disk, cached in memory across sessions"""
+    return ImageStore()
 
 def get_image_files(model, num_rides, image_type="simulations"):
-    """Get image files from GitHub repository"""
+    """Get the bundled image files of a model and number of rides from the image manifest"""
     if image_type == "simulations":
         folder_path = f"{SIMULATIONS_PATH}/{model}/number_rides_{num_rides}"
     else:
         folder_path = f"{HEATMAPS_PATH}/{model}/num_rides_{num_rides}"
-    
-    # GitHub API URL to list contents
-    api_url = f"https://api.github.com/repos/{GITHUB_USERNAME}/{REPO_NAME}/contents/{folder_path}?ref={BRANCH_NAME}"
-    
-    try:
-        response = requests.get(api_url)
-        response.raise_for_status()  # Raise an error for bad status codes
-        
-        files = response.json()
-        image_files = []
-        
-        for file in files:
-            if file['name'].lower().endswith(('.png', '.jpg', '.jpeg', '.gif', '.bmp')):
-                # Construct raw content URL
-                image_url = f"{BASE_URL}/{folder_path}/{file['name']}"
-                image_files.append(image_url)
-        
-        return image_files if image_files else None
-        
-    except requests.exceptions.RequestException as e:
-        st.error(f"Error accessing GitHub: {e}")
-        return None
+    image_files = image_store().list(folder_path)
+    return image_files if image_files else None
+
+@st.cache_data
+def pareto_front(model, num_rides):
+    """Saved Pareto front of a model and number of rides, read once per configuration"""
+    return load_front(model, num_rides)
+
+@st.cache_resource
+def simulation_cache():
+    """Simulation jobs shared by every session, keyed by park model and number of rides"""
+    return SimulationCache()
+
+def stream_simulation(job):
+    """Show a simulation job's heatmaps as they are published, until it finishes"""
+    status = st.empty()
+    progress = st.progress(0.0)
+    frames = st.container()
+    shown = 0
+    while True:
+        new_frames = job.wait_for_frames(shown, timeout=0.5)
+        for step, image in new_frames:
+            frames.image(image, caption=f"Heatmap Step {step}")
+        shown += len(new_frames)
+        progress.progress(job.progress)
+        if job.finished:
+            break
+        status.info("Optimising the ride layout..." if job.status == 'optimising' else f"Simulating... {job.progress:.0%}")
+
+    if job.status == 'done':
+        status.success(f"Simulated in {job.seconds:.1f}s")
+    elif job.status == 'cancelled':
+        status.warning("Simulation cancelled")
+    else:
+        status.error(f"Simulation failed: {job.error}")
 
  # Sidebar navigation
 st.sidebar.title("Navigation")
@@ -85,19 +106,17 @@ elif page == "Optimised Park layouts":
         image_files = get_image_files(model, num_rides)
 
         if not image_files:
-            st.warning("No images found or failed to fetch data from GitHub.")
+            st.warning("No images found for this layout.")
         else:
             # Select a random image
-            selected_image_url = random.choice(image_files)
+            selected_image = random.choice(image_files)
 
-            # Fetch and display the image
-            response = requests.get(selected_image_url)
-            if response.status_code == 200:
-                image = Image.open(BytesIO(response.content))
-                st.image(image, caption=f"Model: {model} | Rides: {num_rides}")
-                st.success(f"Successfully loaded image from: {selected_image_url}")
-            else:
-                st.error(f"Failed to load image from GitHub: {selected_image_url}")
+            # Load and display the image
+            try:
+                st.image(image_store().read(selected_image), caption=f"Model: {model} | Rides: {num_rides}")
+                st.success(f"Successfully loaded image: {selected_image}")
+            except OSError as e:
+                st.error(f"Failed to load image {selected_image}: {e}")
 
     "## :mag: What patterns do we notice?"
     "No **two** layouts seem to have the same optimised positions for the rides. This could indicate factors that are missing within the algorithm. Moreover, it also highlights that there is no one true solution to any optimisation problem."
@@ -106,6 +125,25 @@ elif page == "Optimised Park layouts":
     "This provides opportunities for businesses to make meaning from the layout through theming."
     "Yet given these clusters, how do people ultimately explore a park?"
 
+    "## :scales: Weigh Your Own Business Goals"
+    "Each park below keeps a whole front of optimised layouts, none better than another on guest satisfaction, ride throughput and crowding at once. Set how much each goal matters and the best layout for that weighting is picked instantly, without re-running the optimisation."
+
+    front_model = st.radio("Select a model to weigh", ("Ring Shaped", "Plain", "Large with Lake"), key="front_model")
+    front_rides = st.slider("Select the number of rides to weigh", 3, 13, 8, key="front_rides")
+    front_model = {"Ring Shaped": "model1", "Plain": "model2", "Large with Lake": "model3"}[front_model]
+
+    front = pareto_front(front_model, front_rides)
+    if front is None:
+        st.warning("No Pareto front has been computed for this layout.")
+    else:
+        weight_cols = st.columns(len(OBJECTIVES))
+        weights = {name: col.slider(f"Weight of {name}", 0.0, 5.0, DEFAULT_OBJECTIVE_WEIGHTS[name], 0.5, key=f"weight_{name}")
+                   for name, col in zip(OBJECTIVES, weight_cols)}
+        best = front.best(weights)
+        st.image(render_frame(front_frame(front, best)),
+                 caption=f"Best of {len(front)} layouts | Model: {front_model} | Rides: {front_rides}")
+        st.dataframe(front.to_table(weights), use_container_width=True)
+
 elif page == "Simulated Heatmaps":
     st.title("Heatmaps")
     "## Let's Explore!:fire::world_map:"
@@ -114,31 +152,35 @@ elif page == "Simulated Heatmaps":
     model_density = st.radio("Select a model for density exploration", ("Ring Shaped", "Plain", "Large with Lake"))
     num_rides_density = st.slider("Select the total number of rides for density analysis!", 3, 13, 8)
 
-    # Generate button
-    if st.button("Generate Density layout"):
-        if model_density == "Ring Shaped":
-            model_density = "model1"
-        elif model_density == "Plain":
-            model_density = "model2"
-        else:
-            model_density = "model3"
-        image_files = get_image_files(model_density, num_rides_density, "heatmaps")
-
-        if not image_files:
-            st.warning("No images found or failed to fetch data from GitHub.")
-        else:
-           heatmap_images = [
-            img for img in image_files if any(f"heatmap_step_{i*10}" in img for i in range(0, 8))
-        ]
-
-            # Display all 7 heatmap images in order
-        for step, img_url in enumerate(sorted(heatmap_images), start=0):
-            response = requests.get(img_url)
-            if response.status_code == 200:
-                image = Image.open(BytesIO(response.content))
-                st.image(image, caption=f"Heatmap Step {step*10}")
-            else:
-                st.error(f"Failed to load image: {img_url}")
+    if model_density == "Ring Shaped":
+        model_density = "model1"
+    elif model_density == "Plain":
+        model_density = "model2"
+    else:
+        model_density = "model3"
+
+    # The park is simulated on the server; finished configurations are served from the cache
+    # Jobs are shared by all sessions, so a session only leaves its job; the last one to leave cancels it
+    cache = simulation_cache()
+    session_id = st.session_state.setdefault('session_id', uuid.uuid4().hex)
+    generate_col, cancel_col = st.columns(2)
+    if generate_col.button("Generate Density layout"):
+        job = cache.get_or_start(model_density, num_rides_density, subscriber=session_id)
+        if st.session_state.get('density_job') not in (None, job.key):
+            cache.unsubscribe(st.session_state['density_job'], session_id)
+        st.session_state['density_job'] = job.key
+    if cancel_col.button("Cancel simulation") and 'density_job' in st.session_state:
+        key = st.session_state.pop('density_job')
+        job = cache.get(*key)
+        if cache.unsubscribe(key, session_id):
+            st.warning("Simulation cancelled")
+        elif job is not None and not job.finished:
+            st.info("Stopped following the simulation; it keeps running for other viewers")
+
+    if 'density_job' in st.session_state:
+        job = cache.get(*st.session_state['density_job'])
+        if job is not None:
+            stream_simulation(job)
 
 
     st.header("What Patterns Do We Notice?:mag_right:")
@@ -1,6 +1,5 @@
 import os
 import streamlit as st
-from pathlib import Path
 import pandas as pd
 import calendar
 
@@ -63,53 +62,25 @@ if page == "Optimization Model":
         \end{cases}
         """)
 
-    # Use simpler relative paths for data files
-    data_dir = Path("data") / "B3"
-
-    # Load all data files using the simplified path structure
-    month_day_filepath = data_dir / "adjust_month_day.csv"
-    adjust_month_day = pd.read_csv(month_day_filepath)
-    month_day_adjuster = adjust_month_day.set_index(['Month', 'Day_of_Week'])['adjuster_month_day'].to_dict()
-
-    hour_rides_filepath = data_dir / "adjust_hour_rides.csv"
-    adjust_hour_rides = pd.read_csv(hour_rides_filepath)
-    hour_adjuster_rides = adjust_hour_rides.set_index('DEB_TIME_HOUR')['adjuster_hourly_rides'].to_dict()
-
-    hour_eatery_filepath = data_dir / "adjust_hour_eatery.csv"
-    adjust_hour_eatery = pd.read_csv(hour_eatery_filepath)
-    hour_adjuster_eatery = adjust_hour_eatery.set_index('hour')['adjuster'].to_dict()
-
-    hour_merch_filepath = data_dir / "adjust_hour_merch.csv"
-    adjust_hour_merch = pd.read_csv(hour_merch_filepath)
-    hour_adjuster_merch = adjust_hour_merch.set_index('hour')['adjuster'].to_dict()
-
-    hour_general_filepath = data_dir / "adjust_hour_general.csv"
-    adjust_hour_general = pd.read_csv(hour_general_filepath)
-    hour_adjuster_general = adjust_hour_general.set_index('hour_adjusted')['adjuster'].to_dict()
-
-    public_holiday_filepath = data_dir / "adjust_public_holiday.csv"
-    adjust_public_holiday = pd.read_csv(public_holiday_filepath)
-    hour_adjuster_pubhol = adjust_public_holiday.set_index('status')['adjuster'].to_dict()
-
-    rain_filepath = data_dir / "adjust_rain.csv"
-    adjust_rain = pd.read_csv(rain_filepath)
-    rain_adjuster = adjust_rain.set_index('Rainy')['adjuster_rain'].to_dict()
-
-    # Construct adjusters dictionary
-    adjusters = {
-        'month_day': month_day_adjuster,
-        'hour_rides': hour_adjuster_rides,
-        'hour_eatery': hour_adjuster_eatery,
-        'hour_merch': hour_adjuster_merch,
-        'hour_general': hour_adjuster_general,
-        'public_holiday': hour_adjuster_pubhol,
-        'rain': rain_adjuster
-    }
+    # All adjusters come from one memory-mapped lookup table built by scripts/B3/adjuster_store.py
+    from scripts.B3.adjuster_store import load_adjuster_table
+    adjusters = st.cache_resource(load_adjuster_table)()
 
     # Add scripts folder to path and import StaffingOptimizer
-    from scripts.B3.optimization_model import StaffingOptimizer
+    from scripts.B3.planner import plan_year
+    from scripts.B3.shift_model import ShiftScheduler, date_scenarios
     from scripts.B3.visualization import plot_staffing
 
+    @st.cache_resource
+    def staffing_plan(_adjusters, base_demand):
+        """Schedules of all 336 scenarios of a year, planned once per base demand"""
+        return plan_year(_adjusters, base_demand)
+
+    @st.cache_data
+    def shift_plan(_adjusters, base_demand, dates, rainy_dates, holiday_dates):
+        """Integer shift schedule of a horizon of dates"""
+        return ShiftScheduler(_adjusters, base_demand).schedule(date_scenarios(dates, rainy_dates, holiday_dates), dates)
+
     # User inputs
     base_demand = st.number_input("Enter Estimated Park Attendance for the Day", min_value=1, max_value=1000000, value=10000)
     month = st.selectbox("Select Month", list(calendar.month_name[1:]))
@@ -117,28 +88,56 @@ if page == "Optimization Model":
     rain = st.radio("Is it forecasted to rain?", ["No", "Yes"]) == "Yes"
     public_holiday = st.radio("Is it a public holiday?", ["No", "Yes"]) == "Yes"
 
-    # Run optimization when user clicks the button
-    if st.button("Optimize Staffing"):
-        optimizer = StaffingOptimizer(adjusters, base_demand)
-        staff_schedule_rides, staff_schedule_eatery, staff_schedule_merch, staff_schedule_general = optimizer.optimize_staffing(month, day, rain, public_holiday)
-
-        # Generate and display visualization
-        fig = plot_staffing([staff_schedule_rides, staff_schedule_eatery, staff_schedule_merch, staff_schedule_general], month, day, rain, public_holiday)
-        st.pyplot(fig)
-
-        # Show optimized staffing schedules in tabular form
-        st.write("### Optimized Staffing Schedules")
-        with st.expander("Rides"):
-            st.dataframe(staff_schedule_rides)
-        
-        with st.expander("Eateries"):
-            st.dataframe(staff_schedule_eatery)
-        
-        with st.expander("Merchandise"):
-            st.dataframe(staff_schedule_merch)
-
-        with st.expander("General"):
-            st.dataframe(staff_schedule_general)
+    # Every scenario is planned up front, so changing a widget only looks the schedule up
+    plan = staffing_plan(adjusters, base_demand)
+    staff_schedule_rides, staff_schedule_eatery, staff_schedule_merch, staff_schedule_general = plan.schedules(month, day, rain, public_holiday)
+
+    # Generate and display visualization
+    fig = plot_staffing([staff_schedule_rides, staff_schedule_eatery, staff_schedule_merch, staff_schedule_general], month, day, rain, public_holiday)
+    st.pyplot(fig)
+
+    # Show optimized staffing schedules in tabular form
+    st.write("### Optimized Staffing Schedules")
+    with st.expander("Rides"):
+        st.dataframe(staff_schedule_rides)
+
+    with st.expander("Eateries"):
+        st.dataframe(staff_schedule_eatery)
+
+    with st.expander("Merchandise"):
+        st.dataframe(staff_schedule_merch)
+
+    with st.expander("General"):
+        st.dataframe(staff_schedule_general)
+
+    # Year-level view of the same plan
+    st.write("### The Year at a Glance")
+    daily_totals = plan.daily_totals(rain, public_holiday)
+    day_total = daily_totals.loc[month, day]
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Staff-hours on this day", f"{day_total:,.0f}", f"{day_total / daily_totals.values.mean() - 1:+.0%} vs. year average")
+    col2.metric("Rain uplift", f"{plan.uplift('rain').loc[month, day]:+.1%}")
+    col3.metric("Public holiday uplift", f"{plan.uplift('public_holiday').loc[month, day]:+.1%}")
+    st.write(f"Staff-hours per day by month and day of the week (rain: {'Yes' if rain else 'No'}, public holiday: {'Yes' if public_holiday else 'No'})")
+    st.dataframe(daily_totals.round(0))
+
+    # Whole staff on fixed-length shifts for a week
+    st.write("### Weekly Shift Plan")
+    st.write("Staff are scheduled in whole numbers on 4, 6 or 8 hour shifts that cover the hourly requirement of each day.")
+    week_start = st.date_input("Week starting", value=pd.Timestamp("2024-07-01"))
+    week = [day.date() for day in pd.date_range(week_start, periods=7)]
+    rainy_dates = st.multiselect("Rainy days", week, format_func=lambda date: date.strftime("%A %d %b"))
+    holiday_dates = st.multiselect("Public holidays", week, format_func=lambda date: date.strftime("%A %d %b"))
+    shifts, coverage, seconds = shift_plan(adjusters, base_demand, week, rainy_dates, holiday_dates)
+
+    paid_hours = ((shifts['End'] - shifts['Start']) * shifts['Staff']).sum()
+    col1, col2, col3 = st.columns(3)
+    col1.metric("Shifts", f"{shifts['Staff'].sum():,}")
+    col2.metric("Paid staff-hours", f"{paid_hours:,.0f}", f"{paid_hours / coverage['Required'].sum() - 1:+.1%} vs. hourly requirement", delta_color="inverse")
+    col3.metric("Solved in", f"{seconds:.2f}s")
+    for category, category_shifts in shifts.groupby('Category', sort=False):
+        with st.expander(category):
+            st.dataframe(category_shifts.pivot_table(index=['Start', 'End'], columns='Date', values='Staff', fill_value=0))
 
 ### Page 2: Business Recommendations ###
 elif page == "Business Recommendations":
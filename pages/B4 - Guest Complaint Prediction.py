@@ -1,19 +1,18 @@
+import sys
+from pathlib import Path
 import streamlit as st
 import matplotlib.pyplot as plt
-from PIL import Image
-import requests
-from io import BytesIO
-import time
+sys.path.append(str(Path(__file__).resolve().parent.parent))  # Adds the repository root to path
+from scripts.image_assets import ImageStore
 
-# Image base URL
-BASE_URL = "https://raw.githubusercontent.com/NotInvalidUsername/DSA3101_Group8_Project1/main/images/B4/"
+@st.cache_resource
+def image_store():
+    """Bundled images served from local disk, cached in memory across sessions"""
+    return ImageStore()
 
-# Function to load image from GitHub with cache-busting
-def load_image_from_github(image_name):
-    url = BASE_URL + image_name + f"?nocache={int(time.time())}"
-    response = requests.get(url)
-    img = Image.open(BytesIO(response.content))
-    return img
+# Function to load a bundled B4 image
+def load_image(image_name):
+    return image_store().image(f"B4/{image_name}")
 
 # Sidebar navigation
 page = st.sidebar.radio("Navigate", ["Overview", "Topic Clusters", "Business Recommendations"])
@@ -39,7 +38,7 @@ if page == "Overview":
     """)
 
     try:
-        model_image = load_image_from_github("hierarchical_clustering.png")
+        model_image = load_image("hierarchical_clustering.png")
         st.image(model_image, caption="Hierarchical Topic Clustering", use_container_width=True)
     except Exception as e:
         st.error(f"Error loading hierarchical_clustering.png: {e}")
@@ -58,7 +57,7 @@ elif page == "Topic Clusters":
     # Cluster 1
     with st.expander("🟣 Cluster 1: Customer Experience"):
         try:
-            img = load_image_from_github("cluster_1.png")
+            img = load_image("cluster_1.png")
             st.image(img, caption="Word Cloud Cluster 1", use_container_width=True)
         except Exception as e:
             st.error(f"Error loading cluster_1.png: {e}")
@@ -73,7 +72,7 @@ elif page == "Topic Clusters":
     # Cluster 2
     with st.expander("🟢 Cluster 2: Ticket and Refund Issues"):
         try:
-            img = load_image_from_github("cluster_2.png")
+            img = load_image("cluster_2.png")
             st.image(img, caption="Word Cloud Cluster 2", use_container_width=True)
         except Exception as e:
             st.error(f"Error loading cluster_2.png: {e}")
@@ -87,7 +86,7 @@ elif page == "Topic Clusters":
     # Cluster 3
     with st.expander("🔴 Cluster 3: Staff Response"):
         try:
-            img = load_image_from_github("cluster_3.png")
+            img = load_image("cluster_3.png")
             st.image(img, caption="Word Cloud Cluster 3", use_container_width=True)
         except Exception as e:
             st.error(f"Error loading cluster_3.png: {e}")
@@ -100,7 +99,7 @@ elif page == "Topic Clusters":
     # Cluster 4
     with st.expander("🔵 Cluster 4: Park Environment and Smoking"):
         try:
-            img = load_image_from_github("cluster_4.png")
+            img = load_image("cluster_4.png")
             st.image(img, caption="Word Cloud Cluster 4", use_container_width=True)
         except Exception as e:
             st.error(f"Error loading cluster_4.png: {e}")
@@ -4,11 +4,13 @@ import pandas as pd
 import random
 import numpy as np
 import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
 from optimisation import *
 from objects import *
 from cleaning import *
 from heatmap import *
 from simulations import *
+from render import *
 
 # Set up base directory structure
 downloads_path = str(Path.home() / "Downloads")
@@ -37,7 +39,8 @@ MODEL_CONFIGS = {
     }
 }
 
-def start_simulation_run(model, dataframe, num_rides, model_name, output_dir):
+def start_simulation_run(model, dataframe, num_rides, model_name, output_dir, render_mode='matplotlib',
+                         animation=None, executor=None):
     """Run a single simulation with optimized ride placement and save periodic heatmap visualizations.
     
     Args:
@@ -46,6 +49,11 @@ def start_simulation_run(model, dataframe, num_rides, model_name, output_dir):
         num_rides (int): Number of rides to include in simulation (minimum 3)
         model_name (str): Name/identifier for this model configuration
         output_dir (str): Directory path to save heatmap images
+        render_mode (str): 'matplotlib' saves full figures; 'array' captures the frames and
+            renders them headlessly with render.save_frames
+        animation (str): With render_mode='array', also write the frames as 'gif' or 'webp'
+        executor (concurrent.futures.Executor): Optional process pool the 'array' frames are
+            rendered on
         
     The function:
     1. Creates a clean model copy
@@ -113,25 +121,42 @@ def start_simulation_run(model, dataframe, num_rides, model_name, output_dir):
         )
 
     # Run the simulation and save heatmaps at intervals
+    frames, paths = [], []
     for step in range(71):
         model.step()
         if step % 10 == 0:  # Save at 0,10,20,...,70
             # Create and save heatmap
             print(f"number of steps: {step}")
+            path = os.path.join(rides_dir, f'heatmap_step_{step}.png')
+            if render_mode == 'array':
+                frames.append(capture_frame(model))
+                paths.append(path)
+                continue
             fig = plot_combined_heatmap_and_rides_normalized(model)  # Assuming this does the plotting
-            fig.savefig(os.path.join(rides_dir, f'heatmap_step_{step}.png'), 
+            fig.savefig(path, 
                     bbox_inches='tight', 
                     dpi=150)
             plt.close(fig)
 
+    if frames:
+        encoded = save_frames(frames, paths, executor=executor)
+        if animation:
+            # Reuse the pool-rendered PNGs instead of rendering every frame again
+            save_animation(encoded, os.path.join(rides_dir, f'heatmaps.{animation}'))
 
-def run_all_simulations_heatmap(MODEL_CONFIGS,dataframe, simulations_dir):
+
+def run_all_simulations_heatmap(MODEL_CONFIGS,dataframe, simulations_dir, render_mode='matplotlib',
+                                animation=None, workers=None):
     """Execute multiple simulation scenarios across different park configurations and ride counts.
     
     Args:
         MODEL_CONFIGS (dict): Dictionary defining different park layouts and restrictions
         dataframe (pd.DataFrame): DataFrame containing ride information (Ranking, CAPACITY)
         simulations_dir (str): Base directory to save all simulation results
+        render_mode (str): 'matplotlib' or 'array' (headless rendering, see start_simulation_run)
+        animation (str): With render_mode='array', also write a 'gif' or 'webp' per run
+        workers (int): With render_mode='array', render frames on one pool of this many
+            processes shared by every run (needs an `if __name__ == "__main__":` guard)
         
     The function:
     1. Iterates through all model configurations
@@ -139,6 +164,9 @@ def run_all_simulations_heatmap(MODEL_CONFIGS,dataframe, simulations_dir):
     3. Runs each configuration through start_simulation_run()
     4. Organizes output in directory structure by model/num_rides
     """
+    executor = None
+    if render_mode == 'array' and workers is not None and workers > 1:
+        executor = ProcessPoolExecutor(max_workers=workers)
     for model_name, config in MODEL_CONFIGS.items():
         print(f"\nRunning simulations for {model_name}...")
         
@@ -158,8 +186,13 @@ def run_all_simulations_heatmap(MODEL_CONFIGS,dataframe, simulations_dir):
                 dataframe=dataframe,
                 num_rides=num_rides,
                 model_name=model_name,
-                output_dir=simulations_dir
+                output_dir=simulations_dir,
+                render_mode=render_mode,
+                animation=animation,
+                executor=executor
             )
+    if executor is not None:
+        executor.shutdown()
 
 # # Example usage:
 # if __name__ == "__main__":
@@ -0,0 +1,510 @@
+import numpy as np
+from objects import *
+
+
+def rank_within_groups(groups):
+    """Rank each element among the elements of the same group, preserving input order.
+
+    Args:
+        groups (np.ndarray): Integer group label for each element.
+
+    Returns:
+        np.ndarray: 0 for the first element of each group, 1 for the second and so on.
+    """
+    order = np.argsort(groups, kind='stable')
+    sorted_groups = groups[order]
+    starts = np.flatnonzero(np.r_[True, sorted_groups[1:] != sorted_groups[:-1]])
+    counts = np.diff(np.r_[starts, len(groups)])
+    ranks = np.empty(len(groups), dtype=np.int64)
+    ranks[order] = np.arange(len(groups)) - np.repeat(starts, counts)
+    return ranks
+
+
+class ArrayGrid:
+    """Minimal stand-in for mesa's MultiGrid exposing the park dimensions.
+
+    Attributes:
+        width (int): Grid width in cells.
+        height (int): Grid height in cells.
+    """
+    def __init__(self, width, height):
+        self.width = width
+        self.height = height
+
+    def out_of_bounds(self, pos):
+        """Check whether a position lies outside the grid.
+
+        Args:
+            pos (tuple): (x,y) position to check.
+
+        Returns:
+            bool: True if the position is off the grid.
+        """
+        x, y = pos
+        return not (0 <= x < self.width and 0 <= y < self.height)
+
+
+class ArrayRide:
+    """A ride record of the array-backed model, exposing the same attributes as RideAgent.
+
+    Attributes:
+        unique_id (int): Unique identifier for the ride.
+        name (str): Name of the ride.
+        pos (tuple): Fixed (x,y) position on the grid.
+        capacity (int): Maximum number of simultaneous riders.
+        service_time (int): Time steps required for one ride cycle.
+        popularity_rank (int): Relative popularity (lower = more popular).
+        queue_lengths (list): Historical record of queue lengths.
+        wait_times (list): Historical record of guest wait times.
+    """
+    def __init__(self, unique_id, name, pos, capacity, service_time, popularity_rank):
+        self.unique_id = unique_id
+        self.name = name
+        self.pos = pos
+        self.capacity = capacity
+        self.service_time = service_time
+        self.popularity_rank = popularity_rank
+        self.queue_lengths = []
+        self.wait_times = []
+
+
+class ThemeParkArrayModel(GuestDensityMixin):
+    """Array-backed theme park model that advances every guest in one vectorized step.
+
+    Alternative backend to ThemeParkGridModel with the same public interface. Instead of
+    one GuestAgent per guest, guest state is held as NumPy structure-of-arrays in
+    `self.guests` and each step updates all guests with array operations.
+
+    With `replicas` above 1 the model simulates that many independent copies of the park at
+    once: every arrival batch is drawn per replica and each replica has its own ride queues,
+    so one vectorized run yields `replicas` independent samples (see replica_statistics()).
+
+    Attributes:
+        grid (ArrayGrid): Park dimensions.
+        restricted_area (list): List of restricted (x,y) positions.
+        walkable (np.ndarray): Boolean (width, height) mask, False on restricted cells.
+        walkable_cells (np.ndarray): (x,y) coordinates of every walkable cell.
+        routing (RoutingTable): Shortest-path next-hop tables toward rides and the entrance.
+        start_pos (tuple): Park entrance/exit position.
+        guests_entered (int): Total guests who entered the park.
+        guests_left (int): Guests who left the park during the current step.
+        rides (list): List of ArrayRide instances in the park.
+        guest_inflow_type (InflowSchedule or pd.DataFrame): Optional guest arrival schedule.
+        arrivals (np.ndarray): Arrivals per step compiled from guest_inflow_type, or None.
+        steps (int): Number of steps simulated so far.
+        replicas (int): Number of independent park replications simulated together.
+        replica_entered (np.ndarray): Guests who entered each replication.
+        rng (np.random.Generator): The model's random generator, seeded from `seed`.
+        guests (dict): Guest state arrays keyed by field name, one entry per guest.
+        occupancy (np.ndarray): Guest count per cell, kept up to date as guests move.
+        cumulative_density (np.ndarray): Guest counts per cell summed over every step.
+    """
+    # Guest state fields and their dtypes
+    GUEST_FIELDS = {
+        'x': np.int32,
+        'y': np.int32,
+        'target': np.int32,           # Index of the ride heading to or riding, -1 if none
+        'last_ride': np.int32,        # Index of the last ride queued for, -1 if none
+        'ride_timer': np.int32,       # Remaining time steps on the current ride
+        'leave_timer': np.int32,      # Time steps before the guest decides to leave
+        'leaving': np.bool_,
+        'queued': np.bool_,
+        'queue_since': np.int32,      # Step at which the guest joined the current queue
+        'failed_attempts': np.int32,
+        'rides_completed': np.int32,
+        'replica': np.int32,          # Replication the guest belongs to
+    }
+
+    def __init__(self, width, height, restricted_bottom_left=None, restricted_top_right=None, guest_inflow_type=None,
+                 replicas=1, seed=None):
+        """Initialize the array-backed model with the same arguments as ThemeParkGridModel.
+
+        Args:
+            width (int): Grid width in cells.
+            height (int): Grid height in cells.
+            restricted_bottom_left (tuple or list): Bottom-left corner(s) of restricted areas.
+            restricted_top_right (tuple or list): Top-right corner(s) of restricted areas.
+            guest_inflow_type (InflowSchedule or pd.DataFrame): Optional guest arrival schedule.
+            replicas (int): Number of independent park replications to simulate together.
+            seed (int): Seed of the model's random generator, or None for fresh entropy.
+        """
+        self.rng = np.random.default_rng(seed)
+        self.grid = ArrayGrid(width, height)
+        apply_restricted_areas(self, width, height, restricted_bottom_left, restricted_top_right)
+        self.start_pos = (width // 2, 0)  # Bottom center for ingress/egress
+        self.routing = RoutingTable(self.walkable)
+        self.exit_moves = self.routing.moves_to(self.start_pos)
+        self.reset_density(width, height)
+        self.guests_entered = 0
+        self.guests_left = 0
+        self.rides = []
+        self.guest_inflow_type = guest_inflow_type
+        self.arrivals = inflow_arrivals(guest_inflow_type)
+        self.steps = 0
+        self.replicas = replicas
+        self.replica_entered = np.zeros(replicas, dtype=np.int64)
+        self.guests = {field: np.empty(0, dtype=dtype) for field, dtype in self.GUEST_FIELDS.items()}
+        self._update_ride_arrays()
+
+    def add_ride(self, name, pos, capacity, service_time, popularity_rank):
+        """Add a new ride to the theme park.
+
+        Args:
+            name (str): Name of the ride.
+            pos (tuple): (x,y) position on grid.
+            capacity (int): Maximum simultaneous riders.
+            service_time (int): Ride duration in steps.
+            popularity_rank (int): Popularity ranking (lower = more popular).
+        """
+        ride_id = len(self.rides) + 1
+        self.rides.append(ArrayRide(ride_id, name, pos, capacity, service_time, popularity_rank))
+        self._update_ride_arrays()
+
+    def clear_rides(self):
+        """Remove every ride from the park and send guests back to choosing a ride."""
+        self.rides = []
+        self._update_ride_arrays()
+        self.guests['target'][:] = -1
+        self.guests['last_ride'][:] = -1
+        self.guests['ride_timer'][:] = 0
+        self.guests['queued'][:] = False
+
+    def _update_ride_arrays(self):
+        """Cache ride attributes as arrays for the vectorized step."""
+        self.ride_x = np.array([ride.pos[0] for ride in self.rides], dtype=np.int32)
+        self.ride_y = np.array([ride.pos[1] for ride in self.rides], dtype=np.int32)
+        self.ride_capacity = np.array([ride.capacity for ride in self.rides], dtype=np.int64)
+        self.ride_service_time = np.array([ride.service_time for ride in self.rides], dtype=np.int32)
+        # Step the next cycle can board, per replica and ride (index replica * n_rides + ride)
+        self.ride_next_boarding = np.zeros(self.replicas * len(self.rides), dtype=np.int64)
+        self.ride_weights = np.array([1 / ride.popularity_rank for ride in self.rides], dtype=float)
+        # Only ride positions that are not cached yet are routed
+        self.ride_moves = self.routing.stack([ride.pos for ride in self.rides])
+
+    def is_restricted(self, x, y):
+        """Check if a position is within the restricted area.
+
+        Args:
+            x (int): X-coordinate to check.
+            y (int): Y-coordinate to check.
+
+        Returns:
+            bool: True if position is restricted, False otherwise.
+        """
+        if self.grid.out_of_bounds((x, y)):
+            return False
+        return not self.walkable[x, y]
+
+    def add_guests(self, count):
+        """Place a batch of new guests at the park entrance.
+
+        Args:
+            count (int or np.ndarray): Number of guests to add to every replica, or one count
+                per replica.
+        """
+        counts = np.clip(np.broadcast_to(np.asarray(count, dtype=np.int64), (self.replicas,)), 0, None)
+        count = int(counts.sum())
+        if count <= 0:
+            return
+        new_guests = {
+            'x': np.full(count, self.start_pos[0]),
+            'y': np.full(count, self.start_pos[1]),
+            'target': np.full(count, -1),
+            'last_ride': np.full(count, -1),
+            'ride_timer': np.zeros(count),
+            'leave_timer': self.rng.normal(loc=360, scale=90, size=count).round(2),
+            'leaving': np.zeros(count, dtype=bool),
+            'queued': np.zeros(count, dtype=bool),
+            'queue_since': np.zeros(count),
+            'failed_attempts': np.zeros(count),
+            'rides_completed': np.zeros(count),
+            'replica': np.repeat(np.arange(self.replicas), counts),
+        }
+        for field, dtype in self.GUEST_FIELDS.items():
+            self.guests[field] = np.concatenate([self.guests[field], new_guests[field].astype(dtype)])
+        self.occupancy[self.start_pos] += count
+        self.guests_entered += count
+        self.replica_entered += counts
+
+    def remove_guests(self):
+        """Remove every guest from the park, leaving the rides in place."""
+        self.guests = {field: np.empty(0, dtype=dtype) for field, dtype in self.GUEST_FIELDS.items()}
+        self.occupancy[:] = 0
+
+    def _keep_guests(self, keep):
+        """Drop every guest whose entry in the boolean mask `keep` is False."""
+        self.guests = {field: values[keep] for field, values in self.guests.items()}
+
+    def guest_statistics(self):
+        """Aggregate ride statistics over the guests currently in the park.
+
+        Returns:
+            dict: guests_entered, total_guests, failed_attempts and rides_completed.
+        """
+        return {
+            'guests_entered': self.guests_entered,
+            'total_guests': len(self.guests['x']),
+            'failed_attempts': int(self.guests['failed_attempts'].sum()),
+            'rides_completed': int(self.guests['rides_completed'].sum()),
+        }
+
+    def replica_statistics(self):
+        """Aggregate ride statistics separately for every replica.
+
+        Returns:
+            dict: guests_entered, total_guests, failed_attempts and rides_completed, each an
+            array with one entry per replica.
+        """
+        replica = self.guests['replica']
+        return {
+            'guests_entered': self.replica_entered.copy(),
+            'total_guests': np.bincount(replica, minlength=self.replicas),
+            'failed_attempts': np.bincount(replica, weights=self.guests['failed_attempts'],
+                                           minlength=self.replicas).astype(np.int64),
+            'rides_completed': np.bincount(replica, weights=self.guests['rides_completed'],
+                                           minlength=self.replicas).astype(np.int64),
+        }
+
+    def get_total_guests(self):
+        """Get the total number of guests that have entered the park.
+
+        Returns:
+            int: Total count of guests entered.
+        """
+        return self.guests_entered
+
+    def get_state(self):
+        """Capture the full simulation state as plain values and NumPy arrays.
+
+        Use snapshot.snapshot() for the compact binary form.
+
+        Returns:
+            dict: State accepted by ThemeParkArrayModel.from_state().
+        """
+        return {
+            'backend': type(self).__name__,
+            'park': {
+                'width': self.grid.width,
+                'height': self.grid.height,
+                'restricted_bottom_left': self.restricted_bottom_left,
+                'restricted_top_right': self.restricted_top_right,
+                'guest_inflow_type': self.guest_inflow_type,
+                'replicas': self.replicas,
+            },
+            'clock': {'steps': self.steps},
+            'counters': {'guests_entered': self.guests_entered, 'guests_left': self.guests_left,
+                         'replica_entered': self.replica_entered.copy()},
+            'rides': [{
+                'unique_id': ride.unique_id, 'name': ride.name, 'pos': ride.pos,
+                'capacity': ride.capacity, 'service_time': ride.service_time,
+                'popularity_rank': ride.popularity_rank,
+                'queue_lengths': list(ride.queue_lengths), 'wait_times': list(ride.wait_times),
+            } for ride in self.rides],
+            'ride_next_boarding': self.ride_next_boarding.copy(),
+            'guests': {field: values.copy() for field, values in self.guests.items()},
+            'density': {'occupancy': self.occupancy.copy(), 'cumulative_density': self.cumulative_density.copy(),
+                        'density_steps': self.density_steps},
+            'rng': {'numpy': self.rng.bit_generator.state},
+        }
+
+    @classmethod
+    def from_state(cls, state, restore_rng=True, routing=None, seed=None):
+        """Rebuild a model from get_state(), continuing exactly where the original left off.
+
+        Args:
+            state (dict): State from get_state().
+            restore_rng (bool): Also restore the model's random generator, so the rebuilt
+                model repeats the original's future.
+            routing (RoutingTable): Routing cache of a model on the same park to share
+                instead of routing the rides again.
+            seed (int): Seed of the rebuilt model's generator when `restore_rng` is False.
+
+        Returns:
+            ThemeParkArrayModel: Independent copy of the captured model.
+        """
+        model = cls(**state['park'], seed=seed)
+        if routing is not None:
+            model.routing = routing
+            model.exit_moves = routing.moves_to(model.start_pos)
+        model.rides = []
+        for record in state['rides']:
+            ride = ArrayRide(record['unique_id'], record['name'], record['pos'], record['capacity'],
+                             record['service_time'], record['popularity_rank'])
+            ride.queue_lengths = list(record['queue_lengths'])
+            ride.wait_times = list(record['wait_times'])
+            model.rides.append(ride)
+        model._update_ride_arrays()
+        model.ride_next_boarding = state['ride_next_boarding'].copy()
+        model.guests = {field: values.copy() for field, values in state['guests'].items()}
+        model.steps = state['clock']['steps']
+        model.guests_entered = state['counters']['guests_entered']
+        model.guests_left = state['counters']['guests_left']
+        model.replica_entered = state['counters']['replica_entered'].copy()
+        model.occupancy = state['density']['occupancy'].copy()
+        model.cumulative_density = state['density']['cumulative_density'].copy()
+        model.density_steps = state['density']['density_steps']
+        if restore_rng:
+            model.rng.bit_generator.state = state['rng']['numpy']
+        return model
+
+    def _new_guest_count(self):
+        """Number of guests arriving this step, from the inflow schedule or at random.
+
+        With several replicas the scheduled count is the Poisson rate of each replica's own
+        draw, so replicas stay independent in their arrivals too.
+        """
+        if self.arrivals is not None and self.steps < len(self.arrivals):
+            if self.replicas > 1:
+                return self.rng.poisson(self.arrivals[self.steps], size=self.replicas).astype(np.int64)
+            return int(self.arrivals[self.steps])
+        if self.replicas > 1:  # Independent arrivals for every replica
+            return np.trunc(self.rng.normal(100, 25, size=self.replicas).round(2)).astype(np.int64)
+        return int(round(self.rng.normal(100, 25), 2))
+
+    def step(self):
+        """Advance the model by one time step.
+
+        Handles:
+        - New guest arrivals (either scheduled or random)
+        - Guest departures, ride countdowns, ride choice and movement for all guests at once
+        - Ride boarding from every queue
+        """
+        self.add_guests(self._new_guest_count())
+        self._advance_guests()
+        self._board_rides()
+        self.record_density()
+        self.steps += 1
+
+        # Reset counter for next step
+        self.guests_left = 0
+
+    def _advance_guests(self):
+        """Apply one GuestAgent.step to every guest using array operations."""
+        g = self.guests
+
+        # Leaving guests standing on the entrance exit the park
+        at_start = (g['x'] == self.start_pos[0]) & (g['y'] == self.start_pos[1])
+        exiting = g['leaving'] & at_start
+        if exiting.any():
+            self.guests_left += int(exiting.sum())
+            self.occupancy[self.start_pos] -= int(exiting.sum())
+            self._keep_guests(~exiting)
+            g = self.guests
+
+        leaving = g['leaving']
+        riding = g['ride_timer'] > 0
+
+        # Riders count down and pick a new ride once they get off
+        g['ride_timer'][riding] -= 1
+        finished = riding & (g['ride_timer'] == 0)
+        g['rides_completed'][finished] += 1
+        g['target'][finished] = -1
+
+        active = ~leaving & ~riding
+        self._choose_rides(np.flatnonzero(active & (g['target'] < 0)))
+
+        # Queued guests hold their place; everyone else walks one cell
+        walking = np.flatnonzero(active & ~g['queued'] & (g['target'] >= 0))
+        self._move(walking, self.ride_moves[g['target'][walking], g['x'][walking], g['y'][walking]])
+        exiters = np.flatnonzero(leaving)
+        self._move(exiters, self.exit_moves[g['x'][exiters], g['y'][exiters]])
+
+        targets = g['target'][walking]
+        arrived = walking[(g['x'][walking] == self.ride_x[targets]) & (g['y'][walking] == self.ride_y[targets])]
+        self._arrive_at_rides(arrived)
+
+        # Time in the park runs out for everyone who is not riding or already leaving
+        g['leave_timer'][active] -= 1
+        decided = active & (g['leave_timer'] <= 0)
+        g['leaving'][decided] = True
+        g['queued'][decided] = False
+        g['target'][decided] = -1
+
+    def _choose_rides(self, idx):
+        """Pick a ride for each guest in `idx`, weighted by 1/popularity_rank, excluding their last ride."""
+        if not len(self.rides) or not len(idx):
+            return
+        choices = sample_rides(self.rng, self.ride_weights, self.guests['last_ride'][idx])
+        can_choose = choices >= 0
+        self.guests['target'][idx[can_choose]] = choices[can_choose]
+
+    def _move(self, idx, moves):
+        """Move each guest in `idx` one cell along the next hop looked up in the routing tables.
+
+        Args:
+            idx (np.ndarray): Indices of the guests to move.
+            moves (np.ndarray): Index into MOVES for each guest, or STAY.
+        """
+        moving = moves != STAY
+        idx, moves = idx[moving], moves[moving]
+        self.occupancy -= self._cell_counts(idx)
+        self.guests['x'][idx] += MOVES[moves, 0].astype(np.int32)
+        self.guests['y'][idx] += MOVES[moves, 1].astype(np.int32)
+        self.occupancy += self._cell_counts(idx)
+
+    def _cell_counts(self, idx):
+        """Number of the guests in `idx` standing on each cell, as a (width, height) array."""
+        width, height = self.grid.width, self.grid.height
+        cells = self.guests['x'][idx].astype(np.int64) * height + self.guests['y'][idx]
+        return np.bincount(cells, minlength=width * height).reshape(width, height)
+
+    def _arrive_at_rides(self, idx):
+        """Join each arriving guest to their ride's queue, or count a failed attempt if it is full."""
+        if not len(idx):
+            return
+        g = self.guests
+        queued = np.flatnonzero(g['queued'])
+        queue_lengths = np.bincount(self._queue_lanes(queued), minlength=self.replicas * len(self.rides))
+
+        # Simultaneous arrivals at the same ride join in random order
+        idx = self.rng.permutation(idx)
+        targets = g['target'][idx]
+        lanes = self._queue_lanes(idx)
+        position = queue_lengths[lanes] + rank_within_groups(lanes)
+        joins = position < self.ride_capacity[targets] * 3
+
+        joined, rejected = idx[joins], idx[~joins]
+        g['queued'][joined] = True
+        g['queue_since'][joined] = self.steps
+        g['last_ride'][joined] = g['target'][joined]
+        g['failed_attempts'][rejected] += 1
+        g['target'][rejected] = -1
+
+        for ride_idx in np.unique(targets[joins]):
+            self.rides[ride_idx].queue_lengths.extend(position[joins & (targets == ride_idx)].tolist())
+
+    def _queue_lanes(self, idx):
+        """Queue of each guest in `idx`: the target ride within the guest's replica."""
+        return self.guests['replica'][idx] * len(self.rides) + self.guests['target'][idx]
+
+    def _board_rides(self):
+        """Run one boarding cycle on every ride whose previous cycle has finished.
+
+        Each cycle loads up to `capacity` queued guests first-come first-served, and the ride
+        cannot board again for `service_time` steps. Wait times are measured on `self.steps`,
+        the single clock shared by all rides.
+        """
+        g = self.guests
+        queued = np.flatnonzero(g['queued'])
+        if not len(queued):
+            return
+        n_rides = len(self.rides)
+        free_seats = np.where(self.ride_next_boarding <= self.steps, np.tile(self.ride_capacity, self.replicas), 0)
+
+        # Earliest arrivals first, ties broken at random
+        order = np.lexsort((self.rng.random(len(queued)), g['queue_since'][queued]))
+        queued = queued[order]
+        targets = g['target'][queued]
+        lanes = self._queue_lanes(queued)
+        boards = rank_within_groups(lanes) < free_seats[lanes]
+
+        boarding = queued[boards]
+        g['queued'][boarding] = False
+        g['ride_timer'][boarding] = self.ride_service_time[g['target'][boarding]]
+
+        departed = np.unique(lanes[boards])
+        self.ride_next_boarding[departed] = self.steps + self.ride_service_time[departed % n_rides]
+
+        wait_times = self.steps - g['queue_since'][boarding]
+        for ride_idx in np.unique(targets[boards]):
+            self.rides[ride_idx].wait_times.extend(wait_times[targets[boards] == ride_idx].tolist())
@@ -0,0 +1,116 @@
+import time
+import pandas as pd
+from objects import *
+from optimisation import *
+from array_model import ThemeParkArrayModel
+
+
+def add_sample_rides(model, num_rides):
+    """Place `num_rides` rides with typical attributes at random valid positions.
+
+    Args:
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model to add the rides to.
+        num_rides (int): Number of rides to add.
+    """
+    positions = set()
+    while len(positions) < num_rides:
+        positions.add(generate_valid_position(model))
+    for rank, pos in enumerate(sorted(positions), start=1):
+        model.add_ride(name=str(rank), pos=pos, capacity=20, service_time=5, popularity_rank=rank)
+
+
+def benchmark_guest_spawning(model_class=ThemeParkGridModel, populations=(0, 1000, 2000, 4000, 8000),
+                             arrivals=100, repeats=5, width=15, height=15, num_rides=8):
+    """Time one step's guest arrivals and one full step as the park fills up.
+
+    With the monotonic guest ID allocator, spawning a step's arrivals costs the same whatever
+    the number of guests already in the park, so `spawn_ms` should stay flat.
+
+    Args:
+        model_class (type): ThemeParkGridModel or ThemeParkArrayModel.
+        populations (tuple): Guest counts already in the park before timing.
+        arrivals (int): Guests spawned per step.
+        repeats (int): Number of timed spawns and steps to average over.
+        width (int): Grid width in cells.
+        height (int): Grid height in cells.
+        num_rides (int): Number of rides in the park.
+
+    Returns:
+        pd.DataFrame: One row per population with mean spawn and step times in milliseconds.
+    """
+    results = []
+    for population in populations:
+        model = model_class(width, height)
+        add_sample_rides(model, num_rides)
+        model.add_guests(population)
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model.add_guests(arrivals)
+        spawn_ms = (time.perf_counter() - start) / repeats * 1000
+
+        start = time.perf_counter()
+        for _ in range(repeats):
+            model.step()
+        step_ms = (time.perf_counter() - start) / repeats * 1000
+
+        results.append({
+            'model': model_class.__name__,
+            'guests': population,
+            'spawn_ms': spawn_ms,
+            'step_ms': step_ms,
+            'step_us_per_guest': step_ms * 1000 / max(model.get_total_guests(), 1),
+        })
+    return pd.DataFrame(results)
+
+
+def benchmark_scaling(model_class=ThemeParkArrayModel, grid_sizes=(15, 50, 100), populations=(1000, 10000, 50000),
+                      steps=10, warmup=3, num_rides=20):
+    """Measure simulation speed across park sizes and guest counts.
+
+    Each park is square with one restricted block covering the middle third of its lower
+    half, so guests have to route around it.
+
+    Args:
+        model_class (type): ThemeParkGridModel or ThemeParkArrayModel.
+        grid_sizes (tuple): Side lengths of the square parks in cells.
+        populations (tuple): Guests in the park when timing starts.
+        steps (int): Number of timed steps.
+        warmup (int): Untimed steps run first so guests spread out from the entrance.
+        num_rides (int): Number of rides in the park.
+
+    Returns:
+        pd.DataFrame: One row per grid size and population with steps per second and the
+        cost per guest per step in microseconds.
+    """
+    results = []
+    for size in grid_sizes:
+        for population in populations:
+            model = model_class(size, size, (size // 3, size // 6), (2 * size // 3, size // 2))
+            add_sample_rides(model, min(num_rides, len(model.walkable_cells)))
+            model.add_guests(population)
+            for _ in range(warmup):
+                model.step()
+
+            start = time.perf_counter()
+            for _ in range(steps):
+                model.step()
+            elapsed = time.perf_counter() - start
+
+            guests = model.guest_statistics()['total_guests']
+            results.append({
+                'model': model_class.__name__,
+                'grid': f"{size}x{size}",
+                'guests': guests,
+                'steps_per_second': steps / elapsed,
+                'step_us_per_guest': elapsed / steps * 1e6 / max(guests, 1),
+            })
+    return pd.DataFrame(results)
+
+
+if __name__ == "__main__":
+    for model_class in (ThemeParkGridModel, ThemeParkArrayModel):
+        print(benchmark_guest_spawning(model_class).to_string(index=False))
+    # The agent-based model is timed up to 10k guests; the array model up to 50k
+    print(benchmark_scaling(ThemeParkGridModel, populations=(1000, 10000)).to_string(index=False))
+    print(benchmark_scaling(ThemeParkArrayModel).to_string(index=False))
@@ -0,0 +1,54 @@
+import numpy as np
+from scipy import stats
+
+
+def confidence_interval(samples, confidence=0.95):
+    """Mean and Student-t confidence interval half-width of a set of replications.
+
+    Args:
+        samples (array-like): Independent replication results.
+        confidence (float): Confidence level of the interval.
+
+    Returns:
+        tuple: (mean, half_width). The half-width is infinite with fewer than two samples.
+    """
+    samples = np.asarray(samples, dtype=float)
+    mean = float(samples.mean())
+    if len(samples) < 2:
+        return mean, float('inf')
+    sem = samples.std(ddof=1) / np.sqrt(len(samples))
+    return mean, float(stats.t.ppf((1 + confidence) / 2, len(samples) - 1) * sem)
+
+
+def adaptive_ensemble(sample_batch, replications=8, target_half_width=None, max_replications=64, confidence=0.95):
+    """Run replications in batches until the confidence interval of the mean is tight enough.
+
+    The first batch runs `replications` replications. Without a `target_half_width` that is
+    the whole ensemble; otherwise further batches of the same size run until the interval
+    half-width drops to the target or `max_replications` is reached.
+
+    Args:
+        sample_batch (callable): Takes a batch size and returns that many independent samples.
+        replications (int): Replications per batch.
+        target_half_width (float): Stop once the half-width is at most this, or None.
+        max_replications (int): Upper bound on the total number of replications.
+        confidence (float): Confidence level of the interval.
+
+    Returns:
+        dict: mean, half_width, ci_low, ci_high, std, replications and the samples.
+    """
+    samples = np.asarray(sample_batch(replications), dtype=float)
+    mean, half_width = confidence_interval(samples, confidence)
+    while target_half_width is not None and half_width > target_half_width and len(samples) < max_replications:
+        batch = min(replications, max_replications - len(samples))
+        samples = np.concatenate([samples, np.asarray(sample_batch(batch), dtype=float)])
+        mean, half_width = confidence_interval(samples, confidence)
+    return {
+        'mean': mean,
+        'half_width': half_width,
+        'ci_low': mean - half_width,
+        'ci_high': mean + half_width,
+        'std': float(samples.std(ddof=1)) if len(samples) > 1 else 0.0,
+        'replications': len(samples),
+        'samples': samples,
+    }
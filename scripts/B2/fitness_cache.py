@@ -0,0 +1,127 @@
+import os
+import pickle
+from collections import OrderedDict
+from inflow import inflow_arrivals
+
+
+def canonical_layout(individual):
+    """Order-independent form of a ride layout.
+
+    Args:
+        individual (list): List of (ride_index, position) pairs.
+
+    Returns:
+        tuple: Sorted (ride_index, (x, y)) tuples with plain Python ints.
+    """
+    return tuple(sorted((int(ride_idx), (int(pos[0]), int(pos[1]))) for ride_idx, pos in individual))
+
+
+def fitness_key(individual, possible_rides, config, seed):
+    """Build the cache key of one fitness evaluation.
+
+    Besides the canonical layout and the evaluation seed, the key holds the attributes of the
+    placed rides (service times are drawn per run) and the park layout, so an entry is only
+    reused for an identical simulation.
+
+    Args:
+        individual (list): List of (ride_index, position) pairs.
+        possible_rides (list): List of available ride configurations.
+        config (dict): Park description from park_config().
+        seed (int): Evaluation seed, or None for an unseeded evaluation.
+
+    Returns:
+        tuple: Hashable, picklable cache key.
+    """
+    layout = canonical_layout(individual)
+    rides = tuple(
+        (str(possible_rides[ride_idx]['name']),
+         float(possible_rides[ride_idx]['capacity']),
+         float(possible_rides[ride_idx]['service_time']),
+         float(possible_rides[ride_idx]['popularity_rank']))
+        for ride_idx, _ in layout
+    )
+    inflow = inflow_arrivals(config['guest_inflow_type'])
+    park = (
+        config['backend'],
+        config['width'],
+        config['height'],
+        repr(config['restricted_bottom_left']),
+        repr(config['restricted_top_right']),
+        None if inflow is None else tuple(inflow.tolist()),
+    )
+    return (layout, rides, park, seed)
+
+
+class FitnessCache:
+    """LRU cache of GA fitness values, optionally persisted to disk between runs.
+
+    Keys hold the evaluation seed, which is derived from the GA run's master seed, so the
+    cache deduplicates evaluations within one run; a persisted cache is only reused by a
+    repeat of the same seeded run.
+
+    Attributes:
+        max_size (int): Maximum number of entries kept; the least recently used are evicted.
+        path (str): Pickle file the cache is loaded from and saved to, or None.
+        entries (OrderedDict): Fitness tuples keyed by fitness_key(), least recently used first.
+        hits (int): Lookups answered from the cache.
+        misses (int): Lookups that needed a simulation.
+    """
+    def __init__(self, max_size=100000, path=None):
+        """Create the cache, loading any entries previously saved at `path`.
+
+        Args:
+            max_size (int): Maximum number of entries kept.
+            path (str): Optional pickle file to persist the cache to.
+        """
+        self.max_size = max_size
+        self.path = path
+        self.entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if path is not None and os.path.exists(path):
+            with open(path, 'rb') as f:
+                self.entries = pickle.load(f)
+            self._evict()
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, key):
+        """Look up a fitness value, marking it as recently used.
+
+        Args:
+            key (tuple): Key from fitness_key().
+
+        Returns:
+            tuple: Cached fitness, or None if the layout has not been evaluated.
+        """
+        if key in self.entries:
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return self.entries[key]
+        self.misses += 1
+        return None
+
+    def put(self, key, fitness):
+        """Store a fitness value, evicting the least recently used entries if full.
+
+        Args:
+            key (tuple): Key from fitness_key().
+            fitness (tuple): Fitness values of the layout.
+        """
+        self.entries[key] = tuple(float(value) for value in fitness)
+        self.entries.move_to_end(key)
+        self._evict()
+
+    def _evict(self):
+        while len(self.entries) > self.max_size:
+            self.entries.popitem(last=False)
+
+    def save(self):
+        """Write the cache to `path`, replacing the previous file atomically."""
+        if self.path is None:
+            return
+        tmp_path = f"{self.path}.tmp"
+        with open(tmp_path, 'wb') as f:
+            pickle.dump(self.entries, f)
+        os.replace(tmp_path, self.path)
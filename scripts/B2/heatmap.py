@@ -3,18 +3,13 @@ import matplotlib.pyplot as plt
 import numpy as np
 
 # Function to plot heatmap and rides
-def plot_combined_heatmap_and_rides_normalized(model):
-    '''Create a grid to track guest positions using a heatmap. Given the size, the value is normalised. Output a fig of the heatmap'''
+def plot_combined_heatmap_and_rides_normalized(model, cumulative=False):
+    '''Create a grid to track guest positions using a heatmap. Given the size, the value is normalised. Output a fig of the heatmap.
+    With cumulative=True the heatmap shows the average guest density over every step so far instead of the current step'''
     fig, ax = plt.subplots(figsize=(10, 8))
     
-    # Create heatmap grid
-    heatmap = np.zeros((model.grid.width, model.grid.height))
-    
-    # Count guest positions
-    for agent in model.schedule.agents:
-        if isinstance(agent, GuestAgent):
-            x, y = agent.pos
-            heatmap[x][y] += 1
+    # Read the model's occupancy counts (no scan over the agents)
+    heatmap = model.density_heatmap() if cumulative else model.guest_heatmap()
 
     # Normalize
     if np.max(heatmap) > 0:
@@ -0,0 +1,131 @@
+import os
+import numpy as np
+import pandas as pd
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'B3')
+ATTENDANCE_PATH = os.path.join(DATA_DIR, 'attendance.csv')
+HOURLY_PEAKS_PATH = os.path.join(DATA_DIR, 'park_daily_hourly_peaks.csv')
+
+
+def hourly_profile(day_of_week, hourly_peaks_path=HOURLY_PEAKS_PATH):
+    """Share of a day's guests arriving in each opening hour.
+
+    The shares are proportional to the park's hourly peak fractions for that day of the week.
+
+    Args:
+        day_of_week (int): 1 (Monday) to 7 (Sunday), as in park_daily_hourly_peaks.csv.
+        hourly_peaks_path (str): CSV with day, hour and peak_frc columns.
+
+    Returns:
+        pd.Series: Shares indexed by opening hour, summing to 1.
+    """
+    peaks = pd.read_csv(hourly_peaks_path, encoding='utf-8-sig')
+    day = peaks[peaks['day'] == day_of_week].set_index('hour')['peak_frc'].sort_index()
+    return day / day.sum()
+
+
+def daily_attendance(date, facility='Tivoli Gardens', attendance_path=ATTENDANCE_PATH):
+    """Recorded attendance of a park on one date.
+
+    Args:
+        date (str or datetime): Date to look up.
+        facility (str): FACILITY_NAME in attendance.csv.
+        attendance_path (str): CSV with USAGE_DATE, FACILITY_NAME and attendance columns.
+
+    Returns:
+        int: Guests on that date.
+    """
+    attendance = pd.read_csv(attendance_path, parse_dates=['USAGE_DATE'])
+    match = attendance[(attendance['USAGE_DATE'] == pd.Timestamp(date)) & (attendance['FACILITY_NAME'] == facility)]
+    if match.empty:
+        raise ValueError(f"No attendance recorded for {facility} on {date}")
+    return int(match['attendance'].iloc[0])
+
+
+class InflowSchedule:
+    """Guest arrivals per model step, precompiled from an hourly demand curve.
+
+    Pass it as `guest_inflow_type` to ThemeParkGridModel or ThemeParkArrayModel. Every step
+    reads its arrivals from `arrivals`; after the last step the models fall back to their
+    random inflow.
+
+    Attributes:
+        arrivals (np.ndarray): int64 guests arriving at each step.
+        steps_per_hour (int): Model steps per hour of park time.
+        start_hour (int): Hour of the day the first step falls in.
+    """
+    def __init__(self, arrivals, steps_per_hour=60, start_hour=0):
+        """Wrap an arrivals array.
+
+        Args:
+            arrivals (array-like): Guests arriving at each step.
+            steps_per_hour (int): Model steps per hour of park time.
+            start_hour (int): Hour of the day the first step falls in.
+        """
+        self.arrivals = np.asarray(arrivals, dtype=np.int64)
+        self.steps_per_hour = steps_per_hour
+        self.start_hour = start_hour
+
+    def __len__(self):
+        return len(self.arrivals)
+
+    @classmethod
+    def from_hourly_curve(cls, hourly_guests, steps_per_hour=60, scale=1.0, rng=None):
+        """Sample arrivals from an hourly demand curve as a Poisson process.
+
+        Each hour's expected guests are spread evenly over its steps and every step's
+        arrivals are drawn in one vectorized Poisson sample.
+
+        Args:
+            hourly_guests (pd.Series): Expected guests per hour, indexed by consecutive hours.
+            steps_per_hour (int): Model steps per hour of park time.
+            scale (float): Factor from real guests to simulated guests.
+            rng (np.random.Generator): Random generator; a freshly seeded one if None.
+
+        Returns:
+            InflowSchedule: Arrivals for every step of the curve's hours.
+        """
+        rng = np.random.default_rng() if rng is None else rng
+        rates = np.repeat(np.asarray(hourly_guests, dtype=float) * scale / steps_per_hour, steps_per_hour)
+        return cls(rng.poisson(rates), steps_per_hour, int(hourly_guests.index[0]))
+
+    @classmethod
+    def for_day(cls, daily_guests, day_of_week, steps_per_hour=60, scale=1.0, rng=None,
+                hourly_peaks_path=HOURLY_PEAKS_PATH):
+        """Arrivals of one operating day from a daily demand figure.
+
+        `daily_guests` can be recorded attendance (see daily_attendance()) or a B1 demand
+        forecast for the day.
+
+        Args:
+            daily_guests (float): Guests expected over the day.
+            day_of_week (int): 1 (Monday) to 7 (Sunday).
+            steps_per_hour (int): Model steps per hour of park time.
+            scale (float): Factor from real guests to simulated guests.
+            rng (np.random.Generator): Random generator; a freshly seeded one if None.
+            hourly_peaks_path (str): CSV with the hourly profile of each day of the week.
+
+        Returns:
+            InflowSchedule: Arrivals for every step from opening to closing.
+        """
+        curve = hourly_profile(day_of_week, hourly_peaks_path) * daily_guests
+        return cls.from_hourly_curve(curve, steps_per_hour, scale, rng)
+
+
+def inflow_arrivals(guest_inflow_type):
+    """Compile a model's `guest_inflow_type` into an arrivals array, once per model.
+
+    Args:
+        guest_inflow_type (InflowSchedule or pd.DataFrame): Schedule, or DataFrame with a
+            GuestCount column holding one row per step. None for random inflow.
+
+    Returns:
+        np.ndarray: int64 arrivals per step, or None if there is no usable schedule.
+    """
+    if guest_inflow_type is None:
+        return None
+    if isinstance(guest_inflow_type, InflowSchedule):
+        return guest_inflow_type.arrivals
+    if 'GuestCount' not in guest_inflow_type:
+        return None
+    return guest_inflow_type['GuestCount'].to_numpy().astype(np.int64)
@@ -0,0 +1,323 @@
+import os
+import threading
+import time
+from collections import OrderedDict
+import numpy as np
+import pandas as pd
+from objects import *
+from optimisation import *
+from render import capture_frame, encode_frame
+from pareto import ParetoFront
+
+RANKING_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'B2', 'tivoli_attr_ranking.csv')
+# Pareto fronts written by run_scenarios(..., engine_config={'objectives': 'pareto'})
+FRONTS_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', '..', 'data', 'B2', 'pareto_fronts')
+
+# Park layouts the Streamlit page offers, as in MODEL_CONFIGS of the batch scripts
+PARK_CONFIGS = {
+    'model1': {  # Small park with central restricted area
+        'width': 9,
+        'height': 9,
+        'restricted_bottom_left': (2, 2),
+        'restricted_top_right': (6, 6)
+    },
+    'model2': {  # Medium park with no restricted areas
+        'width': 9,
+        'height': 9,
+        'restricted_bottom_left': None,
+        'restricted_top_right': None
+    },
+    'model3': {  # Large park with multiple restricted zones
+        'width': 15,
+        'height': 15,
+        'restricted_bottom_left': (1, 2),
+        'restricted_top_right': (3, 6)
+    }
+}
+
+
+class SimulationJob:
+    """One park simulation running in a background thread and publishing heatmap frames.
+
+    The job optimises the ride layout, then runs ThemeParkGridModel for `steps` steps and
+    appends a PNG heatmap every `frame_every` steps to `frames` as soon as it is rendered.
+    Readers wait for new frames with wait_for_frames() instead of polling files.
+
+    Attributes:
+        key (tuple): (model_name, num_rides, steps, frame_every, seed) identifying the run.
+        frames (list): (step, png bytes) pairs published so far.
+        status (str): 'queued', 'optimising', 'running', 'done', 'cancelled' or 'failed'.
+        progress (float): Share of the simulation steps completed, from 0 to 1.
+        error (str): Error message of a failed job, or None.
+        seconds (float): Run time of a finished job.
+        subscribers (set): Readers following the job through SimulationCache; the cache
+            only cancels the job once the last one leaves.
+    """
+    FINISHED = ('done', 'cancelled', 'failed')
+
+    def __init__(self, model_name, num_rides, steps=71, frame_every=10, seed=0, ranking=None,
+                 search_backend='ThemeParkArrayModel', cell_size=32):
+        """Prepare a job without starting it.
+
+        Args:
+            model_name (str): Key of PARK_CONFIGS.
+            num_rides (int): Number of top-ranked rides to place (at least 3).
+            steps (int): Simulation steps to run with the optimised layout.
+            frame_every (int): Publish a heatmap every this many steps.
+            seed (int): Seed of the ride service times, the layout search and the simulation.
+            ranking (pd.DataFrame): Ride popularity and capacity data; read from RANKING_PATH if None.
+            search_backend (str): Backend the layout search runs on. The faster
+                'ThemeParkArrayModel' has the same behaviour as ThemeParkGridModel.
+            cell_size (int): Side of one grid cell in pixels in the frames.
+        """
+        self.key = (model_name, num_rides, steps, frame_every, seed)
+        self.model_name = model_name
+        self.num_rides = num_rides
+        self.steps = steps
+        self.frame_every = frame_every
+        self.seed = seed
+        self.ranking = ranking
+        self.search_backend = search_backend
+        self.cell_size = cell_size
+        self.frames = []
+        self.status = 'queued'
+        self.progress = 0.0
+        self.error = None
+        self.seconds = None
+        self.subscribers = set()
+        self._cancel = threading.Event()
+        self._changed = threading.Condition()
+        self._thread = None
+
+    @property
+    def finished(self):
+        """True once the job is done, cancelled or failed."""
+        return self.status in self.FINISHED
+
+    def start(self):
+        """Start the simulation in a daemon thread.
+
+        Returns:
+            SimulationJob: The job itself.
+        """
+        self._thread = threading.Thread(target=self._run, name=f"simulation-{self.model_name}-{self.num_rides}",
+                                        daemon=True)
+        self._thread.start()
+        return self
+
+    def cancel(self):
+        """Ask the job to stop; it stops after the current layout search generation or simulation step.
+
+        This stops the job for every reader. Readers sharing a job through SimulationCache
+        should call SimulationCache.unsubscribe() instead.
+        """
+        self._cancel.set()
+
+    def wait_for_frames(self, seen, timeout=None):
+        """Wait until there are more than `seen` frames or the job has finished.
+
+        Args:
+            seen (int): Number of frames the caller already has.
+            timeout (float): Give up after this many seconds, or None to wait indefinitely.
+
+        Returns:
+            list: The (step, png bytes) frames after the first `seen`.
+        """
+        with self._changed:
+            self._changed.wait_for(lambda: len(self.frames) > seen or self.finished, timeout)
+            return self.frames[seen:]
+
+    def join(self, timeout=None):
+        """Wait for the job thread to end.
+
+        Args:
+            timeout (float): Give up after this many seconds, or None to wait indefinitely.
+        """
+        if self._thread is not None:
+            self._thread.join(timeout)
+
+    def _publish(self, **changes):
+        """Update the job's attributes and wake every waiting reader."""
+        with self._changed:
+            for name, value in changes.items():
+                setattr(self, name, value)
+            self._changed.notify_all()
+
+    def _run(self):
+        """Body of the job thread: search the layout, then simulate and render the frames."""
+        started = time.perf_counter()
+        try:
+            self._publish(status='optimising')
+            model, rides = self._build_park()
+            if self._cancel.is_set():
+                self._finish('cancelled', started)
+                return
+
+            self._publish(status='running')
+            frames = []
+            for step in range(self.steps):
+                if self._cancel.is_set():
+                    self._finish('cancelled', started)
+                    return
+                model.step()
+                if step % self.frame_every == 0:
+                    frames = frames + [(step, encode_frame(capture_frame(model, rides), self.cell_size))]
+                    self._publish(frames=frames, progress=(step + 1) / self.steps)
+                else:
+                    self.progress = (step + 1) / self.steps
+            self._finish('done', started, progress=1.0)
+        except Exception as e:
+            self._finish('failed', started, error=str(e))
+
+    def _finish(self, status, started, **changes):
+        """Publish a final status together with the run time, so readers of a finished job see both."""
+        self._publish(status=status, seconds=time.perf_counter() - started, **changes)
+
+    def _build_park(self):
+        """Optimise the ride layout and build the model to simulate.
+
+        Returns:
+            tuple: ThemeParkGridModel with the optimised rides, and its (x, y, label) ride markers.
+        """
+        ranking = self.ranking if self.ranking is not None else pd.read_csv(RANKING_PATH)
+        rng = np.random.default_rng(self.seed)
+        top_rides = ranking.sort_values('Ranking').head(self.num_rides)
+        possible_rides = [{
+            "name": str(row['Ranking']),
+            "capacity": row['CAPACITY'],
+            "service_time": int(rng.integers(5, 11)),
+            "popularity_rank": row['Ranking']
+        } for _, row in top_rides.iterrows()]
+
+        config = PARK_CONFIGS[self.model_name]
+        park = {'width': config['width'], 'height': config['height'],
+                'restricted_bottom_left': config['restricted_bottom_left'],
+                'restricted_top_right': config['restricted_top_right'], 'guest_inflow_type': None}
+        search_model = build_model({**park, 'backend': self.search_backend}, seed=self.seed)
+        layout = optimize_ride_placement(search_model, possible_rides, self.num_rides, seed=self.seed, plot=False,
+                                         stop=self._cancel.is_set)
+
+        model = ThemeParkGridModel(**park, seed=self.seed)
+        reset_model(model, possible_rides, layout)
+        rides = [(pos[0], pos[1], possible_rides[ride_idx]['popularity_rank']) for ride_idx, pos in layout]
+        return model, rides
+
+
+class SimulationCache:
+    """Simulation jobs keyed by configuration, so each configuration is simulated only once.
+
+    A finished job is served straight from memory; a running one is shared by every reader
+    asking for the same configuration. Readers pass a `subscriber` ID (e.g. one per browser
+    session) and leave with unsubscribe(); a running job is only cancelled once its last
+    subscriber has left, so one reader cannot stop the stream others are watching.
+    Cancelled and failed jobs are replaced on the next request. The least recently used
+    finished jobs are dropped beyond `max_jobs`.
+
+    Attributes:
+        max_jobs (int): Number of jobs kept.
+        ranking (pd.DataFrame): Ride data passed to every job, or None to read RANKING_PATH.
+    """
+    def __init__(self, max_jobs=64, ranking=None):
+        """Create an empty cache.
+
+        Args:
+            max_jobs (int): Number of jobs kept.
+            ranking (pd.DataFrame): Ride data passed to every job, or None to read RANKING_PATH.
+        """
+        self.max_jobs = max_jobs
+        self.ranking = ranking
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, model_name, num_rides, steps=71, frame_every=10, seed=0):
+        """Return the job of a configuration without starting one.
+
+        Returns:
+            SimulationJob: The cached job, or None.
+        """
+        with self._lock:
+            return self._jobs.get((model_name, num_rides, steps, frame_every, seed))
+
+    def get_or_start(self, model_name, num_rides, steps=71, frame_every=10, seed=0, subscriber=None):
+        """Return the job of a configuration, starting it in the background if needed.
+
+        Args:
+            model_name (str): Key of PARK_CONFIGS.
+            num_rides (int): Number of top-ranked rides to place.
+            steps (int): Simulation steps to run.
+            frame_every (int): Publish a heatmap every this many steps.
+            seed (int): Seed of the run.
+            subscriber (hashable): Optional ID of the reader, added to the job's subscribers.
+
+        Returns:
+            SimulationJob: A finished or running job for the configuration.
+        """
+        key = (model_name, num_rides, steps, frame_every, seed)
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None or job.status in ('cancelled', 'failed'):
+                job = SimulationJob(model_name, num_rides, steps, frame_every, seed, self.ranking).start()
+                self._jobs[key] = job
+            if subscriber is not None:
+                job.subscribers.add(subscriber)
+            self._jobs.move_to_end(key)
+            self._evict()
+            return job
+
+    def unsubscribe(self, key, subscriber):
+        """Stop following a job, cancelling it if it is still running and nobody else follows it.
+
+        Args:
+            key (tuple): SimulationJob.key of the job.
+            subscriber (hashable): ID the reader passed to get_or_start().
+
+        Returns:
+            bool: True if the job was cancelled.
+        """
+        with self._lock:
+            job = self._jobs.get(key)
+            if job is None:
+                return False
+            job.subscribers.discard(subscriber)
+            if job.subscribers or job.finished:
+                return False
+            job.cancel()
+            return True
+
+    def _evict(self):
+        """Drop the least recently used finished jobs beyond max_jobs."""
+        for key in [key for key, job in self._jobs.items() if job.finished]:
+            if len(self._jobs) <= self.max_jobs:
+                break
+            del self._jobs[key]
+
+
+def load_front(model_name, num_rides, sample=0, fronts_path=FRONTS_PATH):
+    """Read the saved Pareto front of a park and number of rides.
+
+    Args:
+        model_name (str): Key of PARK_CONFIGS.
+        num_rides (int): Number of rides placed.
+        sample (int): Sample of the scenario run.
+        fronts_path (str): Directory the scenario run wrote its fronts to.
+
+    Returns:
+        ParetoFront: The saved front, or None if there is none.
+    """
+    path = os.path.join(fronts_path, model_name, f"number_rides_{num_rides}", f"sample_{sample}.front.json")
+    return ParetoFront.load(path) if os.path.exists(path) else None
+
+
+def front_frame(front, index):
+    """Heatmap frame of a front member, for render.render_frame().
+
+    Args:
+        front (ParetoFront): Front with stored heatmaps.
+        index (int): Position of the member in the front.
+
+    Returns:
+        dict: heatmap, walkable mask and ride markers labelled with their popularity rank.
+    """
+    park = build_model({**front.park, 'guest_inflow_type': None})
+    rides = [(x, y, front.rides[ride_idx]['popularity_rank']) for ride_idx, x, y in front.layouts[index]]
+    return {'heatmap': front.heatmaps[index], 'walkable': park.walkable.copy(), 'rides': rides}
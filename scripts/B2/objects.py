@@ -1,6 +1,7 @@
 import random
 import simpy
 import os
+from collections import deque
 import numpy as np
 import pandas as pd
 import mesa
@@ -9,8 +10,147 @@ from mesa.space import MultiGrid
 from mesa.time import RandomActivation
 import random
 import matplotlib.pyplot as plt
+from routing import *
+from inflow import *
 
-np.random.seed(50)
+def sample_rides(rng, ride_weights, last_rides):
+    """Draw a ride for a batch of guests at once, weighted by ride, excluding each guest's last ride.
+    
+    Args:
+        rng (np.random.Generator): Random generator of the model.
+        ride_weights (np.ndarray): Weight of each ride (1/popularity_rank).
+        last_rides (np.ndarray): Index of each guest's last ride, -1 if none.
+        
+    Returns:
+        np.ndarray: Index of the ride chosen by each guest, -1 if no other ride is available.
+    """
+    weights = np.tile(ride_weights, (len(last_rides), 1))
+    has_last = np.flatnonzero(last_rides >= 0)
+    weights[has_last, last_rides[has_last]] = 0
+    cumulative = np.cumsum(weights, axis=1)
+    totals = cumulative[:, -1]
+    draws = rng.random(len(last_rides)) * totals
+    choices = (cumulative <= draws[:, None]).sum(axis=1)
+    return np.where(totals > 0, choices, -1)
+
+def build_walkable_mask(width, height, restricted_bottom_left=None, restricted_top_right=None):
+    """Build a boolean walkability bitmap of the park grid.
+    
+    Args:
+        width (int): Grid width in cells.
+        height (int): Grid height in cells.
+        restricted_bottom_left (tuple or list): Bottom-left corner of a restricted rectangle,
+            or a list of corners for several rectangles.
+        restricted_top_right (tuple or list): Matching top-right corner(s).
+        
+    Returns:
+        np.ndarray: Boolean array of shape (width, height), False on restricted cells.
+    """
+    walkable = np.ones((width, height), dtype=bool)
+    if restricted_bottom_left is None or restricted_top_right is None:
+        return walkable
+    if not isinstance(restricted_bottom_left, list):  # Single zone
+        restricted_bottom_left = [restricted_bottom_left]
+        restricted_top_right = [restricted_top_right]
+    for (x_min, y_min), (x_max, y_max) in zip(restricted_bottom_left, restricted_top_right):
+        walkable[max(x_min, 0):x_max + 1, max(y_min, 0):y_max + 1] = False
+    return walkable
+
+def apply_restricted_areas(model, width, height, restricted_bottom_left=None, restricted_top_right=None):
+    """Set a model's restricted-area attributes and its walkability mask.
+    
+    Args:
+        model: The model to configure (ThemeParkGridModel or ThemeParkArrayModel).
+        width (int): Grid width in cells.
+        height (int): Grid height in cells.
+        restricted_bottom_left (tuple or list): Bottom-left corner(s) of the restricted areas.
+        restricted_top_right (tuple or list): Top-right corner(s) of the restricted areas.
+    """
+    model.restricted_bottom_left = restricted_bottom_left
+    model.restricted_top_right = restricted_top_right
+    model.walkable = build_walkable_mask(width, height, restricted_bottom_left, restricted_top_right)
+    model.walkable_cells = np.argwhere(model.walkable)
+    restricted_cells = np.argwhere(~model.walkable)
+    # Restricted cells are also kept as a list of positions for plotting
+    model.restricted_area = [(int(x), int(y)) for x, y in restricted_cells] if len(restricted_cells) else None
+
+class ParkGrid(MultiGrid):
+    """MultiGrid whose cells are insertion-ordered dicts instead of lists.
+
+    Mesa's list cells make placing and removing an agent linear in the number of agents on
+    the cell, which turns crowded cells such as the park entrance into a quadratic cost per
+    step. Dict cells keep both O(1) and iterate in placement order like the lists did.
+    """
+    @staticmethod
+    def default_val():
+        """Default value for new cell elements."""
+        return {}
+
+    def place_agent(self, agent, pos):
+        """Place the agent at the specified location, and set its pos variable."""
+        x, y = pos
+        cell = self._grid[x][y]
+        if agent not in cell:
+            cell[agent] = None
+            agent.pos = pos
+            if self._empties_built:
+                self._empties.discard(pos)
+                self._empty_mask[pos] = True
+
+    def remove_agent(self, agent):
+        """Remove the agent from its location and set its pos attribute to None."""
+        pos = agent.pos
+        x, y = pos
+        del self._grid[x][y][agent]
+        if self._empties_built and self.is_cell_empty(pos):
+            self._empties.add(pos)
+            self._empty_mask[pos] = False
+        agent.pos = None
+
+class GuestDensityMixin:
+    """Guest occupancy bookkeeping shared by ThemeParkGridModel and ThemeParkArrayModel.
+
+    `occupancy` holds the number of guests on each cell and is updated in O(1) whenever a
+    guest is placed, moves or is removed, so heatmaps never scan the agents. At the end of
+    every step `record_density()` adds it to `cumulative_density`, the time-integrated
+    occupancy since the model was created.
+
+    Attributes:
+        occupancy (np.ndarray): int64 (width, height) guest count per cell.
+        cumulative_density (np.ndarray): int64 (width, height) sum of `occupancy` over steps.
+        density_steps (int): Number of steps added to `cumulative_density`.
+    """
+    def reset_density(self, width, height):
+        """Start with an empty park and no recorded density.
+
+        Args:
+            width (int): Grid width in cells.
+            height (int): Grid height in cells.
+        """
+        self.occupancy = np.zeros((width, height), dtype=np.int64)
+        self.cumulative_density = np.zeros((width, height), dtype=np.int64)
+        self.density_steps = 0
+
+    def record_density(self):
+        """Add the current occupancy to the time-integrated density."""
+        self.cumulative_density += self.occupancy
+        self.density_steps += 1
+
+    def guest_heatmap(self):
+        """Count the guests standing on each grid cell.
+
+        Returns:
+            np.ndarray: Array of shape (width, height) with guest counts per cell.
+        """
+        return self.occupancy.astype(float)
+
+    def density_heatmap(self):
+        """Average number of guests on each grid cell over all recorded steps.
+
+        Returns:
+            np.ndarray: Array of shape (width, height), zero before the first step.
+        """
+        return self.cumulative_density / max(self.density_steps, 1)
 
 ##start
 # Guest Agent (Moves on Grid Toward a Ride)
@@ -21,7 +161,7 @@ class GuestAgent(Agent):
         unique_id (int): Unique identifier for the agent.
         destination (tuple): Current target position (x,y) the agent is moving toward.
         attraction (RideAgent): Current ride the agent is heading to or riding.
-        arrival_time (int): Time when agent arrived at current position.
+        arrival_time (int): Shared-clock time when agent joined its current ride queue.
         ride_completion_time (int): Remaining time steps until ride completion.
         last_ride (RideAgent): Last ride the agent attempted or experienced.
         time_to_leave (int): Total time steps before agent decides to leave park.
@@ -29,12 +169,13 @@ class GuestAgent(Agent):
         failed_attempts (int): Count of unsuccessful ride attempts due to long queues.
         rides_completed (int): Count of successfully completed rides.
     """
-    def __init__(self, unique_id, model):
+    def __init__(self, unique_id, model, time_to_leave=None):
         """Initialize a GuestAgent with default attributes.
         
         Args:
             unique_id (int): Unique identifier for the agent.
             model (ThemeParkGridModel): The model instance this agent belongs to.
+            time_to_leave (int): Time steps before leaving, drawn from the model's generator if None.
         """
         super().__init__(model)
         self.unique_id = unique_id
@@ -43,7 +184,9 @@ class GuestAgent(Agent):
         self.arrival_time = 0
         self.ride_completion_time = 0
         self.last_ride = None
-        self.time_to_leave = int(round(np.random.normal(loc = 360, scale = 90),2))
+        if time_to_leave is None:
+            time_to_leave = int(round(model.rng.normal(loc = 360, scale = 90),2))
+        self.time_to_leave = time_to_leave
         self.leaving = False
         self.failed_attempts = 0  # Track failed ride attempts
         self.rides_completed = 0  # Track rides completed
@@ -52,8 +195,7 @@ class GuestAgent(Agent):
         """Execute one step of agent behavior including movement and ride decisions."""
         if self.leaving:
             if self.pos == self.model.start_pos:
-                self.model.grid.remove_agent(self)
-                self.model.schedule.remove(self)
+                self.model.remove_guest(self)
                 self.model.guests_left += 1
                 #print(f"Guest {self.unique_id} left the park")
             else:
@@ -74,7 +216,8 @@ class GuestAgent(Agent):
         if self.destination:
             self.move_toward_destination(self.destination)
 
-            if self.pos == self.destination:
+            # Guests already queuing for this ride hold their place instead of joining again
+            if self.pos == self.destination and self.last_ride is not self.attraction:
                 self.arrive_at_ride()
 
         self.time_to_leave -= 1
@@ -85,8 +228,8 @@ class GuestAgent(Agent):
 
     def arrive_at_ride(self):
         """Handle guest arrival at a ride, deciding whether to join queue or leave."""
-        if len(self.attraction.queue.queue) < self.attraction.capacity * 3:
-            self.attraction.env.process(self.attraction.ride_experience(self))
+        if len(self.attraction.queue) < self.attraction.capacity * 3:
+            self.attraction.join_queue(self)
             #print(f"Guest {self.unique_id} joined the queue at {self.attraction.name}")
             self.last_ride = self.attraction
         else:
@@ -98,43 +241,22 @@ class GuestAgent(Agent):
         """Select a ride to visit based on popularity and queue length.
         
         Excludes the last ride visited to encourage variety. Uses weighted random
-        selection where weights are inversely proportional to popularity rank.
+        selection where weights are inversely proportional to popularity rank. Guests
+        normally get their ride from the model's batched draw at the start of each step
+        (see ThemeParkGridModel.choose_rides); this draws for a single guest the same way.
         """
-        if not self.model.rides:
-            return
-
-        # Exclude the last ride from the selection
-        available_rides = [ride for ride in self.model.rides if ride != self.last_ride]
-
-        if not available_rides:
-            return  # No available rides
-
-        # Weighted ride selection: 1/popularity_rank
-        ride_weights = [1 / ride.popularity_rank for ride in available_rides]
-        self.attraction = random.choices(available_rides, weights=ride_weights, k=1)[0]
-        self.destination = self.attraction.pos
-        #print(f"Guest {self.unique_id} chose {self.attraction.name} at {self.destination}")
+        self.model.choose_rides([self])
 
     def move_toward_destination(self, destination):
-        """Move agent one step closer to destination while avoiding restricted areas.
+        """Move agent one step along the shortest path to destination, around restricted areas.
         
         Args:
             destination (tuple): Target (x,y) position to move toward.
         """
-        x, y = self.pos
-        dx, dy = destination
-
-        # Calculate possible new positions
-        possible_moves = []
-        for new_x, new_y in [(x + 1, y), (x - 1, y), (x, y + 1), (x, y - 1)]:
-            if not self.model.is_restricted(new_x, new_y) and not self.model.grid.out_of_bounds((new_x, new_y)):
-                possible_moves.append((new_x, new_y))
-
-        if possible_moves:
-            # Choose the move that minimizes distance to the destination
-            best_move = min(possible_moves, key=lambda pos: abs(pos[0] - dx) + abs(pos[1] - dy))
-            self.model.grid.move_agent(self, best_move)
-            #print(f"Guest {self.unique_id} moved from {self.pos} to {best_move}")
+        # Next hop is a lookup in the model's precomputed routing table
+        new_pos = self.model.routing.next_position(self.pos, destination)
+        if new_pos != self.pos:
+            self.model.move_guest(self, new_pos)
 
 
 # Ride Agent (Fixed in Place)
@@ -148,8 +270,10 @@ class RideAgent(Agent):
         capacity (int): Maximum number of simultaneous riders.
         service_time (int): Time steps required for one ride cycle.
         popularity_rank (int): Relative popularity (lower = more popular).
-        env (simpy.Environment): Discrete event simulation environment.
-        queue (simpy.Resource): Queue management resource.
+        env (simpy.Environment): The model's shared discrete event clock.
+        queue (deque): Guests waiting to board, in arrival order.
+        active (bool): False once the ride is removed from the park.
+        busy_until (int): Shared-clock time the current boarding cycle ends.
         queue_lengths (list): Historical record of queue lengths.
         wait_times (list): Historical record of guest wait times.
     """
@@ -172,78 +296,114 @@ class RideAgent(Agent):
         self.capacity = capacity
         self.service_time = service_time  # Number of steps to complete one ride cycle
         self.popularity_rank = popularity_rank
-        self.env = simpy.Environment()  # Simpy environment for queue management
-        self.queue = simpy.Resource(self.env, capacity=capacity)
+        self.env = model.env  # Every ride runs on the model's shared clock
+        self.queue = deque()
         self.queue_lengths = []  # Track queue lengths over time
         self.wait_times = []  # Track guest wait times
+        self.active = True
+        self.busy_until = 0
+        self.guests_waiting = None  # Event that wakes an idle ride when a guest joins
+        self.env.process(self.run_cycles())
 
-    def ride_experience(self, guest):
-        """Simulate the complete ride experience including queuing and riding.
+    def join_queue(self, guest):
+        """Add a guest to the back of the queue, stamping their arrival on the shared clock.
         
         Args:
-            guest (GuestAgent): The guest experiencing the ride.
-            
+            guest (GuestAgent): The guest joining the queue.
+        """
+        guest.arrival_time = self.env.now
+        self.queue_lengths.append(len(self.queue))  # Track queue length
+        self.queue.append(guest)
+        if self.guests_waiting is not None and not self.guests_waiting.triggered:
+            self.guests_waiting.succeed()
+
+    def run_cycles(self):
+        """Operate the ride in boarding cycles on the shared clock.
+        
+        Each cycle loads up to `capacity` queued guests at once and takes `service_time`
+        steps before the next one can board. An idle ride sleeps until a guest joins.
+        
         Yields:
-            simpy.events: Queue request and timeout events.
+            simpy.events: Guest arrival and cycle timeout events.
         """
-        with self.queue.request() as request:
-            queue_length = len(self.queue.queue)
-            self.queue_lengths.append(queue_length)  # Track queue length
+        if self.busy_until > self.env.now:  # Restored mid-cycle from a snapshot
+            yield self.env.timeout(self.busy_until - self.env.now)
+
+        while self.active:
+            if not self.queue:
+                self.guests_waiting = self.env.event()
+                yield self.guests_waiting
+                self.guests_waiting = None
 
-            yield request  # Wait for turn
-            wait_time = self.env.now - guest.arrival_time
-            self.wait_times.append(wait_time)
+            boarded = 0
+            while self.queue and boarded < self.capacity:
+                guest = self.queue.popleft()
+                if guest.leaving:  # Gave up waiting and is heading for the exit
+                    continue
+                self.wait_times.append(self.env.now - guest.arrival_time)
+                guest.ride_completion_time = self.service_time  # Ride duration
+                boarded += 1
 
-            yield self.env.timeout(self.service_time)  # Ride duration
-            guest.ride_completion_time = self.service_time  # Set ride completion time
-            #print(f"Guest {guest.unique_id} waited {wait_time:.2f} mins and started riding {self.name}")
+            if boarded:
+                self.busy_until = self.env.now + self.service_time
+                yield self.env.timeout(self.service_time)
 
 # Theme Park Model (Grid-Based)
-class ThemeParkGridModel(Model):
+class ThemeParkGridModel(GuestDensityMixin, Model):
     """The main model representing a theme park with guests and rides.
     
     Attributes:
-        grid (MultiGrid): The 2D grid representing park layout.
+        grid (ParkGrid): The 2D grid representing park layout.
         schedule (RandomActivation): Agent activation scheduler.
-        randomizer (random.Random): Random number generator.
+        env (simpy.Environment): Discrete event clock shared by every ride queue.
+        rng (np.random.Generator): The model's NumPy random generator, seeded from `seed`.
+        random (random.Random): The model's Python random generator (agent activation order).
+        randomizer (random.Random): Same generator as `random`.
         restricted_area (list): List of restricted (x,y) positions.
+        walkable (np.ndarray): Boolean (width, height) mask, False on restricted cells.
+        walkable_cells (np.ndarray): (x,y) coordinates of every walkable cell.
+        routing (RoutingTable): Shortest-path next-hop tables toward rides and the entrance.
         start_pos (tuple): Park entrance/exit position.
         guests_entered (int): Total guests who entered the park.
         guests_left (int): Total guests who left the park.
+        next_guest_id (int): Next unused guest ID, only ever increasing.
         rides (list): List of RideAgent instances in the park.
-        guest_inflow_type (pd.DataFrame): Optional guest arrival schedule.
+        guest_inflow_type (InflowSchedule or pd.DataFrame): Optional guest arrival schedule.
+        arrivals (np.ndarray): Arrivals per step compiled from guest_inflow_type, or None.
+        occupancy (np.ndarray): Guest count per cell, kept up to date as guests move.
+        cumulative_density (np.ndarray): Guest counts per cell summed over every step.
     """
-    def __init__(self, width, height, restricted_bottom_left=None, restricted_top_right=None, guest_inflow_type = None):
+    def __init__(self, width, height, restricted_bottom_left=None, restricted_top_right=None, guest_inflow_type = None,
+                 seed=None):
         """Initialize the theme park model with specified dimensions and parameters.
         
         Args:
             width (int): Grid width in cells.
             height (int): Grid height in cells.
-            restricted_bottom_left (tuple): Bottom-left corner of restricted area.
-            restricted_top_right (tuple): Top-right corner of restricted area.
-            guest_inflow_type (pd.DataFrame): Optional guest arrival schedule.
+            restricted_bottom_left (tuple or list): Bottom-left corner of restricted area,
+                or a list of corners for several restricted areas.
+            restricted_top_right (tuple or list): Top-right corner(s) of restricted area.
+            guest_inflow_type (InflowSchedule or pd.DataFrame): Optional guest arrival
+                schedule, a DataFrame holding one GuestCount row per step.
+            seed (int): Seed of the model's random generators, or None for fresh entropy.
+                Models built with the same seed simulate identically, in any process.
         """
-        super().__init__()  # Correctly initialize the Model
-        self.grid = MultiGrid(width, height, True)  # Initialize grid first
+        super().__init__(rng=seed)  # Mesa seeds both self.rng and self.random from the seed
+        self.grid = ParkGrid(width, height, True)  # Initialize grid first
         self.schedule = RandomActivation(self)
-        self.randomizer = random  # Use built-in Python random
-        if restricted_bottom_left is not None and restricted_top_right is not None:
-            # Generate all coordinates in the rectangle defined by bottom-left and top-right
-            self.restricted_bottom_left = restricted_bottom_left
-            self.restricted_top_right = restricted_top_right
-            x_min, y_min = restricted_bottom_left
-            x_max, y_max = restricted_top_right
-            self.restricted_area = [(x, y) for x in range(x_min, x_max + 1) for y in range(y_min, y_max + 1)]
-        else:
-            # Default restricted area (if not provided)
-            self.restricted_bottom_left = None
-            self.restricted_top_right = None
-            self.restricted_area = None  # Restricted area in the center
+        self.env = simpy.Environment()  # Single clock for all ride queues
+        self.randomizer = self.random  # Per-model stream, never the global random module
+        apply_restricted_areas(self, width, height, restricted_bottom_left, restricted_top_right)
         self.start_pos = (width // 2, 0)  # Bottom center for ingress/egress
+        self.routing = RoutingTable(self.walkable)
+        self.routing.moves_to(self.start_pos)
+        self.reset_density(width, height)
         self.guests_entered = 0  # Track guests entering the park
         self.guests_left = 0  # Track guests leaving the park
+        self.next_guest_id = 0  # Monotonic guest ID allocator
         self.rides = []
         self.guest_inflow_type = guest_inflow_type
+        self.arrivals = inflow_arrivals(guest_inflow_type)  # Compiled once, no per-step pandas lookups
     
         for ride in self.rides:
             self.schedule.add(ride)
@@ -261,6 +421,7 @@ class ThemeParkGridModel(Model):
         """
         ride_id = len(self.rides) + 1  # Assign a unique ID
         new_ride = RideAgent(ride_id, self, name, pos, capacity, service_time, popularity_rank)
+        self.routing.moves_to(pos)  # Only routes positions that are not cached yet
         self.rides.append(new_ride)
         self.schedule.add(new_ride)
         self.grid.place_agent(new_ride, pos)
@@ -277,9 +438,9 @@ class ThemeParkGridModel(Model):
         Returns:
             bool: True if position is restricted, False otherwise.
         """
-        if self.restricted_area is None:
+        if not (0 <= x < self.grid.width and 0 <= y < self.grid.height):
             return False
-        return (x, y) in self.restricted_area
+        return not self.walkable[x, y]
     
 
     def step(self, guest_inflow_type=None):
@@ -292,42 +453,132 @@ class ThemeParkGridModel(Model):
         - Statistics tracking
         """
         # Handle guest inflow
-        if self.guest_inflow_type is not None:
-            # Get guest count from dataset for current step
-            try:
-                current_step = self.schedule.steps  # Use Mesa's internal step counter
-                new_guests_count = self.guest_inflow_type.iloc[current_step]['GuestCount']
-            except (IndexError, KeyError):
-                # Fallback if step exceeds dataset or column not found
-                new_guests_count = int(round(np.random.normal(100, 25),2))
+        current_step = self.schedule.steps  # Use Mesa's internal step counter
+        if self.arrivals is not None and current_step < len(self.arrivals):
+            # Get guest count from the compiled schedule for current step
+            new_guests_count = int(self.arrivals[current_step])
         else:
-            # Default random inflow
+            # Default random inflow, also the fallback once the schedule runs out
             #if self.schedule.steps < 120:
-            new_guests_count = int(round(np.random.normal(100, 25),2))
+            new_guests_count = int(round(self.rng.normal(100, 25),2))
             # else:
             #    new_guests_count = 1
         
-        # Add new guests
-        for _ in range(new_guests_count):
-            # Get next available unique_id
-            existing_ids = [agent.unique_id for agent in self.schedule.agents]
-            new_guest_id = max(existing_ids) + 1 if existing_ids else 0
-            
-            new_guest = GuestAgent(new_guest_id, self)
-            self.schedule.add(new_guest)
-            self.grid.place_agent(new_guest, self.start_pos)
-            self.guests_entered += 1
+        # Add this step's arrivals in one batch
+        self.add_guests(new_guests_count)
+
+        # Draw a ride for every guest who will pick one this step in a single batch
+        self.choose_rides([agent for agent in self.schedule.agents
+                           if isinstance(agent, GuestAgent) and agent.destination is None
+                           and not agent.leaving and agent.ride_completion_time == 0])
 
         # Advance simulation - let Mesa handle the step counting
         self.schedule.step()
         
-        # Advance each ride's environment
-        for ride in self.rides:
-            ride.env.run(until=ride.env.now + 1)
+        # Advance every ride's boarding cycles on the shared clock
+        self.env.run(until=self.env.now + 1)
+        self.record_density()
 
         # Reset counter for next step
         self.guests_left = 0
     
+    def allocate_guest_ids(self, count):
+        """Reserve a block of unused guest IDs in O(1).
+        
+        Args:
+            count (int): Number of IDs to reserve.
+            
+        Returns:
+            range: The reserved guest IDs.
+        """
+        guest_ids = range(self.next_guest_id, self.next_guest_id + count)
+        self.next_guest_id += count
+        return guest_ids
+
+    def add_guests(self, count):
+        """Place a batch of new guests at the park entrance.
+        
+        Args:
+            count (int): Number of guests to add.
+        """
+        if count <= 0:
+            return
+        times_to_leave = self.rng.normal(loc=360, scale=90, size=count).round(2).astype(int)
+        for guest_id, time_to_leave in zip(self.allocate_guest_ids(count), times_to_leave.tolist()):
+            new_guest = GuestAgent(guest_id, self, time_to_leave)
+            self.schedule.add(new_guest)
+            self.grid.place_agent(new_guest, self.start_pos)
+        self.occupancy[self.start_pos] += count
+        self.guests_entered += count
+
+    def choose_rides(self, guests):
+        """Send each guest to a ride drawn in one batch, weighted by 1/popularity_rank, excluding their last ride.
+        
+        Args:
+            guests (list): GuestAgents that need a ride. Guests with no other ride available
+                keep no destination.
+        """
+        if not self.rides or not guests:
+            return
+        ride_index = {ride: i for i, ride in enumerate(self.rides)}
+        ride_weights = np.array([1 / ride.popularity_rank for ride in self.rides], dtype=float)
+        last_rides = np.array([ride_index.get(guest.last_ride, -1) for guest in guests], dtype=np.int64)
+        for guest, choice in zip(guests, sample_rides(self.rng, ride_weights, last_rides).tolist()):
+            if choice >= 0:
+                guest.attraction = self.rides[choice]
+                guest.destination = guest.attraction.pos
+
+    def move_guest(self, guest, pos):
+        """Move a guest to a neighbouring cell, keeping the occupancy counts in step.
+        
+        Args:
+            guest (GuestAgent): The guest to move.
+            pos (tuple): New (x,y) position.
+        """
+        self.occupancy[guest.pos] -= 1
+        self.grid.move_agent(guest, pos)
+        self.occupancy[pos] += 1
+
+    def remove_guest(self, guest):
+        """Take a guest off the grid and out of the schedule.
+        
+        Args:
+            guest (GuestAgent): The guest leaving the park.
+        """
+        self.occupancy[guest.pos] -= 1
+        self.grid.remove_agent(guest)
+        self.schedule.remove(guest)
+
+    def remove_guests(self):
+        """Remove every guest from the park, leaving the rides in place."""
+        for agent in list(self.schedule.agents):
+            if isinstance(agent, GuestAgent):
+                self.schedule.remove(agent)
+                self.grid.remove_agent(agent)
+        self.occupancy[:] = 0
+
+    def clear_rides(self):
+        """Remove every ride from the park."""
+        for ride in self.rides:
+            ride.active = False
+            self.schedule.remove(ride)
+            self.grid.remove_agent(ride)
+        self.rides = []
+
+    def guest_statistics(self):
+        """Aggregate ride statistics over the guests currently in the park.
+        
+        Returns:
+            dict: guests_entered, total_guests, failed_attempts and rides_completed.
+        """
+        guests = [agent for agent in self.schedule.agents if isinstance(agent, GuestAgent)]
+        return {
+            'guests_entered': self.guests_entered,
+            'total_guests': len(guests),
+            'failed_attempts': sum(guest.failed_attempts for guest in guests),
+            'rides_completed': sum(guest.rides_completed for guest in guests),
+        }
+
     def get_total_guests(self):
         """Get the total number of guests that have entered the park.
         
@@ -335,4 +586,125 @@ class ThemeParkGridModel(Model):
             int: Total count of guests entered.
         """
         return self.guests_entered
+
+    def get_state(self):
+        """Capture the full simulation state as plain values and NumPy arrays.
+
+        Guests are stored as arrays in schedule order, rides with their queues as lists of
+        guest IDs, together with the clocks, counters and random number generator states.
+        Use snapshot.snapshot() for the compact binary form.
+
+        Returns:
+            dict: State accepted by ThemeParkGridModel.from_state().
+        """
+        ride_index = {ride: i for i, ride in enumerate(self.rides)}
+        agents = list(self.schedule.agents)
+        guests = [agent for agent in agents if isinstance(agent, GuestAgent)]
+        guest_index = {guest: i for i, guest in enumerate(guests)}
+        none_pos = (-1, -1)
+        return {
+            'backend': type(self).__name__,
+            'park': {
+                'width': self.grid.width,
+                'height': self.grid.height,
+                'restricted_bottom_left': self.restricted_bottom_left,
+                'restricted_top_right': self.restricted_top_right,
+                'guest_inflow_type': self.guest_inflow_type,
+            },
+            'clock': {'steps': self.schedule.steps, 'time': self.schedule.time,
+                      'model_steps': self.steps, 'now': self.env.now},
+            'counters': {'guests_entered': self.guests_entered, 'guests_left': self.guests_left,
+                         'next_guest_id': self.next_guest_id},
+            'rides': [{
+                'unique_id': ride.unique_id, 'name': ride.name, 'pos': ride.pos,
+                'capacity': ride.capacity, 'service_time': ride.service_time,
+                'popularity_rank': ride.popularity_rank, 'busy_until': ride.busy_until,
+                'queue': [guest.unique_id for guest in ride.queue],
+                'queue_lengths': list(ride.queue_lengths), 'wait_times': list(ride.wait_times),
+            } for ride in self.rides],
+            'guests': {
+                'unique_id': np.array([guest.unique_id for guest in guests], dtype=np.int64),
+                'pos': np.array([guest.pos for guest in guests], dtype=np.int32).reshape(-1, 2),
+                'destination': np.array([guest.destination or none_pos for guest in guests], dtype=np.int32).reshape(-1, 2),
+                'attraction': np.array([ride_index.get(guest.attraction, -1) for guest in guests], dtype=np.int32),
+                'last_ride': np.array([ride_index.get(guest.last_ride, -1) for guest in guests], dtype=np.int32),
+                'arrival_time': np.array([guest.arrival_time for guest in guests], dtype=np.int64),
+                'ride_completion_time': np.array([guest.ride_completion_time for guest in guests], dtype=np.int32),
+                'time_to_leave': np.array([guest.time_to_leave for guest in guests], dtype=np.int32),
+                'leaving': np.array([guest.leaving for guest in guests], dtype=bool),
+                'failed_attempts': np.array([guest.failed_attempts for guest in guests], dtype=np.int32),
+                'rides_completed': np.array([guest.rides_completed for guest in guests], dtype=np.int32),
+            },
+            # Schedule order drives the random activation order: guest index, or -(ride index + 1)
+            'schedule': np.array([guest_index[agent] if agent in guest_index else -(ride_index[agent] + 1)
+                                  for agent in agents], dtype=np.int64),
+            'density': {'occupancy': self.occupancy.copy(), 'cumulative_density': self.cumulative_density.copy(),
+                        'density_steps': self.density_steps},
+            'rng': {'model': self.random.getstate(), 'numpy': self.rng.bit_generator.state},
+        }
+
+    @classmethod
+    def from_state(cls, state, restore_rng=True, seed=None):
+        """Rebuild a model from get_state(), continuing exactly where the original left off.
+
+        Args:
+            state (dict): State from get_state().
+            restore_rng (bool): Also restore the model's random generators, so the rebuilt
+                model repeats the original's future.
+            seed (int): Seed of the rebuilt model's generators when `restore_rng` is False.
+
+        Returns:
+            ThemeParkGridModel: Independent copy of the captured model.
+        """
+        model = cls(**state['park'], seed=seed)
+        clock = state['clock']
+        model.env = simpy.Environment(initial_time=clock['now'])
+        rides = []
+        for record in state['rides']:
+            ride = RideAgent(record['unique_id'], model, record['name'], record['pos'], record['capacity'],
+                             record['service_time'], record['popularity_rank'])
+            ride.busy_until = record['busy_until']
+            ride.queue_lengths = list(record['queue_lengths'])
+            ride.wait_times = list(record['wait_times'])
+            model.routing.moves_to(ride.pos)
+            rides.append(ride)
+        model.rides = rides
+
+        g = state['guests']
+        guests = []
+        for i, guest_id in enumerate(g['unique_id']):
+            guest = GuestAgent(int(guest_id), model, int(g['time_to_leave'][i]))
+            destination = tuple(int(v) for v in g['destination'][i])
+            guest.destination = None if destination == (-1, -1) else destination
+            guest.attraction = rides[g['attraction'][i]] if g['attraction'][i] >= 0 else None
+            guest.last_ride = rides[g['last_ride'][i]] if g['last_ride'][i] >= 0 else None
+            guest.arrival_time = int(g['arrival_time'][i])
+            guest.ride_completion_time = int(g['ride_completion_time'][i])
+            guest.leaving = bool(g['leaving'][i])
+            guest.failed_attempts = int(g['failed_attempts'][i])
+            guest.rides_completed = int(g['rides_completed'][i])
+            guests.append(guest)
+        guests_by_id = {guest.unique_id: guest for guest in guests}
+        for ride, record in zip(rides, state['rides']):
+            ride.queue = deque(guests_by_id[guest_id] for guest_id in record['queue'])
+
+        for entry in state['schedule']:
+            agent = guests[entry] if entry >= 0 else rides[-entry - 1]
+            model.schedule.add(agent)
+            pos = agent.pos if isinstance(agent, RideAgent) else tuple(int(v) for v in g['pos'][entry])
+            agent.pos = None
+            model.grid.place_agent(agent, pos)
+
+        model.schedule.steps = clock['steps']
+        model.schedule.time = clock['time']
+        model.steps = clock['model_steps']
+        for name, value in state['counters'].items():
+            setattr(model, name, value)
+        model.occupancy = state['density']['occupancy'].copy()
+        model.cumulative_density = state['density']['cumulative_density'].copy()
+        model.density_steps = state['density']['density_steps']
+        if restore_rng:
+            model.random.setstate(state['rng']['model'])
+            model.rng.bit_generator.state = state['rng']['numpy']
+        return model
     
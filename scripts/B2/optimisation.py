@@ -4,10 +4,94 @@ import numpy as np
 import math
 import matplotlib.pyplot as plt
 import warnings
+import logging
+import time
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from itertools import repeat
 from objects import *
+from array_model import ThemeParkArrayModel
+from fitness_cache import *
+from surrogate import *
+from ensemble import *
+from pareto import *
 
 warnings.filterwarnings("ignore", category=UserWarning)
 
+logger = logging.getLogger(__name__)
+
+# Default settings of the genetic algorithm engine
+DEFAULT_GA_CONFIG = {
+    'population_size': 8,
+    'generations': 10,
+    'crossover_rate': 0.5,
+    'mutation_rate': 0.2,
+    'mutation_indpb': 0.1,  # Per-gene mutation probability
+    'tournament_size': 3,
+    'elitism': 0,  # Best individuals copied unchanged into the next generation
+    'stall_generations': None,  # Stop after this many generations without improvement
+    'stall_tolerance': 0.0,  # Minimum gain in best fitness that counts as improvement
+    'surrogate_fraction': None,  # Share of offspring simulated once the surrogate is trained; None disables it
+    'surrogate_min_samples': 16,  # Simulated layouts needed before the surrogate screens offspring
+    'replications': 1,  # Replications averaged per fitness evaluation (see ensemble_fitness)
+    'ci_half_width': None,  # Keep adding replications until the fitness CI half-width is this tight
+    'max_replications': 64,  # Upper bound on replications per layout with ci_half_width set
+    'objectives': 'weighted',  # 'weighted' sum, or 'pareto' for an NSGA-II front over OBJECTIVES
+}
+
+def simulate_layout(individual, model, possible_rides):
+    """Simulate a ride layout and collect the statistics its fitness is built from.
+    
+    Args:
+        individual (list): List of tuples representing (ride_index, position) pairs.
+        model (ThemeParkGridModel or ThemeParkArrayModel): The simulation model containing park layout and agents.
+        possible_rides (list): List of available ride configurations.
+        
+    Returns:
+        dict: failed_attempts, rides_completed, total_guests, density (average guests per
+        cell at the 25th step), layout_penalty and the guest heatmap at the 25th step.
+    """
+    # Reset the model for this individual
+    reset_model(model, possible_rides, individual)
+
+    grid_density = np.zeros((model.grid.width, model.grid.height))
+    layout_score = layout_penalty(individual, model, possible_rides)
+    
+    # Add a fixed number of guests for this evaluation
+    num_guests = 100
+    model.add_guests(num_guests)
+
+    # Initialize variables for fitness calculation
+
+    # Simulate guest behavior for this ride configuration
+    for step in range(26):  # Simulate 26 steps by right 50
+        model.step()  # Advance the entire simulation by one step
+
+        # Track guest positions at the 25th step
+        if step == 25:
+            grid_density += model.guest_heatmap()
+
+    # Track failed ride attempts and rides completed
+    stats = model.guest_statistics()
+    total_failed_attempts = stats['failed_attempts']
+    total_rides_per_guest = stats['rides_completed']
+    total_guests = stats['total_guests']
+
+    # Calculate density score (average density at the 25th step)
+    density_score = np.sum(grid_density) / (model.grid.width * model.grid.height)
+
+    # Remove guests after evaluation
+    model.remove_guests()
+
+    return {
+        'failed_attempts': total_failed_attempts,
+        'rides_completed': total_rides_per_guest,
+        'total_guests': total_guests,
+        'density': density_score,
+        'layout_penalty': layout_score,
+        'heatmap': grid_density,
+    }
+
 # Define the fitness function
 def fitness_function(individual, model, possible_rides):
     """Calculate the fitness score for a ride placement configuration.
@@ -17,29 +101,74 @@ def fitness_function(individual, model, possible_rides):
     
     Args:
         individual (list): List of tuples representing (ride_index, position) pairs.
-        model (ThemeParkGridModel): The simulation model containing park layout and agents.
+        model (ThemeParkGridModel or ThemeParkArrayModel): The simulation model containing park layout and agents.
         possible_rides (list): List of available ride configurations.
         
     Returns:
         tuple: Single-element tuple containing the computed fitness score.
     """
-    # Reset the model for this individual
-    reset_model(model, possible_rides, individual)
+    stats = simulate_layout(individual, model, possible_rides)
 
-    total_failed_attempts = 0
-    total_rides_per_guest = 0
-    grid_density = np.zeros((model.grid.width, model.grid.height))
+    # Combine objectives into a single fitness score
+    satisfaction_score = -stats['failed_attempts']  # Minimize failed attempts
+    rides_score = stats['rides_completed']  # Maximize rides per guest
+    fitness = satisfaction_score + rides_score - stats['density'] * 2 + stats['layout_penalty']
+
+    # Debug: Log intermediate results
+    logger.debug(f"Failed attempts: {stats['failed_attempts']}, Rides per guest: {stats['rides_completed']}, total_guests: {stats['total_guests']}")
+    logger.debug(f"Density score: {stats['density']}, Layout penalty: {stats['layout_penalty']}")
+    logger.debug(f"Fitness: {fitness}")
+
+    return (fitness,)
+
+def layout_objectives(stats):
+    """Satisfaction, throughput and crowding objectives of a simulated layout.
+    
+    Satisfaction is minus the failed ride attempts plus the layout penalty, throughput the
+    rides completed and crowding the average guests per cell. Under
+    DEFAULT_OBJECTIVE_WEIGHTS, scalarize() of these equals fitness_function's score.
+    
+    Args:
+        stats (dict): Statistics from simulate_layout().
+        
+    Returns:
+        tuple: (satisfaction, throughput, crowding).
+    """
+    return (float(-stats['failed_attempts'] + stats['layout_penalty']), float(stats['rides_completed']), float(stats['density']))
+
+def objective_function(individual, model, possible_rides):
+    """Objective values of a ride layout for the Pareto mode.
+    
+    Args:
+        individual (list): List of tuples representing (ride_index, position) pairs.
+        model (ThemeParkGridModel or ThemeParkArrayModel): The simulation model.
+        possible_rides (list): List of available ride configurations.
+        
+    Returns:
+        tuple: (satisfaction, throughput, crowding), see layout_objectives().
+    """
+    return layout_objectives(simulate_layout(individual, model, possible_rides))
+
+def layout_penalty(individual, model, possible_rides):
+    """Penalty of a ride layout that does not depend on the simulation.
+    
+    Args:
+        individual (list): List of tuples representing (ride_index, position) pairs.
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model giving the park layout.
+        possible_rides (list): List of available ride configurations.
+        
+    Returns:
+        float: Sum of the restricted-area and popular-ride spacing penalties (zero or negative).
+    """
     restricted_penalty = 0  # Penalty for rides in restricted areas
     popular_ride_penalty = 0  # Penalty for popular rides placed too close
-    total_guests = 0
     # Extract ride positions and selected rides from the individual
     ride_positions = [pos for _, pos in individual]
     selected_rides = [possible_rides[ride_idx] for ride_idx, _ in individual]
 
     # Check if any ride is in a restricted area
-    for pos in ride_positions:
-        if model.is_restricted(*pos):  # Check if position is restricted
-            restricted_penalty -= 1000  # Apply a large penalty
+    xs, ys = np.array(ride_positions).T
+    restricted_penalty -= 1000 * np.count_nonzero(~model.walkable[xs, ys])  # Apply a large penalty
 
     # Calculate distance between popular rides
     popular_ride_positions = []
@@ -56,71 +185,176 @@ def fitness_function(individual, model, possible_rides):
             distance = math.sqrt((x1 - x2)**2 + (y1 - y2)**2)  # Euclidean distance
             if distance < 3:  # Threshold for spacing (adjust as needed)
                 popular_ride_penalty -= (3 - distance) * 100  # Penalize based on closeness
-    
-    # Add a fixed number of guests for this evaluation
-    num_guests = 100
-    for i in range(num_guests):
-        guest = GuestAgent(i, model)
-        model.schedule.add(guest)
-        model.grid.place_agent(guest, model.start_pos)
-
-    # Initialize variables for fitness calculation
+    return restricted_penalty + popular_ride_penalty
 
-    # Simulate guest behavior for this ride configuration
-    for step in range(26):  # Simulate 26 steps by right 50
-        model.step()  # Advance the entire simulation by one step
+def replicated_fitness(individual, model, possible_rides):
+    """Fitness of a layout in every replica of an array model, simulated in one vectorized run.
+    
+    Applies fitness_function's scoring to each of the model's `replicas` independent park
+    replications.
+    
+    Args:
+        individual (list): List of tuples representing (ride_index, position) pairs.
+        model (ThemeParkArrayModel): Model built with replicas >= 1.
+        possible_rides (list): List of available ride configurations.
+        
+    Returns:
+        np.ndarray: Fitness of the layout in each replica.
+    """
+    reset_model(model, possible_rides, individual)
+    layout_score = layout_penalty(individual, model, possible_rides)
+    model.add_guests(100)  # 100 guests in every replica
+    for step in range(26):
+        model.step()
+    stats = model.replica_statistics()
+    # Guests per cell at the 25th step, as in fitness_function
+    density_score = stats['total_guests'] / (model.grid.width * model.grid.height)
+    fitness = -stats['failed_attempts'] + stats['rides_completed'] - density_score * 2 + layout_score
+    model.remove_guests()
+    return fitness
+
+# Serializable park description so worker processes can rebuild the model
+def park_config(model):
+    """Describe a model's park layout as a picklable dict.
+    
+    Args:
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model to describe.
+        
+    Returns:
+        dict: Backend name, grid size, restricted areas and guest inflow schedule.
+    """
+    return {
+        'backend': type(model).__name__,
+        'width': model.grid.width,
+        'height': model.grid.height,
+        'restricted_bottom_left': model.restricted_bottom_left,
+        'restricted_top_right': model.restricted_top_right,
+        'guest_inflow_type': model.guest_inflow_type,
+    }
+
+def build_model(config, **kwargs):
+    """Build a fresh model from a park config created by park_config().
+    
+    Args:
+        config (dict): Park description.
+        **kwargs: Extra backend arguments, such as `seed`, or `replicas` for ThemeParkArrayModel.
+        
+    Returns:
+        ThemeParkGridModel or ThemeParkArrayModel: New model with no rides or guests.
+    """
+    backends = {'ThemeParkGridModel': ThemeParkGridModel, 'ThemeParkArrayModel': ThemeParkArrayModel}
+    return backends[config['backend']](
+        width=config['width'],
+        height=config['height'],
+        restricted_bottom_left=config['restricted_bottom_left'],
+        restricted_top_right=config['restricted_top_right'],
+        guest_inflow_type=config['guest_inflow_type'],
+        **kwargs
+    )
+
+def evaluate_with_seed(individual, config, possible_rides, seed):
+    """Evaluate one individual on its own freshly built model and RNG seed.
+    
+    Kept at module level so a process pool can pickle it. Because the model and its
+    random generators depend only on the arguments, the result does not depend on which
+    worker runs it.
+    
+    Args:
+        individual (list): List of (ride_index, position) pairs.
+        config (dict): Park description from park_config().
+        possible_rides (list): List of available ride configurations.
+        seed (int): Seed of the evaluation model's random generators.
+        
+    Returns:
+        tuple: Single-element tuple containing the computed fitness score.
+    """
+    model = build_model(config, seed=seed)
+    return fitness_function(individual, model, possible_rides)
 
-        # Track guest positions at the 25th step
-        if step == 25:
-            for guest in model.schedule.agents:
-                if isinstance(guest, GuestAgent):
-                    x, y = guest.pos
-                    if 0 <= x < model.grid.width and 0 <= y < model.grid.height:
-                        grid_density[x][y] += 1
+def objectives_with_seed(individual, config, possible_rides, seed):
+    """Pareto-mode counterpart of evaluate_with_seed(), kept at module level for process pools.
+    
+    Returns:
+        tuple: (satisfaction, throughput, crowding) of the layout.
+    """
+    return objective_function(individual, build_model(config, seed=seed), possible_rides)
 
-    # Track failed ride attempts and rides completed
-    for guest in model.schedule.agents:
-        if isinstance(guest, GuestAgent):
-            total_failed_attempts += guest.failed_attempts
-            total_rides_per_guest += guest.rides_completed
-            total_guests += 1
+def ensemble_fitness(individual, config, possible_rides, seed=None, replications=8, target_half_width=None,
+                     max_replications=64, confidence=0.95):
+    """Evaluate a layout over independent replications and report a confidence interval.
+    
+    On the ThemeParkArrayModel backend every batch of replications is simulated in one
+    vectorized run with `replicas` set; on ThemeParkGridModel the replications run one after
+    another. With `target_half_width` set, batches are added until the interval is that
+    tight (see ensemble.adaptive_ensemble). Every model gets its own seed drawn from `seed`.
+    
+    Args:
+        individual (list): List of (ride_index, position) pairs.
+        config (dict): Park description from park_config().
+        possible_rides (list): List of available ride configurations.
+        seed (int): Seed of the replications, or None for fresh entropy.
+        replications (int): Replications per batch.
+        target_half_width (float): Stop once the interval half-width is at most this, or None.
+        max_replications (int): Upper bound on the total number of replications.
+        confidence (float): Confidence level of the interval.
+        
+    Returns:
+        dict: mean, half_width, ci_low, ci_high, std, replications and samples.
+    """
+    model_seeds = np.random.default_rng(seed)
 
-    # Calculate density score (average density at the 25th step)
-    density_score = np.sum(grid_density) / (model.grid.width * model.grid.height)
+    def next_seed():
+        return int(model_seeds.integers(2**32))
 
-    # Combine objectives into a single fitness score
-    satisfaction_score = -total_failed_attempts  # Minimize failed attempts
-    rides_score = total_rides_per_guest  # Maximize rides per guest
-    fitness = satisfaction_score + rides_score - density_score * 2 + restricted_penalty + popular_ride_penalty
+    if config['backend'] == 'ThemeParkArrayModel':
+        def sample_batch(size):
+            return replicated_fitness(individual, build_model(config, replicas=size, seed=next_seed()), possible_rides)
+    else:
+        def sample_batch(size):
+            return [fitness_function(individual, build_model(config, seed=next_seed()), possible_rides)[0]
+                    for _ in range(size)]
 
-    # Debug: Print intermediate results
-    print(f"Failed attempts: {total_failed_attempts}, Rides per guest: {total_rides_per_guest}, total_guests: {total_guests}")
-    print(f"Density score: {density_score}, Popularity Penalty: {popular_ride_penalty}, restricted_penalty: {restricted_penalty}")
-    print(f"Fitness: {fitness}")
+    return adaptive_ensemble(sample_batch, replications, target_half_width, max_replications, confidence)
 
-    # Remove guests after evaluation
-    for guest in list(model.schedule.agents):
-        if isinstance(guest, GuestAgent):
-            model.schedule.remove(guest)
-            model.grid.remove_agent(guest)
+def evaluate_ensemble(individual, config, possible_rides, seed, replications, target_half_width, max_replications):
+    """GA evaluation through ensemble_fitness, kept at module level so a process pool can pickle it.
+    
+    Returns:
+        tuple: Single-element tuple containing the mean fitness over the replications.
+    """
+    result = ensemble_fitness(individual, config, possible_rides, seed, replications, target_half_width, max_replications)
+    return (result['mean'],)
 
-    return (fitness,)
+def evaluation_seed(individual, master_seed):
+    """Derive a layout's evaluation seed from the master seed.
+    
+    The seed depends only on the master seed and the canonical layout, so a layout met
+    again is simulated identically and can be served from a FitnessCache.
+    
+    Args:
+        individual (list): List of (ride_index, position) pairs.
+        master_seed (int): Master seed of the GA run, or None.
+        
+    Returns:
+        int: 32-bit evaluation seed.
+    """
+    return zlib.crc32(repr((master_seed, canonical_layout(individual))).encode())
 
 # Function to generate a valid position (not in restricted area and not occupied by another ride)
-def generate_valid_position(model):
+def generate_valid_position(model, rng=None):
     """Generate a random valid position within the park grid.
     
     Args:
         model (ThemeParkGridModel): The simulation model containing grid dimensions.
+        rng (np.random.Generator): Random generator to draw from; the model's own if None.
         
     Returns:
         tuple: Valid (x,y) position not in restricted areas.
     """
-
-    while True:
-        pos = (random.randint(0, model.grid.width - 1), random.randint(0, model.grid.height - 1))
-        if not model.is_restricted(*pos):  # Ensure position is not restricted
-            return pos
+    rng = model.rng if rng is None else rng
+    # Sample directly from the precomputed walkable cells
+    x, y = model.walkable_cells[rng.integers(len(model.walkable_cells))]
+    return (int(x), int(y))
 
 # Function to ensure uniqueness of ride indices in an individual
 def ensure_unique_rides(individual, possible_rides):
@@ -149,12 +383,13 @@ def ensure_unique_rides(individual, possible_rides):
     return individual
 
 # Function to ensure uniqueness of positions in an individual
-def ensure_unique_positions(individual, model):
+def ensure_unique_positions(individual, model, rng=None):
     """Ensure all ride positions in an individual are unique and valid.
     
     Args:
         individual (list): Current ride configuration to validate.
         model (ThemeParkGridModel): Simulation model for position validation.
+        rng (np.random.Generator): Generator replacement positions are drawn from; the model's own if None.
         
     Returns:
         list: Individual with duplicate positions replaced by unique alternatives.
@@ -168,13 +403,13 @@ def ensure_unique_positions(individual, model):
                 unique_positions.remove(positions[i])
             else:
                 # Replace duplicate with a unique position
-                positions[i] = generate_valid_position(model)
+                positions[i] = generate_valid_position(model, rng)
         # Update the individual with unique positions
         individual = [(ride_idx, positions[i]) for i, (ride_idx, _) in enumerate(individual)]
     return individual
 
 # Function to repair the best individual
-def repair_individual(individual, possible_rides, model):
+def repair_individual(individual, possible_rides, model, rng=None):
     """Apply all necessary repairs to ensure a valid ride configuration.
     
     Combines uniqueness checks for both rides and positions.
@@ -183,14 +418,77 @@ def repair_individual(individual, possible_rides, model):
         individual (list): Current ride configuration to repair.
         possible_rides (list): Available ride configurations.
         model (ThemeParkGridModel): Simulation model for validation.
+        rng (np.random.Generator): Generator replacement positions are drawn from; the model's own if None.
         
     Returns:
         list: Fully repaired individual configuration.
     """
     individual = ensure_unique_rides(individual, possible_rides)
-    individual = ensure_unique_positions(individual, model)
+    individual = ensure_unique_positions(individual, model, rng)
     return individual
 
+def select_tournament(individuals, k, tournsize, rng):
+    """Tournament selection like tools.selTournament, drawing the aspirants from `rng`.
+    
+    Args:
+        individuals (list): Individuals to select from.
+        k (int): Number of individuals to select.
+        tournsize (int): Number of aspirants in each tournament.
+        rng (np.random.Generator): Random generator of the GA run.
+        
+    Returns:
+        list: The winner of each tournament.
+    """
+    aspirants = rng.integers(len(individuals), size=(k, tournsize))
+    return [max((individuals[i] for i in row), key=lambda ind: ind.fitness) for row in aspirants.tolist()]
+
+def select_crowded_tournament(individuals, k, rng):
+    """NSGA-II binary tournament, drawing the pairs from `rng`.
+
+    The individual on the better non-dominated front wins; on the same front the one with
+    the larger crowding distance wins. The crowding distances must have been assigned by
+    tools.selNSGA2.
+
+    Args:
+        individuals (list): Individuals with multi-objective fitness to select from.
+        k (int): Number of individuals to select.
+        rng (np.random.Generator): Random generator of the GA run.
+
+    Returns:
+        list: The winner of each tournament.
+    """
+    rank = {}
+    for front_rank, front in enumerate(tools.sortNondominated(individuals, len(individuals))):
+        for ind in front:
+            rank[id(ind)] = front_rank
+
+    def key(ind):
+        return (-rank[id(ind)], ind.fitness.crowding_dist)
+
+    pairs = rng.integers(len(individuals), size=(k, 2))
+    return [max(individuals[i], individuals[j], key=key) for i, j in pairs.tolist()]
+
+def cx_two_point(ind1, ind2, rng):
+    """Two-point crossover like tools.cxTwoPoint, drawing the cut points from `rng`.
+    
+    Args:
+        ind1 (list): First individual, modified in place.
+        ind2 (list): Second individual, modified in place.
+        rng (np.random.Generator): Random generator of the GA run.
+        
+    Returns:
+        tuple: The two individuals.
+    """
+    size = min(len(ind1), len(ind2))
+    cxpoint1 = int(rng.integers(1, size + 1))
+    cxpoint2 = int(rng.integers(1, size))
+    if cxpoint2 >= cxpoint1:
+        cxpoint2 += 1
+    else:  # Swap the two cx points
+        cxpoint1, cxpoint2 = cxpoint2, cxpoint1
+    ind1[cxpoint1:cxpoint2], ind2[cxpoint1:cxpoint2] = ind2[cxpoint1:cxpoint2], ind1[cxpoint1:cxpoint2]
+    return ind1, ind2
+
 # Function to reset the model for each individual
 def reset_model(model, possible_rides, individual):
     """Reset the simulation model with a new ride configuration.
@@ -203,10 +501,7 @@ def reset_model(model, possible_rides, individual):
         individual (list): New ride configuration to apply.
     """
     # Clear existing rides
-    for agent in list(model.schedule.agents):
-        if isinstance(agent, RideAgent):
-            model.schedule.remove(agent)
-            model.grid.remove_agent(agent)
+    model.clear_rides()
 
     # Add rides from the current individual
     for ride_idx, pos in individual:
@@ -219,6 +514,31 @@ def reset_model(model, possible_rides, individual):
             popularity_rank=ride['popularity_rank']
         )
 
+def build_pareto_front(individuals, config, possible_rides, seed=None, meta=None):
+    """Collect the non-dominated layouts of a population into a ParetoFront.
+
+    Each member is simulated once more with its evaluation seed to record its heatmap,
+    so the front can be displayed without rerunning the model.
+
+    Args:
+        individuals (list): Evaluated individuals with (satisfaction, throughput, crowding) fitness.
+        config (dict): Park description from park_config().
+        possible_rides (list): List of available ride configurations.
+        seed (int): Master seed of the GA run, or None.
+        meta (dict): Run information stored with the front.
+
+    Returns:
+        ParetoFront: The first non-dominated front, one member per distinct layout.
+    """
+    members = {}
+    for ind in tools.sortNondominated(individuals, len(individuals), first_front_only=True)[0]:
+        members.setdefault(canonical_layout(ind), ind)
+    members = list(members.values())
+    heatmaps = [simulate_layout(ind, build_model(config, seed=evaluation_seed(ind, seed)), possible_rides)['heatmap']
+                for ind in members]
+    park = {key: value for key, value in config.items() if key != 'guest_inflow_type'}
+    return ParetoFront([ind.fitness.values for ind in members], members, possible_rides, park, heatmaps, meta)
+
 # Function to plot the current best solution
 def plot_best_solution(best_individual, model, possible_rides, generation):
     """Visualize the current best ride configuration and guest distribution.
@@ -238,11 +558,7 @@ def plot_best_solution(best_individual, model, possible_rides, generation):
     fig, ax = plt.subplots(figsize=(10, 8))
     
     # Create and normalize heatmap
-    heatmap = np.zeros((model.grid.width, model.grid.height))
-    for agent in model.schedule.agents:
-        if isinstance(agent, GuestAgent):
-            x, y = agent.pos
-            heatmap[x][y] += 1
+    heatmap = model.guest_heatmap()
     if np.max(heatmap) > 0:
         heatmap = heatmap / np.max(heatmap)
 
@@ -277,7 +593,8 @@ def plot_best_solution(best_individual, model, possible_rides, generation):
     return fig
 
 # Function to set up and run the Genetic Algorithm
-def optimize_ride_placement(model, possible_rides, num_rides):
+def optimize_ride_placement(model, possible_rides, num_rides, workers=None, seed=None, cache=None,
+                            engine_config=None, history=None, front_path=None, plot=True, stop=None):
     """Execute genetic algorithm optimization for ride placement.
     
     Implements a complete evolutionary optimization process including:
@@ -290,103 +607,330 @@ def optimize_ride_placement(model, possible_rides, num_rides):
         model (ThemeParkGridModel): Simulation model to optimize within.
         possible_rides (list): Available ride configurations.
         num_rides (int): Number of rides to place in the park.
+        workers (int): Evaluate each generation on a pool of this many processes.
+            None or 1 evaluates serially.
+        seed (int): Master seed. The GA run draws its moves from its own generator seeded
+            with it, never from the global `random` state. When set, or when running on a
+            pool, each individual is also evaluated on its own model built from
+            park_config(model) with a seed derived from the master seed, so the same seed
+            returns the same layout whatever the number of workers or threads.
+        cache (FitnessCache): Optional cache of fitness values. Layouts already evaluated
+            with the same rides, park and seed are not simulated again. Unused by serial
+            runs without a seed, whose evaluations are not reproducible.
+        engine_config (dict): Overrides for DEFAULT_GA_CONFIG (population size, number of
+            generations, crossover and mutation rates, elitism, stall-based early stopping,
+            surrogate pre-screening). With `surrogate_fraction` set, a SurrogateModel learnt
+            online from simulated layouts ranks the offspring and only the top fraction is
+            simulated; the rest keep the predicted fitness and are never returned as the best.
+            With `replications` above 1 or `ci_half_width` set, each layout's fitness is the
+            mean of an ensemble_fitness() ensemble instead of a single noisy run.
+            With `objectives` set to 'pareto', layouts are scored on the separate
+            satisfaction, throughput and crowding objectives and evolved NSGA-II style
+            (non-dominated sorting and crowding distance) instead of on their weighted sum;
+            this mode cannot be combined with the surrogate or ensembles.
+        history (list): Optional list that receives one record per generation with the
+            best, mean and std fitness and the evaluations per second.
+        front_path (str): In the Pareto mode, write the final ParetoFront to this JSON file.
+        plot (bool): Plot the best layout with plot_best_solution() at the end. Pass False
+            from threads (e.g. a Streamlit server), since pyplot is not thread-safe.
+        stop (callable): Optional check called before every generation; once it returns True
+            the search ends and returns the best layout found so far.
         
     Returns:
-        list: Optimized ride configuration as (ride_index, position) tuples.
+        list: Optimized ride configuration as (ride_index, position) tuples. In the Pareto
+        mode, the front member that scores best under DEFAULT_OBJECTIVE_WEIGHTS.
     """
 
     '''Optimisation of ride placement through the use of Genetic Algorithm, a reinforcing algorithm. Here the output is ((a,(x,y)),(b,(x,y)), ...) with a and b being the rank and x,y being the position'''
-    # Set up DEAP for Genetic Algorithm
-    creator.create("FitnessMax", base.Fitness, weights=(1.0,))
-    creator.create("Individual", list, fitness=creator.FitnessMax)
+    engine = {**DEFAULT_GA_CONFIG, **(engine_config or {})}
+
+    # Set up DEAP for Genetic Algorithm (classes are created once per process)
+    if not hasattr(creator, "FitnessMax"):
+        creator.create("FitnessMax", base.Fitness, weights=(1.0,))
+    if not hasattr(creator, "Individual"):
+        creator.create("Individual", list, fitness=creator.FitnessMax)
+    if not hasattr(creator, "FitnessPareto"):
+        creator.create("FitnessPareto", base.Fitness, weights=OBJECTIVE_SENSES)
+    if not hasattr(creator, "ParetoIndividual"):
+        creator.create("ParetoIndividual", list, fitness=creator.FitnessPareto)
+
+    ensemble = engine['replications'] > 1 or engine['ci_half_width'] is not None
+    pareto = engine['objectives'] == 'pareto'
+    if engine['objectives'] not in ('weighted', 'pareto'):
+        raise ValueError(f"Unknown objectives mode: {engine['objectives']}")
+    if pareto and (engine['surrogate_fraction'] or ensemble):
+        raise ValueError("The Pareto mode cannot be combined with the surrogate or ensembles")
+
+    rng = np.random.default_rng(seed)  # The run's own stream for every GA move
 
     toolbox = base.Toolbox()
     # Define an attribute for a ride-position pair
-    toolbox.register("attr_ride_pos", lambda: (random.randint(0, len(possible_rides) - 1), generate_valid_position(model)))
-    toolbox.register("individual", tools.initRepeat, creator.Individual, toolbox.attr_ride_pos, n=num_rides)
+    toolbox.register("attr_ride_pos", lambda: (int(rng.integers(len(possible_rides))), generate_valid_position(model, rng)))
+    toolbox.register("individual", tools.initRepeat, creator.ParetoIndividual if pareto else creator.Individual,
+                     toolbox.attr_ride_pos, n=num_rides)
     toolbox.register("population", tools.initRepeat, list, toolbox.individual)
 
     def evaluate(individual):
         '''takes in an individual and apply it to the modle and the number of possible rides'''
-        return fitness_function(individual, model, possible_rides)
+        return (objective_function if pareto else fitness_function)(individual, model, possible_rides)
 
     # Define custom mutation function to handle tuples and avoid restricted areas
     def mutate_individual(individual, indpb, model):
         '''Function that ensures that within each generation of iteration, the position evolves, allowing it to optimise and self learn.'''
         for i in range(len(individual)):
-            if random.random() < indpb:
+            if rng.random() < indpb:
                 # Mutate the ride index or position
-                if random.random() < 0.5:  # Mutate ride index
-                    individual[i] = (random.randint(0, len(possible_rides) - 1), individual[i][1])
+                if rng.random() < 0.5:  # Mutate ride index
+                    individual[i] = (int(rng.integers(len(possible_rides))), individual[i][1])
                 else:  # Mutate position
-                    individual[i] = (individual[i][0], generate_valid_position(model))
+                    individual[i] = (individual[i][0], generate_valid_position(model, rng))
         # Ensure uniqueness of ride indices and positions after mutation
         individual = ensure_unique_rides(individual, possible_rides)
-        individual = ensure_unique_positions(individual, model)
+        individual = ensure_unique_positions(individual, model, rng)
         return individual,
 
     # Define custom crossover function to ensure unique positions
     def cxTwoPointUnique(ind1, ind2, model):
         """Perform a two-point crossover while ensuring unique positions.Ensures uniqueness between positions"""
         # Perform the standard two-point crossover
-        tools.cxTwoPoint(ind1, ind2)
+        cx_two_point(ind1, ind2, rng)
         # Ensure uniqueness of positions in both individuals
-        ind1[:] = ensure_unique_positions(ind1, model)
-        ind2[:] = ensure_unique_positions(ind2, model)
+        ind1[:] = ensure_unique_positions(ind1, model, rng)
+        ind2[:] = ensure_unique_positions(ind2, model, rng)
         return ind1, ind2
 
     toolbox.register("evaluate", evaluate)
     toolbox.register("mate", cxTwoPointUnique, model=model)
-    toolbox.register("mutate", mutate_individual, indpb=0.1, model=model)
-    toolbox.register("select", tools.selTournament, tournsize=3)
-
-    # Initialize population
-    population = toolbox.population(n=8)
-    # Ensure uniqueness of ride indices and positions in the initial population
-    for ind in population:
-        ind[:] = ensure_unique_rides(ind, possible_rides)
-        ind[:] = ensure_unique_positions(ind, model)
-
-    # Run the GA in a loop
-    ngen = 10  # Number of generations
-    for generation in range(ngen):
-        print(f"Generation {generation}")
-
-        # Select the next generation
-        offspring = toolbox.select(population, len(population))
-        offspring = list(map(toolbox.clone, offspring))
-
-        # Apply crossover and mutation
+    toolbox.register("mutate", mutate_individual, indpb=engine['mutation_indpb'], model=model)
+    toolbox.register("select", select_tournament, tournsize=engine['tournament_size'], rng=rng)
+
+    executor = ProcessPoolExecutor(max_workers=workers) if workers and workers > 1 else None
+    config = park_config(model)
+
+    ensemble_settings = (engine['replications'], engine['ci_half_width'], engine['max_replications'])
+
+    def evaluate_individuals(individuals):
+        """Assign fitness to individuals, returning the number of simulations actually run."""
+        seeded = executor is not None or seed is not None or ensemble
+        if not seeded:
+            # An unseeded run on the shared model is one noisy draw, so it is neither cached nor reused
+            for ind, fit in zip(individuals, toolbox.map(toolbox.evaluate, individuals)):
+                ind.fitness.values = fit
+            return len(individuals)
+
+        seeds = [evaluation_seed(ind, seed) for ind in individuals]
+        # Ensemble means and Pareto objectives are cached apart from single runs with the same seed
+        keys = [fitness_key(ind, possible_rides, config, (ind_seed,) + ensemble_settings if ensemble else
+                            ('pareto', ind_seed) if pareto else ind_seed)
+                for ind, ind_seed in zip(individuals, seeds)]
+        seed_by_key = dict(zip(keys, seeds))
+
+        # Serve known layouts from the cache and simulate each new layout only once
+        fitness_by_key = {}
+        pending = {}
+        for key, ind in zip(keys, individuals):
+            if key in fitness_by_key or key in pending:
+                continue
+            cached = cache.get(key) if cache is not None else None
+            if cached is not None:
+                fitness_by_key[key] = cached
+            else:
+                pending[key] = ind
+
+        layouts = [list(ind) for ind in pending.values()]
+        pending_seeds = [seed_by_key[key] for key in pending]
+        pool_map = executor.map if executor is not None else map
+        if ensemble:
+            fitnesses = pool_map(evaluate_ensemble, layouts, repeat(config), repeat(possible_rides), pending_seeds,
+                                 *(repeat(setting) for setting in ensemble_settings))
+        else:
+            fitnesses = pool_map(objectives_with_seed if pareto else evaluate_with_seed,
+                                 layouts, repeat(config), repeat(possible_rides), pending_seeds)
+        for key, fit in zip(pending, fitnesses):
+            fitness_by_key[key] = fit
+            if cache is not None:
+                cache.put(key, fit)
+
+        for key, ind in zip(keys, individuals):
+            ind.fitness.values = fitness_by_key[key]
+        return len(pending)
+
+    surrogate = SurrogateModel(min_samples=engine['surrogate_min_samples']) if engine['surrogate_fraction'] else None
+
+    def screen_and_evaluate(candidates):
+        """Evaluate candidates, simulating only the surrogate's top fraction once it is trained.
+        
+        Returns:
+            tuple: Number of simulations run and number of candidates left to the surrogate.
+        """
+        features = [layout_features(ind, possible_rides, model) for ind in candidates] if surrogate is not None else []
+        to_simulate = candidates
+        if surrogate is not None and surrogate.ready and len(candidates) > 1:
+            predicted = surrogate.predict(np.array(features))
+            n_simulated = max(1, math.ceil(engine['surrogate_fraction'] * len(candidates)))
+            order = np.argsort(-predicted)
+            to_simulate = [candidates[i] for i in order[:n_simulated]]
+            for i in order[n_simulated:]:
+                candidates[i].fitness.values = (float(predicted[i]),)
+                candidates[i].surrogate = True
+        evaluations = evaluate_individuals(to_simulate)
+        for ind in to_simulate:
+            ind.surrogate = False
+        if surrogate is not None:
+            for ind, feature in zip(candidates, features):
+                if not ind.surrogate:
+                    surrogate.add(feature, ind.fitness.values[0])
+        return evaluations, len(candidates) - len(to_simulate)
+
+    def simulated(individuals):
+        """Individuals whose fitness comes from a simulation rather than the surrogate."""
+        return [ind for ind in individuals if not getattr(ind, 'surrogate', False)] or individuals
+
+    def record_generation(generation, evaluations, screened, started):
+        """Log and store the fitness statistics of the current population.
+        
+        In the Pareto mode the fitness is the scalarize() score under DEFAULT_OBJECTIVE_WEIGHTS.
+        """
+        elapsed = time.perf_counter() - started
+        if pareto:
+            fits = scalarize([ind.fitness.values for ind in population])
+        else:
+            fits = np.array([ind.fitness.values[0] for ind in simulated(population)])
+        record = {
+            'generation': generation,
+            'best': float(fits.max()),
+            'mean': float(fits.mean()),
+            'std': float(fits.std()),
+            'evaluations': evaluations,
+            'surrogate_screened': screened,
+            'evaluations_per_second': evaluations / elapsed if elapsed > 0 else float('inf'),
+        }
+        if pareto:
+            record['front_size'] = len(tools.sortNondominated(population, len(population), first_front_only=True)[0])
+        logger.info("Generation %(generation)d: best=%(best).2f mean=%(mean).2f std=%(std).2f "
+                    "evaluations/s=%(evaluations_per_second).1f", record, extra={'ga_record': record})
+        if history is not None:
+            history.append(record)
+        return record
+
+    def vary(offspring):
+        """Apply crossover and mutation in place, invalidating the fitness of changed offspring."""
         for child1, child2 in zip(offspring[::2], offspring[1::2]):
-            if random.random() < 0.5:  # Crossover probability
+            if rng.random() < engine['crossover_rate']:
                 toolbox.mate(child1, child2)
                 del child1.fitness.values
                 del child2.fitness.values
                 child1[:] = ensure_unique_rides(child1, possible_rides)
-                child1[:] = ensure_unique_positions(child1, model)
+                child1[:] = ensure_unique_positions(child1, model, rng)
                 child2[:] = ensure_unique_rides(child2, possible_rides)
-                child2[:] = ensure_unique_positions(child2, model)
+                child2[:] = ensure_unique_positions(child2, model, rng)
 
         for mutant in offspring:
-            if random.random() < 0.2:  # Mutation probability
-                toolbox.mutate(mutant)
+            if rng.random() < engine['mutation_rate']:
+                mutant[:] = toolbox.mutate(mutant)[0]
                 del mutant.fitness.values
 
-        # Evaluate the new individuals
-        invalid_ind = [ind for ind in offspring if not ind.fitness.valid]
-        fitnesses = toolbox.map(toolbox.evaluate, invalid_ind)
-        for ind, fit in zip(invalid_ind, fitnesses):
-            ind.fitness.values = fit
+    def evolve_weighted(population):
+        """Evolve the population on the weighted-sum fitness.
+        
+        Returns:
+            tuple: Best simulated individual and the last generation run.
+        """
+        best_fitness = record_generation(0, *screen_and_evaluate(population), started)['best']
+        stalled = 0
+
+        # Run the GA in a loop
+        generation = 0
+        for generation in range(1, engine['generations'] + 1):
+            if stop is not None and stop():
+                generation -= 1  # Last generation actually run
+                break
+            generation_started = time.perf_counter()
+
+            # Carry the elites over unchanged and select parents for the rest
+            elites = list(map(toolbox.clone, tools.selBest(simulated(population), engine['elitism'])))
+            offspring = toolbox.select(population, len(population) - len(elites))
+            offspring = list(map(toolbox.clone, offspring))
+
+            vary(offspring)
+
+            # Evaluate the new individuals, giving surrogate-scored survivors another chance at a simulation
+            evaluations, screened = screen_and_evaluate(
+                [ind for ind in offspring if not ind.fitness.valid or getattr(ind, 'surrogate', False)])
+
+            # Replace the population with the new generation
+            population[:] = elites + offspring
+            record = record_generation(generation, evaluations, screened, generation_started)
+
+            # Stop early once the best fitness has not improved for `stall_generations` generations
+            if record['best'] > best_fitness + engine['stall_tolerance']:
+                best_fitness = record['best']
+                stalled = 0
+            else:
+                stalled += 1
+            if engine['stall_generations'] is not None and stalled >= engine['stall_generations']:
+                break
+
+        # Get the best solution
+        return tools.selBest(simulated(population), k=1)[0], generation
+
+    def evolve_pareto_front(population):
+        """Evolve the population NSGA-II style on the (satisfaction, throughput, crowding) objectives.
+        
+        Parents and offspring compete on non-dominated front rank, then crowding distance,
+        so the population spreads along the Pareto front instead of converging on one
+        weighting of the objectives. The final front is written to `front_path`.
+        
+        Returns:
+            tuple: Front member scoring best under DEFAULT_OBJECTIVE_WEIGHTS and the last generation run.
+        """
+        evaluations = evaluate_individuals(population)
+        population[:] = tools.selNSGA2(population, len(population))  # Assigns the crowding distances
+        record_generation(0, evaluations, 0, started)
+
+        generation = 0
+        for generation in range(1, engine['generations'] + 1):
+            if stop is not None and stop():
+                generation -= 1  # Last generation actually run
+                break
+            generation_started = time.perf_counter()
+            offspring = list(map(toolbox.clone, select_crowded_tournament(population, len(population), rng)))
+            vary(offspring)
+            evaluations = evaluate_individuals([ind for ind in offspring if not ind.fitness.valid])
+
+            # Keep the best fronts of parents and offspring together, split on crowding distance
+            population[:] = tools.selNSGA2(population + offspring, engine['population_size'])
+            record_generation(generation, evaluations, 0, generation_started)
+
+        front = build_pareto_front(population, config, possible_rides, seed,
+                                   meta={'seed': seed, 'generations': generation, 'num_rides': num_rides})
+        if front_path is not None:
+            front.save(front_path)
+        first_front = tools.sortNondominated(population, len(population), first_front_only=True)[0]
+        return max(first_front, key=lambda ind: scalarize(ind.fitness.values)), generation
 
-        # Replace the population with the new generation
-        population[:] = offspring
+    # Initialize population
+    started = time.perf_counter()
+    population = toolbox.population(n=engine['population_size'])
+    # Ensure uniqueness of ride indices and positions in the initial population
+    for ind in population:
+        ind[:] = ensure_unique_rides(ind, possible_rides)
+        ind[:] = ensure_unique_positions(ind, model, rng)
+
+    try:
+        if pareto:
+            best_individual, generation = evolve_pareto_front(population)
+        else:
+            best_individual, generation = evolve_weighted(population)
+    finally:
+        # Shut the pool down even when an evaluation fails, so no worker processes are left behind
+        if executor is not None:
+            executor.shutdown()
 
-    # Get the best solution
-    best_individual = tools.selBest(population, k=1)[0]
     # Repair the best individual to ensure no duplicates
-    best_individual = repair_individual(best_individual, possible_rides, model)
-    fig = plot_best_solution(best_individual, model, possible_rides, generation)
-    fig.show()
+    best_individual = repair_individual(best_individual, possible_rides, model, rng)
+    if plot:
+        fig = plot_best_solution(best_individual, model, possible_rides, generation)
+        fig.show()
     #print("Best ride positions (after repair):", best_individual)
     return best_individual
-    
\ No newline at end of file
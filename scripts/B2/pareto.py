@@ -0,0 +1,150 @@
+import json
+import numpy as np
+import pandas as pd
+
+# Objectives of the Pareto mode and their DEAP weights (maximise, maximise, minimise)
+OBJECTIVES = ('satisfaction', 'throughput', 'crowding')
+OBJECTIVE_SENSES = (1.0, 1.0, -1.0)
+# Weights under which scalarize() reproduces fitness_function's fixed weighted sum
+DEFAULT_OBJECTIVE_WEIGHTS = {'satisfaction': 1.0, 'throughput': 1.0, 'crowding': 2.0}
+FRONT_VERSION = 1
+
+
+def scalarize(objectives, weights=None):
+    """Combine objective values into one score under business weights.
+
+    The score is w_satisfaction * satisfaction + w_throughput * throughput
+    - w_crowding * crowding, so every weight rewards a better value of its objective.
+
+    Args:
+        objectives (array-like): (..., 3) satisfaction, throughput and crowding values.
+        weights (dict): Non-negative weight per objective name; DEFAULT_OBJECTIVE_WEIGHTS if None.
+
+    Returns:
+        np.ndarray or float: Score of each set of objective values.
+    """
+    weights = {**DEFAULT_OBJECTIVE_WEIGHTS, **(weights or {})}
+    coefficients = np.array([sense * weights[name] for name, sense in zip(OBJECTIVES, OBJECTIVE_SENSES)])
+    return np.asarray(objectives, dtype=float) @ coefficients
+
+
+def _corners(value):
+    """Restricted-area corner(s) read back from JSON: a corner as a tuple, several as a list of tuples."""
+    if value is None or not isinstance(value[0], list):
+        return value if value is None else tuple(value)
+    return [tuple(corner) for corner in value]
+
+
+class ParetoFront:
+    """Non-dominated ride layouts over satisfaction, throughput and crowding.
+
+    Saved as JSON next to the scenario images so the Streamlit page can pick the best
+    layout for any weighting of the objectives without running the GA again.
+
+    Attributes:
+        objectives (np.ndarray): (n, 3) objective values of each layout.
+        layouts (list): Each layout as [ride_index, x, y] triples into `rides`.
+        heatmaps (list): (width, height) guest counts at the scored step of each layout, or None.
+        rides (list): Ride configurations the layouts index into.
+        park (dict): Park description from park_config().
+        meta (dict): Free-form run information, such as the seed and generations.
+    """
+    def __init__(self, objectives, layouts, rides, park, heatmaps=None, meta=None):
+        """Wrap the layouts of a front.
+
+        Args:
+            objectives (array-like): (n, 3) objective values of each layout.
+            layouts (list): Each layout as (ride_index, (x, y)) pairs or [ride_index, x, y] triples.
+            rides (list): Ride configurations the layouts index into.
+            park (dict): Park description from park_config().
+            heatmaps (list): Optional guest heatmap of each layout.
+            meta (dict): Free-form run information.
+        """
+        self.objectives = np.asarray(objectives, dtype=float).reshape(-1, len(OBJECTIVES))
+        self.layouts = [[[int(ride[0]), *map(int, ride[1])] if len(ride) == 2 else [int(v) for v in ride]
+                         for ride in layout] for layout in layouts]
+        self.heatmaps = [None if heatmap is None else np.asarray(heatmap) for heatmap in heatmaps] \
+            if heatmaps is not None else [None] * len(self.layouts)
+        self.rides = rides
+        self.park = park
+        self.meta = meta or {}
+
+    def __len__(self):
+        return len(self.layouts)
+
+    def scores(self, weights=None):
+        """Score of every layout under the given weights (see scalarize())."""
+        return scalarize(self.objectives, weights)
+
+    def best(self, weights=None):
+        """Index of the best layout under the given weights.
+
+        Args:
+            weights (dict): Weight per objective name; DEFAULT_OBJECTIVE_WEIGHTS if None.
+
+        Returns:
+            int: Position of the layout in the front.
+        """
+        return int(np.argmax(self.scores(weights)))
+
+    def layout(self, index):
+        """A front layout as (ride_index, (x, y)) pairs, the form optimize_ride_placement returns."""
+        return [(ride_idx, (x, y)) for ride_idx, x, y in self.layouts[index]]
+
+    def to_table(self, weights=None):
+        """Objective values and scores of the front, best first.
+
+        Args:
+            weights (dict): Weight per objective name; DEFAULT_OBJECTIVE_WEIGHTS if None.
+
+        Returns:
+            pd.DataFrame: One row per layout with its objectives, score and rides as
+            (popularity_rank, x, y) triples.
+        """
+        table = pd.DataFrame(self.objectives, columns=list(OBJECTIVES))
+        table['score'] = self.scores(weights)
+        table['layout'] = [[(self.rides[ride_idx]['popularity_rank'], x, y) for ride_idx, x, y in layout]
+                           for layout in self.layouts]
+        return table.sort_values('score', ascending=False)
+
+    def save(self, path):
+        """Write the front as JSON.
+
+        Args:
+            path (str): Output file path.
+        """
+        front = {
+            'version': FRONT_VERSION,
+            'objectives': list(OBJECTIVES),
+            'park': self.park,
+            'rides': [{key: value.item() if isinstance(value, np.generic) else value for key, value in ride.items()}
+                      for ride in self.rides],
+            'meta': self.meta,
+            'members': [{
+                'objectives': objectives.tolist(),
+                'layout': layout,
+                'heatmap': None if heatmap is None else heatmap.tolist(),
+            } for objectives, layout, heatmap in zip(self.objectives, self.layouts, self.heatmaps)],
+        }
+        with open(path, 'w') as f:
+            json.dump(front, f)
+
+    @classmethod
+    def load(cls, path):
+        """Read a front written by save().
+
+        Args:
+            path (str): JSON file path.
+
+        Returns:
+            ParetoFront: The saved front.
+        """
+        with open(path) as f:
+            front = json.load(f)
+        if front.get('version') != FRONT_VERSION:
+            raise ValueError(f"Unsupported Pareto front version in {path}")
+        members = front['members']
+        # JSON turns the corner tuples into lists, which the models read as several areas
+        park = {key: _corners(value) if key.startswith('restricted_') else value for key, value in front['park'].items()}
+        return cls([member['objectives'] for member in members], [member['layout'] for member in members],
+                   front['rides'], park, [member['heatmap'] for member in members], front['meta'])
@@ -0,0 +1,222 @@
+import io
+import threading
+import numpy as np
+from concurrent.futures import ProcessPoolExecutor
+from matplotlib import colormaps
+from PIL import Image, ImageDraw
+
+# 'hot' colour lookup table, the colormap the matplotlib heatmaps use
+HOT_LUT = (colormaps['hot'](np.linspace(0, 1, 256))[:, :3] * 255).astype(np.uint8)
+RESTRICTED_RGB = np.array([0, 0, 255], dtype=np.float32)
+RESTRICTED_ALPHA = 0.3
+GRID_RGB = (64, 64, 64)
+
+
+def capture_frame(model, rides=None, cumulative=False):
+    """Copy what a heatmap image shows out of a model into a small picklable dict.
+
+    Args:
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model to capture.
+        rides (list): Optional (x, y, label) ride markers. Defaults to the model's rides
+            labelled with their names.
+        cumulative (bool): Capture the density averaged over all steps instead of the
+            current occupancy.
+
+    Returns:
+        dict: heatmap, walkable mask and ride markers of the frame.
+    """
+    if rides is None:
+        rides = [(ride.pos[0], ride.pos[1], str(ride.name)) for ride in model.rides]
+    heatmap = model.density_heatmap() if cumulative else model.guest_heatmap()
+    return {'heatmap': heatmap, 'walkable': model.walkable.copy(), 'rides': rides}
+
+
+class FrameRenderer:
+    """Draws park heatmap frames into a preallocated RGB array without matplotlib figures.
+
+    Each grid cell becomes a `cell_size` square, coloured with the 'hot' colormap from the
+    normalised heatmap. Restricted cells are tinted blue and rides are drawn as blue discs
+    with a white edge and their label, like the matplotlib plots. The y axis points up.
+
+    Attributes:
+        width (int): Grid width in cells.
+        height (int): Grid height in cells.
+        cell_size (int): Side of one cell in pixels.
+        buffer (np.ndarray): uint8 (height*cell_size, width*cell_size, 3) image, reused per frame.
+    """
+    def __init__(self, width, height, cell_size=32):
+        """Allocate the image buffer and marker stamp for a grid size.
+
+        Args:
+            width (int): Grid width in cells.
+            height (int): Grid height in cells.
+            cell_size (int): Side of one cell in pixels.
+        """
+        self.width = width
+        self.height = height
+        self.cell_size = cell_size
+        self.buffer = np.zeros((height * cell_size, width * cell_size, 3), dtype=np.uint8)
+        # Cell-shaped view of the buffer: (row, y in cell, column, x in cell, rgb)
+        self._cells = self.buffer.reshape(height, cell_size, width, cell_size, 3)
+
+        # Ride marker stamp: a white ring around a blue disc
+        offsets = np.arange(cell_size) - (cell_size - 1) / 2
+        radius = np.hypot(offsets[:, None], offsets[None, :])
+        self._disc = radius <= cell_size * 0.3
+        self._ring = (radius <= cell_size * 0.36) & ~self._disc
+
+    def render(self, heatmap, walkable=None, rides=()):
+        """Draw one frame into `buffer`.
+
+        Args:
+            heatmap (np.ndarray): (width, height) guest counts, normalised to its maximum.
+            walkable (np.ndarray): Optional (width, height) mask, False on restricted cells.
+            rides (list): (x, y, label) ride markers.
+
+        Returns:
+            np.ndarray: The filled `buffer`.
+        """
+        peak = heatmap.max()
+        levels = heatmap / peak if peak > 0 else np.zeros_like(heatmap, dtype=float)
+        colours = HOT_LUT[(levels * 255).astype(np.int64)]  # (width, height, 3)
+        colours = colours.transpose(1, 0, 2)[::-1]  # (row, column, 3) with y pointing up
+
+        if walkable is not None:
+            restricted = (~walkable).T[::-1]
+            tinted = colours[restricted] * (1 - RESTRICTED_ALPHA) + RESTRICTED_RGB * RESTRICTED_ALPHA
+            colours = colours.copy()
+            colours[restricted] = tinted.astype(np.uint8)
+
+        self._cells[:] = colours[:, None, :, None, :]
+        self.buffer[::self.cell_size, :] = GRID_RGB
+        self.buffer[:, ::self.cell_size] = GRID_RGB
+
+        for x, y, _ in rides:
+            cell = self._cells[self.height - 1 - y, :, x, :]
+            cell[self._ring] = (255, 255, 255)
+            cell[self._disc] = (0, 0, 255)
+        return self.buffer
+
+    def to_image(self, rides=()):
+        """Wrap the buffer in a Pillow image and write the ride labels.
+
+        Args:
+            rides (list): (x, y, label) ride markers drawn by the last render().
+
+        Returns:
+            PIL.Image.Image: RGB image of the frame.
+        """
+        image = Image.fromarray(self.buffer)
+        draw = ImageDraw.Draw(image)
+        for x, y, label in rides:
+            left = x * self.cell_size
+            top = (self.height - 1 - y) * self.cell_size
+            draw.text((left + self.cell_size / 2, top + self.cell_size / 2), str(label),
+                      fill=(255, 255, 255), anchor='mm')
+        return image
+
+
+# FrameRenderers of the current thread keyed by (width, height, cell_size); threads (e.g.
+# Streamlit sessions and simulation jobs) each draw into their own buffers
+_renderers = threading.local()
+
+
+def frame_renderer(width, height, cell_size=32):
+    """The calling thread's FrameRenderer for a grid size, created on first use.
+
+    Every frame of the same size rendered by a process or thread reuses one buffer and one
+    set of marker stamps.
+
+    Args:
+        width (int): Grid width in cells.
+        height (int): Grid height in cells.
+        cell_size (int): Side of one cell in pixels.
+
+    Returns:
+        FrameRenderer: The cached renderer.
+    """
+    if not hasattr(_renderers, 'by_size'):
+        _renderers.by_size = {}
+    key = (width, height, cell_size)
+    if key not in _renderers.by_size:
+        _renderers.by_size[key] = FrameRenderer(width, height, cell_size)
+    return _renderers.by_size[key]
+
+
+def render_frame(frame, cell_size=32):
+    """Render a frame from capture_frame() into a Pillow image.
+
+    The frame is drawn into the reused buffer of frame_renderer(); the returned image holds
+    its own copy of the pixels.
+
+    Args:
+        frame (dict): Frame from capture_frame().
+        cell_size (int): Side of one cell in pixels.
+
+    Returns:
+        PIL.Image.Image: RGB image of the frame.
+    """
+    width, height = frame['heatmap'].shape
+    renderer = frame_renderer(width, height, cell_size)
+    renderer.render(frame['heatmap'], frame['walkable'], frame['rides'])
+    return renderer.to_image(frame['rides'])
+
+
+def encode_frame(frame, cell_size=32, format='PNG'):
+    """Render a frame and encode it.
+
+    Kept at module level so a process pool can pickle it.
+
+    Args:
+        frame (dict): Frame from capture_frame().
+        cell_size (int): Side of one cell in pixels.
+        format (str): Pillow image format.
+
+    Returns:
+        bytes: The encoded image.
+    """
+    out = io.BytesIO()
+    render_frame(frame, cell_size).save(out, format=format)
+    return out.getvalue()
+
+
+def save_frames(frames, paths, cell_size=32, workers=None, executor=None):
+    """Render and write a batch of frames as PNG files.
+
+    Args:
+        frames (list): Frames from capture_frame().
+        paths (list): Output file path of each frame.
+        cell_size (int): Side of one cell in pixels.
+        workers (int): Render on a new pool of this many processes. None or 1 renders serially.
+        executor (concurrent.futures.Executor): Existing pool to render on, reused across
+            calls instead of starting a new one.
+
+    Returns:
+        list: PNG bytes of every frame, which save_animation() accepts without rendering again.
+    """
+    if executor is None and workers is not None and workers > 1:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            return save_frames(frames, paths, cell_size, executor=pool)
+    sizes = [cell_size] * len(frames)
+    encoded = executor.map(encode_frame, frames, sizes) if executor is not None else map(encode_frame, frames, sizes)
+    encoded = list(encoded)
+    for path, data in zip(paths, encoded):
+        with open(path, 'wb') as f:
+            f.write(data)
+    return encoded
+
+
+def save_animation(frames, path, cell_size=32, duration=300):
+    """Write frames as one animated GIF or WebP, chosen by the file extension.
+
+    Args:
+        frames (list): Frames from capture_frame(), or encoded images such as the PNG bytes
+            save_frames() returns, which are only decoded.
+        path (str): Output file path ending in .gif or .webp.
+        cell_size (int): Side of one cell in pixels, for frames that still need rendering.
+        duration (int): Display time of each frame in milliseconds.
+    """
+    images = [Image.open(io.BytesIO(frame)) if isinstance(frame, bytes) else render_frame(frame, cell_size)
+              for frame in frames]
+    if images:
+        images[0].save(path, save_all=True, append_images=images[1:], duration=duration, loop=0)
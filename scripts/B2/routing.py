@@ -0,0 +1,124 @@
+import numpy as np
+from collections import OrderedDict
+
+# Candidate moves, in the order GuestAgent.move_toward_destination has always tried them
+MOVES = np.array([(1, 0), (-1, 0), (0, 1), (0, -1)])
+STAY = -1
+
+
+class RoutingTable:
+    """Shortest-path next-hop tables over the walkable park grid.
+
+    For each destination cell, a breadth-first search outward from the destination gives the
+    walking distance of every cell. The next hop from a cell is its first neighbour (in MOVES
+    order) that is one step closer, so guests walk around restricted blocks instead of getting
+    stuck against them. Cells with no route fall back to the greedy Manhattan move.
+
+    Tables are cached per destination, so when rides move only the new positions are routed.
+
+    Attributes:
+        walkable (np.ndarray): Boolean (width, height) walkability mask.
+        max_tables (int): Maximum number of destination tables kept in the cache.
+        tables (OrderedDict): Cached move tables keyed by destination, least recently used first.
+    """
+    def __init__(self, walkable, max_tables=256):
+        """Initialize an empty routing cache for a park grid.
+
+        Args:
+            walkable (np.ndarray): Boolean (width, height) walkability mask.
+            max_tables (int): Maximum number of destination tables kept in the cache.
+        """
+        self.walkable = walkable
+        self.max_tables = max_tables
+        self.tables = OrderedDict()
+
+    def moves_to(self, destination):
+        """Get the move table toward a destination, routing it if it is not cached.
+
+        Args:
+            destination (tuple): Target (x,y) position.
+
+        Returns:
+            np.ndarray: int8 array of shape (width, height) holding the index into MOVES
+            to take from each cell, or STAY.
+        """
+        key = (int(destination[0]), int(destination[1]))
+        if key in self.tables:
+            self.tables.move_to_end(key)
+            return self.tables[key]
+        table = self._build(key)
+        self.tables[key] = table
+        if len(self.tables) > self.max_tables:
+            self.tables.popitem(last=False)
+        return table
+
+    def stack(self, destinations):
+        """Stack the move tables of several destinations for vectorized lookups.
+
+        Args:
+            destinations (list): Target (x,y) positions.
+
+        Returns:
+            np.ndarray: int8 array of shape (len(destinations), width, height).
+        """
+        if not destinations:
+            return np.empty((0,) + self.walkable.shape, dtype=np.int8)
+        return np.stack([self.moves_to(destination) for destination in destinations])
+
+    def next_position(self, pos, destination):
+        """Get the cell to move to from `pos` on the way to `destination`.
+
+        Args:
+            pos (tuple): Current (x,y) position.
+            destination (tuple): Target (x,y) position.
+
+        Returns:
+            tuple: Next (x,y) position, equal to `pos` if the guest should stay.
+        """
+        move = self.moves_to(destination)[pos]
+        if move == STAY:
+            return pos
+        return (pos[0] + int(MOVES[move, 0]), pos[1] + int(MOVES[move, 1]))
+
+    def _distances(self, destination):
+        """Breadth-first walking distance from every cell to `destination`, -1 if unreachable."""
+        distance = np.full(self.walkable.shape, -1, dtype=np.int32)
+        frontier = np.zeros(self.walkable.shape, dtype=bool)
+        distance[destination] = 0
+        frontier[destination] = True
+        steps = 0
+        while frontier.any():
+            steps += 1
+            grown = np.zeros_like(frontier)
+            grown[1:, :] |= frontier[:-1, :]
+            grown[:-1, :] |= frontier[1:, :]
+            grown[:, 1:] |= frontier[:, :-1]
+            grown[:, :-1] |= frontier[:, 1:]
+            frontier = grown & self.walkable & (distance < 0)
+            distance[frontier] = steps
+        return distance
+
+    def _build(self, destination):
+        """Compute the move table toward `destination` for every cell of the grid."""
+        width, height = self.walkable.shape
+        distance = self._distances(destination)
+        xs, ys = np.meshgrid(np.arange(width), np.arange(height), indexing='ij')
+        cand_x = xs[..., None] + MOVES[:, 0]
+        cand_y = ys[..., None] + MOVES[:, 1]
+        inside = (cand_x >= 0) & (cand_x < width) & (cand_y >= 0) & (cand_y < height)
+
+        # Shortest path: the first neighbour one step closer to the destination
+        neighbour_distance = np.full(cand_x.shape, -1, dtype=np.int32)
+        neighbour_distance[inside] = distance[cand_x[inside], cand_y[inside]]
+        closer = (neighbour_distance >= 0) & (neighbour_distance == distance[..., None] - 1)
+
+        # No route: the walkable neighbour with the smallest Manhattan distance
+        walkable = inside.copy()
+        walkable[inside] = self.walkable[cand_x[inside], cand_y[inside]]
+        manhattan = np.abs(cand_x - destination[0]) + np.abs(cand_y - destination[1])
+        manhattan = np.where(walkable, manhattan, np.iinfo(np.int64).max)
+
+        moves = np.where(closer.any(axis=-1), closer.argmax(axis=-1), manhattan.argmin(axis=-1))
+        moves[~closer.any(axis=-1) & ~walkable.any(axis=-1)] = STAY
+        moves[destination] = STAY
+        return moves.astype(np.int8)
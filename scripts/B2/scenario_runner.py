@@ -0,0 +1,309 @@
+import os
+import json
+import time
+import zlib
+import logging
+import numpy as np
+import pandas as pd
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from objects import *
+from optimisation import *
+from fitness_cache import FitnessCache
+from render import capture_frame, encode_frame
+
+logger = logging.getLogger(__name__)
+
+# Ride counts and samples per model that the Streamlit app browses
+RIDE_COUNTS = range(3, 14)
+SAMPLES = 10
+
+
+def plot_and_save_solution(best_individual, model, possible_rides, sample_num, save_path):
+    """Generate and save a visualization of the optimized ride placement solution.
+
+    Creates a heatmap showing guest activity and marks ride positions with their popularity rank.
+    Restricted areas are highlighted in blue.
+
+    Args:
+        best_individual: Optimized ride positions from genetic algorithm
+        model: Theme park model instance
+        possible_rides: List of available ride configurations
+        sample_num: Iteration number for this simulation run
+        save_path: File path to save the visualization
+    """
+    plt.figure(figsize=(10, 8))
+
+    # Create and normalize heatmap
+    heatmap = model.guest_heatmap()
+    if np.max(heatmap) > 0:
+        heatmap = heatmap / np.max(heatmap)
+
+    # Plot heatmap and rides
+    plt.imshow(heatmap.T, cmap='hot', interpolation='nearest', origin='lower')
+
+
+    for ride_idx, pos in best_individual:
+        ride = possible_rides[ride_idx]
+        x, y = pos
+        plt.scatter(x, y, color='blue', s=200, edgecolor='white')
+        plt.text(x, y + 0.3, str(ride['popularity_rank']),
+                ha='center', color='white', fontsize=12)
+
+    # Handle different restricted area formats
+    if hasattr(model, 'restricted_area'):
+        if isinstance(model.restricted_bottom_left, list):  # Multiple zones
+            for bl, tr in zip(model.restricted_bottom_left, model.restricted_top_right):
+                plt.fill([bl[0]-0.5, tr[0]+0.5, tr[0]+0.5, bl[0]-0.5],
+                        [bl[1]-0.5, bl[1]-0.5, tr[1]+0.5, tr[1]+0.5],
+                        color='blue', alpha=0.3)
+        elif model.restricted_bottom_left:  # Single zone
+            bl, tr = model.restricted_bottom_left, model.restricted_top_right
+            plt.fill([bl[0]-0.5, tr[0]+0.5, tr[0]+0.5, bl[0]-0.5],
+                    [bl[1]-0.5, bl[1]-0.5, tr[1]+0.5, tr[1]+0.5],
+                    color='blue', alpha=0.3)
+
+    plt.title(f"Model: {model.name}\nRides: {len(best_individual)} | Sample: {sample_num}")
+    plt.xlabel("X Coordinate")
+    plt.ylabel("Y Coordinate")
+    plt.grid(True, linestyle='--', alpha=0.5)
+    plt.savefig(save_path, bbox_inches='tight', dpi=150)
+    plt.close()
+
+
+def build_job_manifest(model_configs, ride_counts=RIDE_COUNTS, samples=SAMPLES, master_seed=0):
+    """Expand park configurations, ride counts and samples into a list of optimisation jobs.
+
+    Each job gets a stable ID, which is also the relative path of its image, and a seed
+    derived from the master seed and the ID, so a job re-run after a restart reproduces
+    the same layout.
+
+    Args:
+        model_configs (dict): Park layouts keyed by model name (see MODEL_CONFIGS).
+        ride_counts (iterable): Numbers of rides to optimise for.
+        samples (int): Independent GA runs per model and ride count.
+        master_seed (int): Seed all job seeds are derived from.
+
+    Returns:
+        list: Job dicts with job_id, model, config, num_rides, sample and seed.
+    """
+    jobs = []
+    for model_name, config in model_configs.items():
+        for num_rides in ride_counts:
+            for sample_num in range(samples):
+                job_id = f"{model_name}/number_rides_{num_rides}/sample_{sample_num}"
+                jobs.append({
+                    'job_id': job_id,
+                    'model': model_name,
+                    'config': config,
+                    'num_rides': num_rides,
+                    'sample': sample_num,
+                    'seed': zlib.crc32(repr((master_seed, job_id)).encode()),
+                })
+    return jobs
+
+
+class ResultsStore:
+    """Append-only JSON lines file holding one record per finished job.
+
+    Every record is flushed to disk as soon as its job finishes, so after a crash only the
+    jobs that were still running are lost.
+
+    Attributes:
+        path (str): JSON lines file the records are appended to.
+    """
+    def __init__(self, path):
+        """Open a results store, creating nothing until the first record is written.
+
+        Args:
+            path (str): JSON lines file the records are appended to.
+        """
+        self.path = path
+
+    def records(self):
+        """Read all finished job records.
+
+        Returns:
+            dict: Records keyed by job_id. A line cut short by a crash is ignored.
+        """
+        records = {}
+        if not os.path.exists(self.path):
+            return records
+        with open(self.path) as f:
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue
+                records[record['job_id']] = record
+        return records
+
+    def append(self, record):
+        """Checkpoint one finished job.
+
+        Args:
+            record (dict): JSON-serialisable job record with a job_id.
+        """
+        with open(self.path, 'a') as f:
+            f.write(json.dumps(record) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+
+    def to_table(self):
+        """Collect the finished jobs into a table.
+
+        Returns:
+            pd.DataFrame: One row per finished job, ordered by model, ride count and sample.
+        """
+        table = pd.DataFrame(list(self.records().values()))
+        if table.empty:
+            return table
+        return table.sort_values(['model', 'num_rides', 'sample']).reset_index(drop=True)
+
+
+def run_scenario_job(job, ranking, output_dir, backend='ThemeParkGridModel', engine_config=None, cache=None,
+                     render_mode='matplotlib'):
+    """Optimise the ride placement of one job and save its image.
+
+    Kept at module level so a process pool can pickle it. Service times are drawn from the
+    job seed, so the job does not depend on the worker it runs on.
+
+    Args:
+        job (dict): Job from build_job_manifest().
+        ranking (pd.DataFrame): Ride popularity and capacity data.
+        output_dir (str): Base directory of the images and results.
+        backend (str): 'ThemeParkGridModel' or 'ThemeParkArrayModel'.
+        engine_config (dict): Overrides for DEFAULT_GA_CONFIG.
+        cache (FitnessCache): Optional fitness cache; a fresh in-memory cache is used if None.
+        render_mode (str): 'matplotlib' saves the image with plot_and_save_solution; 'array'
+            renders it headlessly with render.encode_frame.
+
+    Returns:
+        dict: JSON-serialisable record with the best layout, its fitness, the image path,
+        the Pareto front path (Pareto mode only, else None) and the run time.
+    """
+    started = time.perf_counter()
+    config = job['config']
+    park = build_model({
+        'backend': backend,
+        'width': config['width'],
+        'height': config['height'],
+        'restricted_bottom_left': config['restricted_bottom_left'],
+        'restricted_top_right': config['restricted_top_right'],
+        'guest_inflow_type': None,
+    }, seed=job['seed'])
+    park.name = job['model']  # Store model name for plotting
+
+    # Prepare top N rides
+    rng = np.random.default_rng(job['seed'])
+    top_rides = ranking.sort_values('Ranking').head(job['num_rides'])
+    possible_rides = [{
+        "name": str(row['Ranking']),
+        "capacity": row['CAPACITY'],
+        "service_time": int(rng.integers(5, 11)),
+        "popularity_rank": row['Ranking']
+    } for _, row in top_rides.iterrows()]
+
+    # In the Pareto mode the whole front is kept next to the image for re-weighting
+    front = f"{job['job_id']}.front.json" if (engine_config or {}).get('objectives') == 'pareto' else None
+    if front is not None:
+        os.makedirs(os.path.dirname(os.path.join(output_dir, front)), exist_ok=True)
+
+    history = []
+    best_ride_positions = optimize_ride_placement(
+        park, possible_rides, job['num_rides'], seed=job['seed'],
+        cache=cache if cache is not None else FitnessCache(),
+        engine_config=engine_config, history=history,
+        front_path=os.path.join(output_dir, front) if front is not None else None)
+    fitness = evaluate_with_seed(best_ride_positions, park_config(park), possible_rides,
+                                 evaluation_seed(best_ride_positions, job['seed']))[0]
+
+    image = f"{job['job_id']}.png"
+    save_path = os.path.join(output_dir, image)
+    os.makedirs(os.path.dirname(save_path), exist_ok=True)
+    if render_mode == 'array':
+        rides = [(pos[0], pos[1], possible_rides[ride_idx]['popularity_rank']) for ride_idx, pos in best_ride_positions]
+        with open(save_path, 'wb') as f:
+            f.write(encode_frame(capture_frame(park, rides)))
+    else:
+        plot_and_save_solution(best_ride_positions, park, possible_rides, job['sample'], save_path)
+
+    return {
+        'job_id': job['job_id'],
+        'model': job['model'],
+        'num_rides': job['num_rides'],
+        'sample': job['sample'],
+        'seed': job['seed'],
+        'fitness': float(fitness),
+        'generations': len(history),
+        'layout': json.dumps([[int(possible_rides[ride_idx]['popularity_rank']), int(pos[0]), int(pos[1])]
+                              for ride_idx, pos in best_ride_positions]),
+        'image': image,
+        'front': front,
+        'seconds': time.perf_counter() - started,
+    }
+
+
+def run_scenarios(model_configs, ranking, output_dir, workers=None, ride_counts=RIDE_COUNTS, samples=SAMPLES,
+                  master_seed=0, backend='ThemeParkGridModel', engine_config=None, render_mode='matplotlib'):
+    """Run every job of the scenario manifest, resuming from earlier runs.
+
+    Jobs already recorded in `results.jsonl` under `output_dir` are skipped, each finished
+    job is checkpointed there straight away, and the results are written to `results.csv`
+    (one row per job with its layout as [popularity_rank, x, y] triples and its fitness)
+    next to the `<model>/number_rides_<n>/sample_<k>.png` images. The manifest is written
+    to `manifest.csv`.
+
+    When `workers` is above 1 the jobs run on a process pool, so the calling script needs an
+    `if __name__ == "__main__":` guard. Every job gets a fresh in-memory fitness cache: its
+    evaluation seeds derive from the job seed, so no other job could reuse the entries, and a
+    job interrupted by a crash is simply rerun from the start on restart.
+
+    Args:
+        model_configs (dict): Park layouts keyed by model name (see MODEL_CONFIGS).
+        ranking (pd.DataFrame): Ride popularity and capacity data.
+        output_dir (str): Base directory of the images and results.
+        workers (int): Number of worker processes. None or 1 runs the jobs serially.
+        ride_counts (iterable): Numbers of rides to optimise for.
+        samples (int): Independent GA runs per model and ride count.
+        master_seed (int): Seed all job seeds are derived from.
+        backend (str): 'ThemeParkGridModel' or 'ThemeParkArrayModel'.
+        engine_config (dict): Overrides for DEFAULT_GA_CONFIG.
+        render_mode (str): 'matplotlib' or 'array' (headless rendering, see run_scenario_job).
+
+    Returns:
+        pd.DataFrame: Results of all finished jobs, including those from earlier runs.
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    jobs = build_job_manifest(model_configs, ride_counts, samples, master_seed)
+    pd.DataFrame(jobs).drop(columns='config').to_csv(os.path.join(output_dir, 'manifest.csv'), index=False)
+
+    store = ResultsStore(os.path.join(output_dir, 'results.jsonl'))
+    finished = store.records()
+    pending = [job for job in jobs if job['job_id'] not in finished]
+    logger.info(f"{len(jobs) - len(pending)} of {len(jobs)} jobs already finished, running {len(pending)}")
+
+    try:
+        if workers is None or workers <= 1:
+            for job in pending:
+                record = run_scenario_job(job, ranking, output_dir, backend, engine_config, None, render_mode)
+                store.append(record)
+                logger.info(f"Finished {record['job_id']} (fitness {record['fitness']:.2f})")
+        else:
+            with ProcessPoolExecutor(max_workers=workers) as executor:
+                futures = {executor.submit(run_scenario_job, job, ranking, output_dir, backend, engine_config,
+                                           None, render_mode): job
+                           for job in pending}
+                for future in as_completed(futures):
+                    try:
+                        record = future.result()
+                    except Exception:
+                        # Left out of the store, so the job is retried on the next run
+                        logger.exception(f"Job {futures[future]['job_id']} failed")
+                        continue
+                    store.append(record)
+                    logger.info(f"Finished {record['job_id']} (fitness {record['fitness']:.2f})")
+    finally:
+        results = store.to_table()
+        results.to_csv(os.path.join(output_dir, 'results.csv'), index=False)
+    return results
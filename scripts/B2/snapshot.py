@@ -0,0 +1,82 @@
+import pickle
+import zlib
+from objects import ThemeParkGridModel
+from array_model import ThemeParkArrayModel
+
+BACKENDS = {'ThemeParkGridModel': ThemeParkGridModel, 'ThemeParkArrayModel': ThemeParkArrayModel}
+
+
+def snapshot(model, level=6):
+    """Serialise a model's full state (guests, ride queues, clocks, RNG) to compact bytes.
+
+    Args:
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model to capture.
+        level (int): zlib compression level.
+
+    Returns:
+        bytes: Compressed snapshot accepted by restore().
+    """
+    return zlib.compress(pickle.dumps(model.get_state(), protocol=pickle.HIGHEST_PROTOCOL), level)
+
+
+def restore(data, restore_rng=True, seed=None):
+    """Rebuild a model from a snapshot.
+
+    Restoring the same snapshot several times gives independent copies that, with
+    `restore_rng`, draw the same random numbers, so what-if changes made to each copy are
+    compared on common random numbers.
+
+    Args:
+        data (bytes): Snapshot from snapshot().
+        restore_rng (bool): Restore the random number generator states captured with the model.
+        seed (int): Seed of the restored model's generators when `restore_rng` is False.
+
+    Returns:
+        ThemeParkGridModel or ThemeParkArrayModel: The restored model.
+    """
+    state = pickle.loads(zlib.decompress(data))
+    return BACKENDS[state['backend']].from_state(state, restore_rng=restore_rng, seed=seed)
+
+
+def fork(model, restore_rng=True, seed=None):
+    """Copy a model in memory, skipping the binary encoding.
+
+    An array model's fork shares the parent's routing cache instead of routing its rides again.
+
+    Args:
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model to copy.
+        restore_rng (bool): Give the copy the model's random generator states at the fork.
+        seed (int): Seed of the copy's generators when `restore_rng` is False.
+
+    Returns:
+        ThemeParkGridModel or ThemeParkArrayModel: Independent copy of the model.
+    """
+    state = model.get_state()
+    if isinstance(model, ThemeParkArrayModel):
+        return ThemeParkArrayModel.from_state(state, restore_rng=restore_rng, routing=model.routing, seed=seed)
+    return type(model).from_state(state, restore_rng=restore_rng, seed=seed)
+
+
+def save_snapshot(model, path):
+    """Write a model snapshot to a file.
+
+    Args:
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model to capture.
+        path (str): Output file path.
+    """
+    with open(path, 'wb') as f:
+        f.write(snapshot(model))
+
+
+def load_snapshot(path, restore_rng=True):
+    """Rebuild a model from a snapshot file written by save_snapshot().
+
+    Args:
+        path (str): Snapshot file path.
+        restore_rng (bool): Restore the random number generator states captured with the model.
+
+    Returns:
+        ThemeParkGridModel or ThemeParkArrayModel: The restored model.
+    """
+    with open(path, 'rb') as f:
+        return restore(f.read(), restore_rng=restore_rng)
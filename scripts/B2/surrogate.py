@@ -0,0 +1,113 @@
+import numpy as np
+
+
+def layout_features(individual, possible_rides, model):
+    """Describe a ride layout by the inputs that drive fitness_function.
+
+    Features are fixed-length for a given number of rides: ride positions and popularity
+    ranks (ordered by rank), pairwise distance statistics, spacing of the popular rides,
+    distance from the entrance at `start_pos` and the number of rides on restricted cells.
+
+    Args:
+        individual (list): List of (ride_index, position) pairs.
+        possible_rides (list): List of available ride configurations.
+        model (ThemeParkGridModel or ThemeParkArrayModel): Model giving the park layout.
+
+    Returns:
+        np.ndarray: 1-D feature vector.
+    """
+    width, height = model.grid.width, model.grid.height
+    ranks = np.array([float(possible_rides[ride_idx]['popularity_rank']) for ride_idx, _ in individual])
+    positions = np.array([pos for _, pos in individual], dtype=float)
+    order = np.argsort(ranks, kind='stable')
+    ranks, positions = ranks[order], positions[order]
+
+    scaled = positions / [max(width - 1, 1), max(height - 1, 1)]
+    pairwise = np.sqrt(((positions[:, None, :] - positions[None, :, :]) ** 2).sum(axis=-1))
+    upper = pairwise[np.triu_indices(len(positions), k=1)]
+    popular = ranks <= 3
+    popular_pairs = pairwise[np.ix_(popular, popular)][np.triu_indices(popular.sum(), k=1)]
+    entrance = np.abs(positions - model.start_pos).sum(axis=1)
+    restricted = np.count_nonzero(~model.walkable[positions[:, 0].astype(int), positions[:, 1].astype(int)])
+
+    return np.concatenate([
+        scaled.ravel(),
+        1 / ranks,
+        [
+            upper.min() if len(upper) else 0,
+            upper.mean() if len(upper) else 0,
+            popular_pairs.min() if len(popular_pairs) else 0,
+            np.clip(3 - popular_pairs, 0, None).sum(),  # Closeness the GA penalises
+            entrance.mean(),
+            entrance.min(),
+            (entrance / ranks).sum() / (1 / ranks).sum(),  # Popularity-weighted entrance distance
+            restricted,
+        ],
+    ])
+
+
+class SurrogateModel:
+    """Online ridge regression from layout features to simulated fitness.
+
+    Used by optimize_ride_placement to rank offspring cheaply so only the most promising
+    ones are simulated. It is refitted from every simulated layout seen so far.
+
+    Attributes:
+        alpha (float): Ridge regularisation strength.
+        min_samples (int): Simulated layouts needed before the surrogate is used.
+        features (list): Feature vectors of simulated layouts.
+        targets (list): Their simulated fitness values.
+    """
+    def __init__(self, alpha=1.0, min_samples=16):
+        """Create an untrained surrogate.
+
+        Args:
+            alpha (float): Ridge regularisation strength.
+            min_samples (int): Simulated layouts needed before the surrogate is used.
+        """
+        self.alpha = alpha
+        self.min_samples = min_samples
+        self.features = []
+        self.targets = []
+        self._weights = None
+
+    @property
+    def ready(self):
+        """Whether enough layouts have been simulated to trust the surrogate."""
+        return len(self.targets) >= self.min_samples
+
+    def add(self, features, fitness):
+        """Record one simulated layout; the surrogate is refitted on the next prediction.
+
+        Args:
+            features (np.ndarray): Feature vector from layout_features().
+            fitness (float): Simulated fitness of the layout.
+        """
+        self.features.append(features)
+        self.targets.append(fitness)
+        self._weights = None
+
+    def _fit(self):
+        X = np.array(self.features)
+        y = np.array(self.targets)
+        self._mean = X.mean(axis=0)
+        self._scale = X.std(axis=0)
+        self._scale[self._scale == 0] = 1
+        Xb = np.column_stack([(X - self._mean) / self._scale, np.ones(len(X))])
+        penalty = self.alpha * np.eye(Xb.shape[1])
+        penalty[-1, -1] = 0  # Intercept is not regularised
+        self._weights = np.linalg.solve(Xb.T @ Xb + penalty, Xb.T @ y)
+
+    def predict(self, features):
+        """Predict fitness for a batch of layouts.
+
+        Args:
+            features (np.ndarray): Array of shape (n_layouts, n_features).
+
+        Returns:
+            np.ndarray: Predicted fitness per layout.
+        """
+        if self._weights is None:
+            self._fit()
+        X = (np.asarray(features) - self._mean) / self._scale
+        return X @ self._weights[:-1] + self._weights[-1]
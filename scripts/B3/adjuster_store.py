@@ -0,0 +1,121 @@
+import glob
+import calendar
+import numpy as np
+from pathlib import Path
+from scripts.B3.adjusters import DemandAdjusters
+
+DATA_DIR = Path(__file__).resolve().parent.parent.parent / "data" / "B3"
+ADJUSTER_TABLE_PATH = DATA_DIR / "adjusters.npy"
+ADJUSTER_TABLE_VERSION = 1
+MONTHS = list(calendar.month_name[1:])
+DAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+MONTH_INDEX = {month: i for i, month in enumerate(MONTHS)}
+DAY_INDEX = {day: i for i, day in enumerate(DAYS)}
+HOUR_ADJUSTERS = ("hour_rides", "hour_eatery", "hour_merch", "hour_general")
+HOUR_SLOTS = 25  # Hours 0-24; the general adjuster's hours are shifted by one
+
+# One record holding every adjuster; missing keys are stored as 1 (no adjustment)
+ADJUSTER_DTYPE = np.dtype([
+    ('version', np.int32),
+    ('month_day', np.float64, (len(MONTHS), len(DAYS))),  # Month x day of week
+    ('hour', np.float64, (len(HOUR_ADJUSTERS), HOUR_SLOTS)),  # Category x hour of day
+    ('public_holiday', np.float64, (2,)),  # Not a holiday, holiday
+    ('rain', np.float64, (2,)),  # Dry, rainy
+])
+
+# Inputs of the adjusters pipeline in DATA_DIR, and the park whose weather drives the rain adjuster
+PIPELINE_INPUTS = {
+    'attendance_filepath': DATA_DIR / "attendance.csv",
+    'waiting_times_filepaths': DATA_DIR / "waiting_times*.csv",
+    'hpg_paths': DATA_DIR / "hpg_reserve*.csv",
+    'air_path': DATA_DIR / "air_reserve.csv",
+    'retail_filepath': DATA_DIR / "retail_daily_hourly.csv",
+    'park_filepath': DATA_DIR / "park_daily_hourly_peaks.csv",
+    'latitude': 55.6737,  # Tivoli Gardens
+    'longitude': 12.5681,
+    'start_date': "2018-06-01",
+    'end_date': "2022-07-26",
+}
+
+def adjusters_from_pipeline(preparer):
+    """Run the adjusters pipeline: DataPreparer outputs through DemandAdjusters.create_all().
+
+    The rain adjuster compares the guests carried by all rides on each day with that day's
+    weather, so the waiting times are summed per day and merged with the weather data.
+
+    Args:
+        preparer (DataPreparer): Preparer pointing at the raw data.
+
+    Returns:
+        dict: Every adjuster, keyed as DemandAdjusters.create_all() returns them.
+    """
+    waiting_times = preparer.prepare_waiting_times()
+    hpg_hourly_all_sum, air_hourly_all_sum = preparer.prepare_reserve_data()
+    daily_guests = (waiting_times.groupby(waiting_times['DEB_TIME'].dt.normalize())['GUEST_CARRIED'].sum()
+                    .rename('TOTAL_GUESTS_CARRIED'))
+    weather_merged = preparer.prepare_weather_data().merge(daily_guests, left_on='time', right_index=True)
+    return DemandAdjusters(
+        attendance_data=preparer.prepare_attendance_data(),
+        waiting_times=waiting_times,
+        hpg_hourly_all_sum=hpg_hourly_all_sum,
+        air_hourly_all_sum=air_hourly_all_sum,
+        retail_daily_hourly=preparer.prepare_retail_data(),
+        park_daily_hourly=preparer.prepare_park_data(),
+        weather_merged=weather_merged
+    ).create_all()
+
+def build_adjuster_table(adjusters):
+    """Pack an adjusters dictionary (e.g. from DemandAdjusters.create_all()) into one ADJUSTER_DTYPE record."""
+    table = np.ones((), dtype=ADJUSTER_DTYPE)
+    table['version'] = ADJUSTER_TABLE_VERSION
+    for (month, day), value in adjusters['month_day'].items():
+        table['month_day'][int(month) - 1, DAY_INDEX[day]] = value
+    for i, name in enumerate(HOUR_ADJUSTERS):
+        for hour, value in adjusters[name].items():
+            table['hour'][i, int(hour)] = value
+    for name in ('public_holiday', 'rain'):
+        for key, value in adjusters[name].items():
+            table[name][int(key)] = value
+    return table
+
+def as_adjuster_table(adjusters):
+    """The adjuster table itself, or the table packed from an adjusters dictionary."""
+    if isinstance(adjusters, dict):
+        return build_adjuster_table(adjusters)
+    return adjusters
+
+def save_adjuster_table(adjusters, path=ADJUSTER_TABLE_PATH):
+    """Write all adjusters as one versioned .npy lookup table."""
+    np.save(path, as_adjuster_table(adjusters))
+
+def load_adjuster_table(path=ADJUSTER_TABLE_PATH):
+    """Memory-map the adjuster lookup table; StaffingOptimizer indexes it directly.
+
+    Raises:
+        ValueError: If the table was written by another version of the layout.
+    """
+    table = np.load(path, mmap_mode='r')
+    if table.dtype != ADJUSTER_DTYPE or int(table['version']) != ADJUSTER_TABLE_VERSION:
+        raise ValueError(f"Unsupported adjuster table in {path}; rebuild it with `python -m scripts.B3.adjuster_store`")
+    return table
+
+def table_to_adjusters(table):
+    """Adjusters dictionary, keyed as DemandAdjusters.create_all() returns them, read from a lookup table."""
+    month_day = np.asarray(table['month_day'])
+    hour = np.asarray(table['hour'])
+    return {
+        'month_day': {(month + 1, day): float(month_day[month, i]) for month in range(len(MONTHS)) for i, day in enumerate(DAYS)},
+        **{name: dict(enumerate(hour[i].tolist())) for i, name in enumerate(HOUR_ADJUSTERS)},
+        'public_holiday': dict(enumerate(np.asarray(table['public_holiday']).tolist())),
+        'rain': dict(enumerate(np.asarray(table['rain']).tolist()))
+    }
+
+if __name__ == "__main__":
+    from scripts.B3.data_preparation import DataPreparer
+    inputs = dict(PIPELINE_INPUTS)
+    for name in ('waiting_times_filepaths', 'hpg_paths'):
+        inputs[name] = sorted(glob.glob(str(inputs[name])))
+        if not inputs[name]:
+            raise FileNotFoundError(f"No files match {PIPELINE_INPUTS[name]}")
+    save_adjuster_table(adjusters_from_pipeline(DataPreparer(**inputs)))
+    print(f"Wrote {ADJUSTER_TABLE_PATH}")
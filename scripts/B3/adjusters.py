@@ -1,6 +1,13 @@
 import numpy as np
+import pandas as pd
 import holidays
 
+HOLIDAY_YEARS = [2018, 2019, 2020, 2021, 2022]
+
+def holiday_index(country_holidays):
+    """Dates of a `holidays` calendar as a DatetimeIndex, for vectorized membership checks."""
+    return pd.DatetimeIndex(sorted(country_holidays.keys()))
+
 class DemandAdjusters:
     def __init__(self, attendance_data=None, waiting_times=None, hpg_hourly_all_sum=None, air_hourly_all_sum=None,
                  retail_daily_hourly=None, park_daily_hourly=None, weather_merged=None):
@@ -105,8 +112,9 @@ class DemandAdjusters:
         portaventura_df = self.attendance_data[self.attendance_data["FACILITY_NAME"] == "PortAventura World"]
         tivoli_df = self.attendance_data[self.attendance_data["FACILITY_NAME"] == "Tivoli Gardens"]
 
-        spain_holidays = holidays.Spain(years=[2018, 2019, 2020, 2021, 2022])
-        portaventura_df["is_holiday"] = portaventura_df["USAGE_DATE"].apply(lambda x: x in spain_holidays)
+        spain_holidays = holiday_index(holidays.Spain(years=HOLIDAY_YEARS))
+        portaventura_df = portaventura_df.assign(
+            is_holiday=pd.to_datetime(portaventura_df["USAGE_DATE"]).dt.normalize().isin(spain_holidays))
 
         overall_daily_attendance = portaventura_df["attendance"].mean()
         holiday_attendance = portaventura_df[portaventura_df["is_holiday"] == True]["attendance"].mean()
@@ -115,8 +123,9 @@ class DemandAdjusters:
         ph_adjuster_spain = (holiday_attendance - overall_daily_attendance) / overall_daily_attendance
         non_ph_adjuster_spain = (non_holiday_attendance - overall_daily_attendance) / overall_daily_attendance
 
-        denmark_holidays = holidays.Denmark(years=[2018, 2019, 2020, 2021, 2022])
-        tivoli_df["is_holiday"] = tivoli_df["USAGE_DATE"].apply(lambda x: x in denmark_holidays)
+        denmark_holidays = holiday_index(holidays.Denmark(years=HOLIDAY_YEARS))
+        tivoli_df = tivoli_df.assign(
+            is_holiday=pd.to_datetime(tivoli_df["USAGE_DATE"]).dt.normalize().isin(denmark_holidays))
 
         overall_daily_attendance = tivoli_df["attendance"].mean()
         holiday_attendance = tivoli_df[tivoli_df["is_holiday"] == True]["attendance"].mean()
@@ -140,4 +149,16 @@ class DemandAdjusters:
         ) / overall_mean
         mean_guests_by_rain["adjuster"] = (1 + mean_guests_by_rain["pct_diff_from_overall"])
 
-        return mean_guests_by_rain.set_index("Rainy")["adjuster"].to_dict()
\ No newline at end of file
+        return mean_guests_by_rain.set_index("Rainy")["adjuster"].to_dict()
+
+    def create_all(self):
+        """Create every adjuster, keyed as StaffingOptimizer expects."""
+        return {
+            'month_day': self.create_month_day_adjuster(),
+            'hour_rides': self.create_hourly_rides_adjuster(),
+            'hour_eatery': self.create_hourly_eatery_adjuster(),
+            'hour_merch': self.create_hourly_merch_adjuster(),
+            'hour_general': self.create_hourly_general_adjuster(),
+            'public_holiday': self.create_public_holiday_adjuster(),
+            'rain': self.create_rain_adjuster()
+        }
@@ -0,0 +1,99 @@
+import time
+import calendar
+import cvxpy as cp
+import numpy as np
+import pandas as pd
+from scripts.B3.optimization_model import StaffingOptimizer, HOURS, CATEGORIES, STAFF_RATIOS
+from scripts.B3.planner import all_scenarios
+from scripts.B3.adjuster_store import load_adjuster_table, table_to_adjusters, HOUR_ADJUSTERS
+
+def original_staffing_lp(adjusters, base_demand, month, day, rain, public_holiday):
+    """Solve one scenario with the original formulation, as a baseline for the benchmark.
+
+    This is the body of the original StaffingOptimizer.optimize_staffing: 56 scalar
+    variables, one constraint per (category, hour) cell, and the problem built and
+    canonicalized again for every scenario.
+
+    Args:
+        adjusters (dict): Adjusters dictionary, as table_to_adjusters() returns it.
+
+    Returns:
+        np.ndarray: (category, hour) staff levels.
+    """
+    month_num = list(calendar.month_name).index(month) if month in calendar.month_name else None
+    month_day_key = (month_num, day)
+    staff = {(category, hour): cp.Variable(nonneg=True) for category in CATEGORIES for hour in HOURS}
+
+    month_day_multiplier = adjusters['month_day'].get(month_day_key, 1)
+    public_holiday_multiplier = adjusters['public_holiday'][int(public_holiday)]
+    rain_multiplier = adjusters['rain'][int(rain)]
+
+    constraints = []
+    for hour in HOURS:
+        for category, name, ratio in zip(CATEGORIES, HOUR_ADJUSTERS, STAFF_RATIOS):
+            adjusted_demand = (base_demand * month_day_multiplier * adjusters[name].get(hour, 1) *
+                               public_holiday_multiplier * rain_multiplier)
+            constraints.append(staff[(category, hour)] >= adjusted_demand / ratio)
+
+    problem = cp.Problem(cp.Minimize(cp.sum(list(staff.values()))), constraints)
+    problem.solve()
+    if problem.status != cp.OPTIMAL:
+        raise ValueError("Optimization failed with status:", problem.status)
+    return np.array([[staff[(category, hour)].value for hour in HOURS] for category in CATEGORIES])
+
+def benchmark_staffing_solves(adjusters, base_demand=10000, scenarios=None):
+    """Time the staffing model over many scenarios with each solution method.
+
+    "original scalar LP" is the formulation the page used before, from
+    original_staffing_lp(). The vectorized LP modes add a staff-hour budget that never
+    binds (one staff member per guest per hour), which couples the problem and forces the
+    cvxpy path while keeping the same optimum. "vectorized LP rebuilt per scenario" pays
+    the cvxpy canonicalization every time; "vectorized LP compiled once" only updates the
+    parameter and re-solves with a warm start. The closed-form modes take the separable
+    fast path, one scenario at a time and all at once with solve_many().
+
+    Args:
+        adjusters (np.ndarray): Adjuster table from adjuster_store.load_adjuster_table().
+        base_demand (float): Estimated park attendance for the day.
+        scenarios (list): (month, day, rain, public_holiday) scenarios; all_scenarios() if None.
+
+    Returns:
+        pd.DataFrame: Solves, seconds and solves per second of each mode.
+    """
+    scenarios = scenarios if scenarios is not None else all_scenarios()
+    loose_budget = base_demand * len(HOURS)
+    results = []
+
+    # The original formulation reads the adjusters as dictionaries
+    adjuster_dicts = table_to_adjusters(adjusters)
+    start = time.perf_counter()
+    for scenario in scenarios:
+        original_staffing_lp(adjuster_dicts, base_demand, *scenario)
+    results.append(('original scalar LP', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    for scenario in scenarios:
+        StaffingOptimizer(adjusters, base_demand, budget=loose_budget).solve(*scenario)
+    results.append(('vectorized LP rebuilt per scenario', time.perf_counter() - start))
+
+    optimizer = StaffingOptimizer(adjusters, base_demand, budget=loose_budget)
+    start = time.perf_counter()
+    for scenario in scenarios:
+        optimizer.solve(*scenario)
+    results.append(('vectorized LP compiled once', time.perf_counter() - start))
+
+    optimizer = StaffingOptimizer(adjusters, base_demand)
+    start = time.perf_counter()
+    for scenario in scenarios:
+        optimizer.solve(*scenario)
+    results.append(('closed form', time.perf_counter() - start))
+
+    start = time.perf_counter()
+    optimizer.solve_many(scenarios)
+    results.append(('closed form, batched', time.perf_counter() - start))
+
+    return pd.DataFrame([{'mode': mode, 'solves': len(scenarios), 'seconds': seconds,
+                          'solves_per_second': len(scenarios) / seconds} for mode, seconds in results])
+
+if __name__ == "__main__":
+    print(benchmark_staffing_solves(load_adjuster_table()).to_string(index=False))
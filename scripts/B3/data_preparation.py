@@ -26,9 +26,7 @@ class DataPreparer:
         attendance_data["Day_of_Week"] = attendance_data["USAGE_DATE"].dt.day_name()
         
         # Handle negative attendance
-        for x in attendance_data.index:
-            if attendance_data.loc[x, "attendance"] < 0:
-                attendance_data.loc[x, "attendance"] = 0
+        attendance_data["attendance"] = attendance_data["attendance"].clip(lower=0)
         
         # Standardize attendance
         attendance_data["mean_attendance"] = attendance_data.groupby(["Year", "FACILITY_NAME"])["attendance"].transform("mean")
@@ -1,106 +1,121 @@
 import cvxpy as cp
+import numpy as np
 import pandas as pd
-import calendar
+import threading
+from scripts.B3.adjuster_store import as_adjuster_table, MONTH_INDEX, DAY_INDEX
+
+# Opening hours (9 AM to 10 PM), staffing categories and the demand one staff member covers
+HOURS = np.arange(9, 23)
+CATEGORIES = ("Rides", "Eatery", "Merchandise", "General")
+STAFF_RATIOS = np.array([30, 30, 30, 50])
+SCHEDULE_COLUMNS = ['Month', 'Day', 'Hour', 'Category', 'Staff', 'Rain', 'Public Holiday']
 
 class StaffingOptimizer:
-    def __init__(self, adjusters, base_demand):
-        self.adjusters = adjusters
+    def __init__(self, adjusters, base_demand, min_staff=None, hourly_cap=None, budget=None):
+        """Prepare the staffing model for a base demand.
+
+        Without coupling constraints the LP is separable: each (category, hour) level only
+        has its own lower bounds, so the optimum is the largest of them and is computed in
+        closed form with NumPy. An hourly headcount cap or a staff-hour budget couples the
+        levels; the LP is then compiled once with cvxpy, with the scenario entering only
+        through the `requirement` parameter, and re-solved for every scenario.
+
+        Args:
+            adjusters (np.ndarray): Adjuster table from adjuster_store.load_adjuster_table(),
+                usually memory-mapped. The month-day, hour, rain and public holiday
+                multipliers are read by indexing its fields. An adjusters dictionary, as
+                DemandAdjusters.create_all() returns, is packed into a table first.
+            base_demand (float): Estimated park attendance for the day.
+            min_staff (float or array-like): Minimum staff per hour, overall or per category.
+            hourly_cap (float): Maximum total staff in any hour, or None.
+            budget (float): Maximum staff-hours over the day, or None.
+        """
+        self.adjusters = as_adjuster_table(adjusters)
         self.base_demand = base_demand
-        
+        self.min_staff = np.broadcast_to(np.asarray(0 if min_staff is None else min_staff, dtype=float),
+                                         (len(CATEGORIES),))[:, None]
+        self.hourly_cap = hourly_cap
+        self.budget = budget
+
+        # Views of the table's fields: (month, day of week), (not holiday, holiday) and (dry, rainy)
+        self.month_day = self.adjusters['month_day']
+        self.public_holiday = self.adjusters['public_holiday']
+        self.rain = self.adjusters['rain']
+
+        # Demand per staff member of each category and hour before the day multipliers
+        self.hourly_load = base_demand * self.adjusters['hour'][:, HOURS] / STAFF_RATIOS[:, None]
+
+        self.problem = None
+        if not self.separable:
+            # The product of the multipliers is one parameter: a product of parameters would not be DPP
+            # and would force cvxpy to recompile the problem on every solve
+            self.staff = cp.Variable((len(CATEGORIES), len(HOURS)), nonneg=True)
+            self.requirement = cp.Parameter((len(CATEGORIES), len(HOURS)), nonneg=True)
+            constraints = [self.staff >= self.requirement]
+            if hourly_cap is not None:
+                constraints.append(cp.sum(self.staff, axis=0) <= hourly_cap)
+            if budget is not None:
+                constraints.append(cp.sum(self.staff) <= budget)
+            self.problem = cp.Problem(cp.Minimize(cp.sum(self.staff)), constraints)
+            self._lock = threading.Lock()  # One solve at a time when Streamlit sessions share the optimizer
+
+    @property
+    def separable(self):
+        """True when no constraint couples categories or hours, so the closed form is optimal."""
+        return self.hourly_cap is None and self.budget is None
+
+    def day_multiplier(self, month, day, rain, public_holiday):
+        """Product of the month-day, public holiday and rain multipliers of a scenario."""
+        return (self.month_day[MONTH_INDEX[month], DAY_INDEX[day]] *
+                self.public_holiday[int(public_holiday)] * self.rain[int(rain)])
+
+    def day_multipliers(self, scenarios):
+        """day_multiplier() of many (month, day, rain, public_holiday) scenarios, gathered from the table at once."""
+        months, days, rain, public_holiday = zip(*scenarios) if len(scenarios) else ((),) * 4
+        return (self.month_day[[MONTH_INDEX[month] for month in months], [DAY_INDEX[day] for day in days]] *
+                self.public_holiday[np.array(public_holiday, dtype=int)] * self.rain[np.array(rain, dtype=int)])
+
+    def requirements(self, multipliers):
+        """Lower bound on every staff level for one or more day multipliers.
+
+        Returns:
+            np.ndarray: (..., category, hour) staff needed to cover demand and the minimum staffing.
+        """
+        multipliers = np.asarray(multipliers, dtype=float)[..., None, None]
+        return np.maximum(self.hourly_load * multipliers, self.min_staff)
+
+    def solve(self, month, day, rain, public_holiday):
+        """Solve one scenario and return the (category, hour) staff matrix."""
+        requirement = self.requirements(self.day_multiplier(month, day, rain, public_holiday))
+        if self.separable:
+            return requirement
+        with self._lock:
+            self.requirement.value = requirement
+            self.problem.solve(warm_start=True)
+            if self.problem.status != cp.OPTIMAL:
+                raise ValueError("Optimization failed with status:", self.problem.status)
+            return self.staff.value.copy()
+
+    def solve_many(self, scenarios):
+        """Solve many (month, day, rain, public_holiday) scenarios.
+
+        Separable problems are solved for all scenarios in one array operation; otherwise
+        the compiled LP is re-solved once per scenario.
+
+        Returns:
+            np.ndarray: (scenario, category, hour) staff levels.
+        """
+        if self.separable:
+            return self.requirements(self.day_multipliers(scenarios))
+        return np.array([self.solve(*scenario) for scenario in scenarios])
+
     def optimize_staffing(self, month, day, rain, public_holiday):
         """Optimize staffing based on given parameters."""
-        month_num = list(calendar.month_name).index(month) if month in calendar.month_name else None
-        month_day_key = (month_num, day)
-        
-        # Initialize decision variables
-        staff_rides = {(month_day_key, hour): cp.Variable(nonneg=True) for hour in range(9, 23)}
-        staff_eatery = {(month_day_key, hour): cp.Variable(nonneg=True) for hour in range(9, 23)}
-        staff_merch = {(month_day_key, hour): cp.Variable(nonneg=True) for hour in range(9, 23)}
-        staff_general = {(month_day_key, hour): cp.Variable(nonneg=True) for hour in range(9, 23)}
-        
-        # Get multipliers
-        month_day_multiplier = self.adjusters['month_day'].get(month_day_key, 1)
-        public_holiday_multiplier = self.adjusters['public_holiday'][int(public_holiday)]
-        rain_multiplier = self.adjusters['rain'][int(rain)]
-        
-        # Constraints
-        constraints = []
-        for hour in range(9, 23):
-            hour_multiplier_rides = self.adjusters['hour_rides'].get(hour, 1)
-            hour_multiplier_eatery = self.adjusters['hour_eatery'].get(hour, 1)
-            hour_multiplier_merch = self.adjusters['hour_merch'].get(hour, 1)
-            hour_multiplier_general = self.adjusters['hour_general'].get(hour, 1)
-            
-            adjusted_demand_rides = (
-                self.base_demand * month_day_multiplier * hour_multiplier_rides * 
-                public_holiday_multiplier * rain_multiplier
-            )
-            adjusted_demand_eatery = (
-                self.base_demand * month_day_multiplier * hour_multiplier_eatery * 
-                public_holiday_multiplier * rain_multiplier
-            )
-            adjusted_demand_merch = (
-                self.base_demand * month_day_multiplier * hour_multiplier_merch * 
-                public_holiday_multiplier * rain_multiplier
-            )
-            adjusted_demand_general = (
-                self.base_demand * month_day_multiplier * hour_multiplier_general * 
-                public_holiday_multiplier * rain_multiplier
-            )
-            
-            # Set constraints
-            constraints.append(staff_rides[(month_day_key, hour)] >= adjusted_demand_rides / 30)
-            constraints.append(staff_eatery[(month_day_key, hour)] >= adjusted_demand_eatery / 30)
-            constraints.append(staff_merch[(month_day_key, hour)] >= adjusted_demand_merch / 30)
-            constraints.append(staff_general[(month_day_key, hour)] >= adjusted_demand_general / 50)
-        
-        # Objective function
-        total_staff = (
-            cp.sum([staff_rides[(month_day_key, hour)] for hour in range(9, 23)]) +
-            cp.sum([staff_eatery[(month_day_key, hour)] for hour in range(9, 23)]) +
-            cp.sum([staff_merch[(month_day_key, hour)] for hour in range(9, 23)]) +
-            cp.sum([staff_general[(month_day_key, hour)] for hour in range(9, 23)])
+        staff = self.solve(month, day, rain, public_holiday)
+        return tuple(
+            pd.DataFrame({
+                'Month': month, 'Day': day, 'Hour': HOURS, 'Category': category,
+                'Staff': staff[i], 'Rain': rain, 'Public Holiday': public_holiday
+            }, columns=SCHEDULE_COLUMNS)
+            for i, category in enumerate(CATEGORIES)
         )
-        
-        objective = cp.Minimize(total_staff)
-        problem = cp.Problem(objective, constraints)
-        problem.solve()
-        
-        if problem.status == cp.OPTIMAL:
-            optimized_ride_staffing = [
-                (month, day, hour, "Rides", staff_rides[(month_day_key, hour)].value, rain, public_holiday) 
-                for hour in range(9,23)
-            ]
-            optimized_eatery_staffing = [
-                (month, day, hour, "Eatery", staff_eatery[(month_day_key, hour)].value, rain, public_holiday) 
-                for hour in range(9,23)
-            ]
-            optimized_merch_staffing = [
-                (month, day, hour, "Merchandise", staff_merch[(month_day_key, hour)].value, rain, public_holiday) 
-                for hour in range(9,23)
-            ]
-            optimized_general_staffing = [
-                (month, day, hour, "General", staff_general[(month_day_key, hour)].value, rain, public_holiday) 
-                for hour in range(9,23)
-            ]
-            
-            staff_schedule_rides = pd.DataFrame(
-                optimized_ride_staffing, 
-                columns=['Month', 'Day', 'Hour', 'Category', 'Staff', 'Rain', 'Public Holiday']
-            )
-            staff_schedule_eatery = pd.DataFrame(
-                optimized_eatery_staffing, 
-                columns=['Month', 'Day', 'Hour', 'Category', 'Staff', 'Rain', 'Public Holiday']
-            )
-            staff_schedule_merch = pd.DataFrame(
-                optimized_merch_staffing, 
-                columns=['Month', 'Day', 'Hour', 'Category', 'Staff', 'Rain', 'Public Holiday']
-            )
-            staff_schedule_general = pd.DataFrame(
-                optimized_general_staffing, 
-                columns=['Month', 'Day', 'Hour', 'Category', 'Staff', 'Rain', 'Public Holiday']
-            )
-            
-            return staff_schedule_rides, staff_schedule_eatery, staff_schedule_merch, staff_schedule_general
-        else:
-            raise ValueError("Optimization failed with status:", problem.status)
\ No newline at end of file
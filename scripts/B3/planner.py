@@ -0,0 +1,124 @@
+import json
+import itertools
+import numpy as np
+import pandas as pd
+from itertools import repeat
+from concurrent.futures import ProcessPoolExecutor
+from scripts.B3.optimization_model import StaffingOptimizer, HOURS, CATEGORIES, SCHEDULE_COLUMNS
+from scripts.B3.adjuster_store import load_adjuster_table, MONTHS, DAYS, MONTH_INDEX, DAY_INDEX
+
+# Axes of the schedule cube, in order
+CUBE_DIMS = ('month', 'day', 'rain', 'public_holiday', 'category', 'hour')
+CUBE_VERSION = 1
+
+def all_scenarios():
+    """Every (month, day, rain, public holiday) scenario of a year: 12 x 7 x 2 x 2 = 336, in cube order."""
+    return list(itertools.product(MONTHS, DAYS, (False, True), (False, True)))
+
+def _solve_chunk(adjusters, base_demand, constraints, scenarios):
+    """Solve a chunk of scenarios on a worker's own optimizer (module level so a process pool can pickle it)."""
+    return StaffingOptimizer(adjusters, base_demand, **constraints).solve_many(scenarios)
+
+class ScheduleCube:
+    """Optimized staffing of every scenario of a year, indexed scenario x category x hour.
+
+    The staff levels are one float array of shape (12, 7, 2, 2, 4, 14) along CUBE_DIMS,
+    so any schedule is read by indexing, and year-level totals and comparisons are array
+    reductions.
+    """
+    def __init__(self, staff, base_demand, constraints=None):
+        self.staff = np.asarray(staff, dtype=float).reshape(len(MONTHS), len(DAYS), 2, 2, len(CATEGORIES), len(HOURS))
+        self.base_demand = base_demand
+        self.constraints = constraints or {}
+
+    def index(self, month, day, rain, public_holiday):
+        """Cube position of a scenario."""
+        return MONTH_INDEX[month], DAY_INDEX[day], int(rain), int(public_holiday)
+
+    def schedule(self, month, day, rain, public_holiday):
+        """(category, hour) staff matrix of a scenario."""
+        return self.staff[self.index(month, day, rain, public_holiday)]
+
+    def schedules(self, month, day, rain, public_holiday):
+        """Per-category schedules of a scenario, as StaffingOptimizer.optimize_staffing returns them."""
+        staff = self.schedule(month, day, rain, public_holiday)
+        return tuple(
+            pd.DataFrame({
+                'Month': month, 'Day': day, 'Hour': HOURS, 'Category': category,
+                'Staff': staff[i], 'Rain': rain, 'Public Holiday': public_holiday
+            }, columns=SCHEDULE_COLUMNS)
+            for i, category in enumerate(CATEGORIES)
+        )
+
+    def daily_totals(self, rain=False, public_holiday=False):
+        """Staff-hours per day over all categories, as a month x day of week table."""
+        totals = self.staff[:, :, int(rain), int(public_holiday)].sum(axis=(-2, -1))
+        return pd.DataFrame(totals, index=MONTHS, columns=DAYS)
+
+    def category_totals(self):
+        """Staff-hours per category of every scenario, indexed by month, day, rain and public holiday."""
+        totals = self.staff.sum(axis=-1).reshape(-1, len(CATEGORIES))
+        index = pd.MultiIndex.from_tuples(all_scenarios(), names=['Month', 'Day', 'Rain', 'Public Holiday'])
+        return pd.DataFrame(totals, index=index, columns=list(CATEGORIES))
+
+    def uplift(self, dim):
+        """Relative change in daily staff-hours when it rains ('rain') or on a public holiday ('public_holiday'),
+        averaged over the other conditions, as a month x day of week table."""
+        axis = CUBE_DIMS.index(dim)
+        totals = self.staff.sum(axis=(-2, -1))
+        ratio = np.take(totals, 1, axis=axis) / np.take(totals, 0, axis=axis)
+        return pd.DataFrame(ratio.mean(axis=-1) - 1, index=MONTHS, columns=DAYS)
+
+    def to_frame(self):
+        """Long table with one row per scenario, category and hour, indexed along CUBE_DIMS."""
+        index = pd.MultiIndex.from_product([MONTHS, DAYS, [False, True], [False, True], list(CATEGORIES), HOURS],
+                                           names=['Month', 'Day', 'Rain', 'Public Holiday', 'Category', 'Hour'])
+        return pd.DataFrame({'Staff': self.staff.ravel()}, index=index)
+
+    def save(self, path):
+        """Write the cube as a compressed .npz file."""
+        np.savez_compressed(path, staff=self.staff.astype(np.float32), base_demand=self.base_demand,
+                            constraints=json.dumps({key: np.asarray(value).tolist() for key, value in self.constraints.items()}),
+                            version=CUBE_VERSION)
+
+    @classmethod
+    def load(cls, path):
+        """Read a cube written by save()."""
+        with np.load(path) as data:
+            if int(data['version']) != CUBE_VERSION:
+                raise ValueError(f"Unsupported schedule cube version in {path}")
+            return cls(data['staff'], float(data['base_demand']), json.loads(str(data['constraints'])))
+
+def plan_year(adjusters, base_demand, workers=None, **constraints):
+    """Solve the staffing model for every scenario of a year.
+
+    Separable models are solved in one array operation. With coupling constraints each
+    scenario needs an LP solve, so the scenarios are split over `workers` processes (call
+    from under `if __name__ == "__main__":` in scripts).
+
+    Args:
+        adjusters (np.ndarray): Adjuster table from adjuster_store.load_adjuster_table().
+        base_demand (float): Estimated park attendance for the day.
+        workers (int): Processes for LP solves; None or 1 solves serially.
+        **constraints: min_staff, hourly_cap and budget, as for StaffingOptimizer.
+
+    Returns:
+        ScheduleCube: Staffing of all 336 scenarios.
+    """
+    scenarios = all_scenarios()
+    optimizer = StaffingOptimizer(adjusters, base_demand, **constraints)
+    if optimizer.separable or workers is None or workers <= 1:
+        return ScheduleCube(optimizer.solve_many(scenarios), base_demand, constraints)
+
+    chunks = [scenarios[i::workers] for i in range(workers)]
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        solved = list(executor.map(_solve_chunk, repeat(adjusters), repeat(base_demand), repeat(constraints), chunks))
+    staff = np.empty((len(scenarios), len(CATEGORIES), len(HOURS)))
+    for i, chunk_staff in enumerate(solved):
+        staff[i::workers] = chunk_staff
+    return ScheduleCube(staff, base_demand, constraints)
+
+if __name__ == "__main__":
+    cube = plan_year(load_adjuster_table(), 10000)
+    cube.save("schedule_cube.npz")
+    print(cube.daily_totals().round(0).to_string())
@@ -0,0 +1,156 @@
+import time
+import numpy as np
+import pandas as pd
+from scipy import sparse
+from scipy.optimize import milp, LinearConstraint, Bounds
+from scripts.B3.optimization_model import StaffingOptimizer, HOURS, CATEGORIES
+
+# Shift lengths in hours; every shift starts on the hour and ends by closing time
+SHIFT_LENGTHS = (4, 6, 8)
+SHIFT_COLUMNS = ['Date', 'Month', 'Day', 'Category', 'Start', 'End', 'Staff']
+
+def shift_templates(lengths=SHIFT_LENGTHS, hours=HOURS):
+    """Every (start hour, length) shift that fits within the opening hours."""
+    return [(start, length) for length in lengths for start in hours if start + length <= hours[-1] + 1]
+
+def coverage_matrix(templates, hours=HOURS):
+    """Sparse (hour, shift) matrix, 1 where a shift is on duty during an hour."""
+    rows, cols = [], []
+    for j, (start, length) in enumerate(templates):
+        covered = np.arange(start, start + length) - hours[0]
+        rows.extend(covered)
+        cols.extend([j] * length)
+    return sparse.csr_matrix((np.ones(len(rows)), (rows, cols)), shape=(len(hours), len(templates)))
+
+def date_scenarios(dates, rainy_dates=(), holiday_dates=()):
+    """(month, day, rain, public_holiday) scenario of each date of a horizon."""
+    dates = pd.to_datetime(pd.Series(dates))
+    rainy = dates.isin(pd.to_datetime(pd.Series(rainy_dates, dtype=object)))
+    holiday = dates.isin(pd.to_datetime(pd.Series(holiday_dates, dtype=object)))
+    return list(zip(dates.dt.month_name(), dates.dt.day_name(), rainy, holiday))
+
+class ShiftScheduler:
+    def __init__(self, adjusters, base_demand, templates=None, shift_overhead=0.5, understaffing_penalty=None,
+                 weekly_budget=None, hourly_cap=None, min_staff=None, time_limit=60):
+        """Integer shift scheduling over a multi-day horizon.
+
+        Decides how many staff of each category start on each shift template each day, so
+        that staff on duty cover the hourly requirement of StaffingOptimizer (rounded up to
+        whole staff). Each shift costs its paid hours plus `shift_overhead` (handover,
+        briefing), so longer shifts are preferred where the demand allows. The model is a
+        sparse MILP solved with HiGHS through scipy.optimize.milp.
+
+        Args:
+            adjusters (np.ndarray): Adjuster table from adjuster_store.load_adjuster_table().
+            base_demand (float): Estimated park attendance per day.
+            templates (list): (start hour, length) shifts; shift_templates() if None.
+            shift_overhead (float): Extra cost of each shift in hours.
+            understaffing_penalty (float): Cost per uncovered staff-hour. None makes coverage a
+                hard constraint.
+            weekly_budget (float or array-like): Maximum staff-hours per category over the horizon.
+            hourly_cap (float): Maximum total staff on duty in any hour over all categories.
+            min_staff (float or array-like): Minimum staff per hour, overall or per category.
+            time_limit (float): Solver time limit per subproblem in seconds.
+        """
+        self.optimizer = StaffingOptimizer(adjusters, base_demand, min_staff=min_staff)
+        self.templates = templates if templates is not None else shift_templates()
+        self.coverage = coverage_matrix(self.templates)
+        self.shift_cost = np.array([length for _, length in self.templates]) + shift_overhead
+        self.understaffing_penalty = understaffing_penalty
+        self.weekly_budget = None if weekly_budget is None else np.broadcast_to(
+            np.asarray(weekly_budget, dtype=float), (len(CATEGORIES),))
+        self.hourly_cap = hourly_cap
+        self.time_limit = time_limit
+
+    def requirements(self, scenarios):
+        """(day, category, hour) whole staff needed over a horizon of scenarios."""
+        staff = self.optimizer.solve_many(scenarios)
+        return np.ceil(staff - 1e-9)
+
+    def subproblems(self, n_days, decompose=False):
+        """Category blocks of the horizon that can be solved as separate MILPs.
+
+        Only an hourly cap couples the categories, so without one each category is solved
+        on its own over the whole horizon. Its days stay in one MILP: they are independent
+        without a weekly budget, but HiGHS solves a week at once faster than seven calls.
+        """
+        days = list(range(n_days))
+        if not decompose or self.hourly_cap is not None:
+            return [(list(range(len(CATEGORIES))), days)]
+        return [([c], days) for c in range(len(CATEGORIES))]
+
+    def _solve_block(self, requirement, categories, days):
+        """Solve one block and return the (category, day, shift) integer staff starts."""
+        n_blocks = len(categories) * len(days)
+        n_shifts, n_hours = len(self.templates), len(HOURS)
+        n_starts = n_blocks * n_shifts
+        soft = self.understaffing_penalty is not None
+
+        # Coverage: A x (+ shortfall) >= requirement for every (category, day) block
+        cover = sparse.kron(sparse.identity(n_blocks), self.coverage, format='csr')
+        if soft:
+            cover = sparse.hstack([cover, sparse.identity(n_blocks * n_hours)], format='csr')
+        demand = requirement[np.ix_(days, categories)].transpose(1, 0, 2).ravel()
+        constraints = [LinearConstraint(cover, lb=demand)]
+        n_vars = cover.shape[1]
+
+        if self.weekly_budget is not None:
+            # Paid hours of a category over the horizon
+            hours = np.array([length for _, length in self.templates], dtype=float)
+            budget_rows = sparse.kron(sparse.identity(len(categories)), np.tile(hours, len(days))[None, :], format='csr')
+            budget_rows = sparse.hstack([budget_rows, sparse.csr_matrix((len(categories), n_vars - n_starts))], format='csr')
+            constraints.append(LinearConstraint(budget_rows, ub=self.weekly_budget[categories]))
+        if self.hourly_cap is not None:
+            # Staff on duty per (day, hour) summed over the categories of the block
+            on_duty = sparse.kron(sparse.kron(np.ones((1, len(categories))), sparse.identity(len(days))), self.coverage, format='csr')
+            on_duty = sparse.hstack([on_duty, sparse.csr_matrix((on_duty.shape[0], n_vars - n_starts))], format='csr')
+            constraints.append(LinearConstraint(on_duty, ub=self.hourly_cap))
+
+        cost = np.tile(self.shift_cost, n_blocks)
+        if soft:
+            cost = np.concatenate([cost, np.full(n_blocks * n_hours, float(self.understaffing_penalty))])
+        integrality = np.concatenate([np.ones(n_starts), np.zeros(n_vars - n_starts)])
+        result = milp(cost, constraints=constraints, integrality=integrality, bounds=Bounds(0, np.inf),
+                      options={'time_limit': self.time_limit})
+        if result.x is None:
+            raise ValueError("Shift scheduling failed:", result.message)
+        return np.round(result.x[:n_starts]).astype(int).reshape(len(categories), len(days), n_shifts)
+
+    def schedule(self, scenarios, dates=None, decompose=False):
+        """Schedule shifts over a horizon.
+
+        Args:
+            scenarios (list): (month, day, rain, public_holiday) of each day, e.g. from date_scenarios().
+            dates (list): Optional date label of each day; the day's position if None.
+            decompose (bool): Solve each category as a separate MILP when no hourly cap couples
+                them. Worth it for long horizons or many templates; a week of the default
+                templates is solved fastest as a single MILP.
+
+        Returns:
+            tuple: Shifts DataFrame (one row per shift template used), hourly coverage
+            DataFrame (staff on duty against required) and the solve time in seconds.
+        """
+        started = time.perf_counter()
+        requirement = self.requirements(scenarios)
+        starts = np.zeros((len(CATEGORIES), len(scenarios), len(self.templates)), dtype=int)
+        for categories, days in self.subproblems(len(scenarios), decompose):
+            starts[np.ix_(categories, days)] = self._solve_block(requirement, categories, days)
+        seconds = time.perf_counter() - started
+
+        dates = list(dates) if dates is not None else list(range(len(scenarios)))
+        c, d, s = np.nonzero(starts)
+        shifts = pd.DataFrame({
+            'Date': [dates[i] for i in d],
+            'Month': [scenarios[i][0] for i in d],
+            'Day': [scenarios[i][1] for i in d],
+            'Category': np.array(CATEGORIES)[c],
+            'Start': [self.templates[j][0] for j in s],
+            'End': [sum(self.templates[j]) for j in s],
+            'Staff': starts[c, d, s],
+        }, columns=SHIFT_COLUMNS)
+
+        on_duty = starts @ self.coverage.T.toarray()  # (category, day, hour)
+        index = pd.MultiIndex.from_product([list(CATEGORIES), dates, HOURS], names=['Category', 'Date', 'Hour'])
+        coverage = pd.DataFrame({'On Duty': on_duty.ravel(),
+                                 'Required': requirement.transpose(1, 0, 2).ravel()}, index=index)
+        return shifts, coverage, seconds
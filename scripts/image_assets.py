@@ -0,0 +1,197 @@
+import os
+import json
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+from PIL import Image
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+IMAGES_DIR = os.path.join(REPO_DIR, 'images')
+MANIFEST_PATH = os.path.join(IMAGES_DIR, 'manifest.json')
+MANIFEST_VERSION = 1
+IMAGE_EXTENSIONS = ('.png', '.jpg', '.jpeg', '.gif', '.bmp', '.webp')
+
+
+def file_etag(data):
+    """Strong HTTP-style ETag of an image's bytes.
+
+    Args:
+        data (bytes): File contents.
+
+    Returns:
+        str: Quoted content hash, e.g. '"3f1c..."'.
+    """
+    return f'"{hashlib.sha256(data).hexdigest()[:20]}"'
+
+
+def scan_images(images_dir=IMAGES_DIR):
+    """Describe every image under a directory.
+
+    Args:
+        images_dir (str): Directory to scan recursively.
+
+    Returns:
+        dict: Entries keyed by '/'-separated path relative to `images_dir`, each with the
+        file size and ETag.
+    """
+    images = {}
+    for root, _, files in os.walk(images_dir):
+        for name in files:
+            if not name.lower().endswith(IMAGE_EXTENSIONS):
+                continue
+            path = os.path.join(root, name)
+            with open(path, 'rb') as f:
+                data = f.read()
+            relative = os.path.relpath(path, images_dir).replace(os.sep, '/')
+            images[relative] = {'size': len(data), 'etag': file_etag(data)}
+    return dict(sorted(images.items()))
+
+
+def build_manifest(images_dir=IMAGES_DIR, manifest_path=MANIFEST_PATH):
+    """Write the image manifest the Streamlit pages list and validate images with.
+
+    Run as a build step (`python -m scripts.image_assets`) whenever images are added.
+
+    Args:
+        images_dir (str): Directory holding the images.
+        manifest_path (str): Output JSON file.
+
+    Returns:
+        dict: The manifest written.
+    """
+    manifest = {'version': MANIFEST_VERSION, 'images': scan_images(images_dir)}
+    with open(manifest_path, 'w') as f:
+        json.dump(manifest, f, indent=1)
+    return manifest
+
+
+class ImageStore:
+    """Serves the bundled images from local disk through an in-process LRU byte cache.
+
+    Listings come from the manifest instead of a directory or GitHub API call. Every image
+    has an ETag, so callers holding a copy can revalidate it without transferring the bytes,
+    like an HTTP conditional request. Safe to share between Streamlit sessions.
+
+    Attributes:
+        images_dir (str): Directory holding the images.
+        manifest (dict): Manifest entries keyed by relative image path.
+        max_bytes (int): Byte budget of the cache.
+        hits (int): Reads served from the cache.
+        misses (int): Reads served from disk.
+    """
+    def __init__(self, images_dir=IMAGES_DIR, manifest_path=MANIFEST_PATH, max_bytes=32 * 1024 * 1024):
+        """Load the manifest, scanning the images instead if it is missing or outdated.
+
+        Args:
+            images_dir (str): Directory holding the images.
+            manifest_path (str): Manifest written by build_manifest().
+            max_bytes (int): Byte budget of the cache.
+        """
+        self.images_dir = images_dir
+        self.max_bytes = max_bytes
+        self.manifest = self._load_manifest(manifest_path)
+        self.hits = 0
+        self.misses = 0
+        self._cache = OrderedDict()
+        self._cached_bytes = 0
+        self._lock = threading.Lock()
+
+    def _load_manifest(self, manifest_path):
+        """Manifest entries from `manifest_path`, or from a fresh scan without a usable manifest."""
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                manifest = json.load(f)
+            if manifest.get('version') == MANIFEST_VERSION:
+                return manifest['images']
+        return scan_images(self.images_dir)
+
+    def list(self, prefix=''):
+        """Images under a folder, in path order.
+
+        Args:
+            prefix (str): Folder relative to the images directory, e.g. 'B2/simulations/model1'.
+
+        Returns:
+            list: Relative paths of the images under `prefix`.
+        """
+        prefix = prefix.strip('/') + '/' if prefix else ''
+        return [path for path in self.manifest if path.startswith(prefix)]
+
+    def etag(self, path):
+        """ETag of an image.
+
+        Args:
+            path (str): Image path relative to the images directory.
+
+        Returns:
+            str: The image's ETag.
+
+        Raises:
+            KeyError: If the image is not in the manifest.
+        """
+        return self.manifest[path]['etag']
+
+    def get(self, path, if_none_match=None):
+        """Read an image, skipping the bytes if the caller's copy is current.
+
+        Args:
+            path (str): Image path relative to the images directory.
+            if_none_match (str): ETag of the copy the caller holds, or None.
+
+        Returns:
+            tuple: (bytes, etag), with bytes None if `if_none_match` matches (not modified).
+        """
+        etag = self.etag(path)
+        if if_none_match == etag:
+            return None, etag
+        return self.read(path), etag
+
+    def read(self, path):
+        """Image bytes, from the cache or from disk.
+
+        Args:
+            path (str): Image path relative to the images directory.
+
+        Returns:
+            bytes: File contents.
+        """
+        etag = self.etag(path)
+        with self._lock:
+            cached = self._cache.get(path)
+            if cached is not None and cached[0] == etag:
+                self._cache.move_to_end(path)
+                self.hits += 1
+                return cached[1]
+
+        with open(os.path.join(self.images_dir, *path.split('/')), 'rb') as f:
+            data = f.read()
+
+        with self._lock:
+            self.misses += 1
+            if len(data) <= self.max_bytes:
+                previous = self._cache.pop(path, None)
+                if previous is not None:
+                    self._cached_bytes -= len(previous[1])
+                self._cache[path] = (etag, data)
+                self._cached_bytes += len(data)
+                while self._cached_bytes > self.max_bytes:
+                    _, (_, evicted) = self._cache.popitem(last=False)
+                    self._cached_bytes -= len(evicted)
+        return data
+
+    def image(self, path):
+        """Open an image with Pillow.
+
+        Args:
+            path (str): Image path relative to the images directory.
+
+        Returns:
+            PIL.Image.Image: The decoded image.
+        """
+        return Image.open(BytesIO(self.read(path)))
+
+
+if __name__ == "__main__":
+    manifest = build_manifest()
+    print(f"Wrote {len(manifest['images'])} images to {MANIFEST_PATH}")